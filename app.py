@@ -1,9 +1,17 @@
 import streamlit as st
 import pandas as pd
-from itertools import combinations
-import random
-import io
-import base64
+import uuid
+from functools import partial
+
+from combinazioni import (
+    DEFAULT_BATCH_SIZE, DEFAULT_NUMPY_MEMORY_BUDGET, JOB_CANCELLED, JOB_DONE, JOB_FAILED, JOB_QUEUED, PARITY_LABELS,
+    EXPORT_FORMATS, JobManager, JobStatus, ResultCache, RunConfig, TicketConstraints, budget_outcome, cacheable,
+    config_fingerprint, default_workers, export_to_tempfile, extension_errors, header_parameters, read_combinations,
+    result_filename, format_bytes, format_seconds, parquet_available, preflight, valid_fixed_numbers,
+    validate_pool_parameters, verify_cover,
+)
+from combinazioni.greedy import PHASE_GREEDY, PHASE_TARGETS
+from combinazioni.local_search import PHASE_LOCAL_SEARCH
 
 # Configurazione pagina
 st.set_page_config(
@@ -34,126 +42,46 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Funzione per generare tutte le combinazioni di k elementi da un pool di numeri
-def generate_all_k_combinations_from_pool(source_numbers_pool, k):
-    """
-    Genera tutte le combinazioni di k numeri dal pool fornito.
+# Messaggio mostrato sopra la barra di progresso per ogni fase del calcolo
+ETICHETTE_FASI = {
+    PHASE_TARGETS: "🔄 Calcolo sottoinsiemi da garantire (target sets)...",
+    PHASE_GREEDY: "🎯 Selezione combinazioni con algoritmo greedy...",
+    PHASE_LOCAL_SEARCH: "✂ Ottimizzazione locale della copertura...",
+}
 
-    Args:
-        source_numbers_pool (list): La lista (pool) di numeri da cui generare le combinazioni.
-        k (int): La lunghezza desiderata di ogni combinazione.
 
-    Returns:
-        list: Una lista di tuple, dove ogni tupla è una combinazione ordinata di k numeri.
-    """
-    if not isinstance(source_numbers_pool, list) or not all(isinstance(n, int) for n in source_numbers_pool):
-        raise ValueError("Il 'pool' di numeri sorgente deve contenere solo numeri interi.")
-    if not isinstance(k, int) or k <= 0:
-        raise ValueError("La lunghezza 'k' della combinazione deve essere un numero intero positivo.")
-
-    if k > len(source_numbers_pool):
-        raise ValueError(f"Impossibile generare combinazioni di lunghezza {k} da un pool di soli {len(source_numbers_pool)} numeri.")
-
-    # Genera tutte le combinazioni e le ordina per consistenza
-    all_combinations = [tuple(sorted(combo)) for combo in combinations(source_numbers_pool, k)]
-    return sorted(list(set(all_combinations))) # set per unicità, sorted per ordine consistente
-
-
-def reduce_combinations_with_guarantee_greedy(full_combinations, guarantee_size, max_combinations=None):
-    if not full_combinations:
-        st.warning("Nessuna combinazione da ridurre. Assicurati che le combinazioni iniziali siano state generate.")
-        return []
-
-    if guarantee_size <= 0:
-        st.error("Errore: La dimensione della garanzia deve essere un numero positivo.")
-        return []
-    if guarantee_size > len(full_combinations[0]):
-        st.error("Errore: La dimensione della garanzia non può essere maggiore della lunghezza della combinazione stessa.")
-        return []
-
-    # Caso speciale: se guarantee_size è uguale alla lunghezza della combinazione
-    # In questo caso, ogni combinazione è un "target" a sé. L'algoritmo non ridurrebbe
-    # ma selezionerebbe solo le combinazioni esatte. Applichiamo solo il limite max_combinations, se presente.
-    if guarantee_size == len(full_combinations[0]):
-        st.info("Garanzia impostata alla lunghezza della combinazione (esatta). Non verrà applicata ulteriore riduzione oltre il limite massimo di combinazioni, se specificato. Verranno incluse tutte le combinazioni iniziali.")
-        if max_combinations is not None and len(full_combinations) > max_combinations:
-            return sorted(random.sample(full_combinations, max_combinations)) # Prendo un campione casuale
-        else:
-            return full_combinations # Ritorna tutte le combinazioni se non c'è limite
+@st.cache_resource
+def gestore_job():
+    """Pool di processi condiviso da tutte le sessioni: ogni generazione è un job in background."""
+    return JobManager()
 
-    required_subsets = set()
-    
-    progress_container = st.container()
-    
-    with progress_container:
-        st.info("🔄 Calcolo sottoinsiemi da garantire (target sets)...")
-        progress_bar = st.progress(0)
-        
-        num_full_combos = len(full_combinations)
-        update_interval = max(1, num_full_combos // 100)
-        if num_full_combos < 1000:
-            update_interval = 1
-
-        for i, combo in enumerate(full_combinations):
-            for subset in combinations(combo, guarantee_size):
-                required_subsets.add(tuple(sorted(subset)))
-            if (i + 1) % update_interval == 0 or (i + 1) == num_full_combos:
-                progress_bar.progress((i + 1) / num_full_combos)
-        
-        progress_bar.empty()
-        
-    covered_subsets = set()
-    selected_combinations = []
-    combos_remaining = set(full_combinations)
 
-    with progress_container:
-        st.info(f"🎯 Selezione combinazioni con algoritmo greedy per coprire {len(required_subsets):,} sottoinsiemi...")
-        progress_bar2 = st.progress(0)
-        
-        iteration = 0
-        while covered_subsets != required_subsets and combos_remaining:
-            best_combo = None
-            best_new_coverage = -1
-
-            for combo in combos_remaining:
-                new_subsets = set(combinations(combo, guarantee_size))
-                uncovered = new_subsets - covered_subsets
-                if len(uncovered) > best_new_coverage:
-                    best_new_coverage = len(uncovered)
-                    best_combo = combo
-            
-            if best_new_coverage == 0:
-                st.warning("⚠ Nessuna combinazione rimanente può coprire nuovi sottoinsiemi. Uscita anticipata dall'algoritmo greedy.")
-                break
-
-            if best_combo is None:
-                st.warning("⚠ Algoritmo greedy non ha trovato la combinazione migliore. Uscita anticipata.")
-                break
-
-            selected_combinations.append(best_combo)
-            covered_subsets.update(set(combinations(best_combo, guarantee_size)))
-            combos_remaining.remove(best_combo)
-            
-            iteration += 1
-            if len(required_subsets) > 0:
-                progress = min(len(covered_subsets) / len(required_subsets), 1.0)
-                progress_bar2.progress(progress)
-            
-            if max_combinations is not None and len(selected_combinations) >= max_combinations:
-                st.info(f"🔒 Raggiunto limite massimo di combinazioni: {max_combinations}")
-                break
-    
-    progress_container.empty()
-    return sorted(selected_combinations)
+@st.cache_resource
+def cache_risultati():
+    """Risultati già calcolati, condivisi da tutte le sessioni e indicizzati per impronta dei parametri."""
+    return ResultCache()
+
 
 # Funzioni per il download
-def get_download_link(data, filename, mime_type, link_text):
-    b64 = base64.b64encode(data.encode()).decode()
-    return f'<a href="data:{mime_type};base64,{b64}" download="{filename}">{link_text}</a>'
+def dati_esportazione(formato, header_info, combinazioni, k, max_value):
+    """
+    Prepara il contenuto di un file di esportazione.
+
+    Viene passata a `st.download_button` come funzione differita: il file viene
+    scritto in streaming su un file temporaneo solo quando l'utente lo richiede.
+    """
+    with export_to_tempfile(formato, header_info, combinazioni, k, max_value) as file:
+        return file.read()
+
 
-def get_excel_download_link(data, filename, link_text):
-    b64 = base64.b64encode(data).decode()
-    return f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="{filename}">{link_text}</a>'
+# Pulsanti di download: formato -> etichetta
+PULSANTI_DOWNLOAD = {
+    "csv": "📁 Scarica CSV",
+    "xlsx": "📊 Scarica Excel",
+    "csv.gz": "🗜 Scarica CSV compresso",
+    "parquet": "🧱 Scarica Parquet",
+    "bin": "💾 Scarica binario compatto",
+}
 
 
 # Header principale
@@ -211,6 +139,16 @@ garanzia = st.sidebar.slider(
     help="Quanti numeri devono essere garantiti in comune in ciascun sottoinsieme. Deve essere minore o uguale della lunghezza combinazione."
 )
 
+condizione_input = st.sidebar.number_input(
+    "🎲 Se estratti nel pool (m)",
+    min_value=0, max_value=20, value=0,
+    key="condition_input",
+    help="Garanzia condizionata 't se m': il sistema garantisce almeno 'Garanzia' numeri in una combinazione "
+         "ogni volta che m dei numeri estratti sono nel pool (es. 3 se 4, 4 se 6). Bastano molte meno "
+         "combinazioni che per la garanzia semplice. 0 = garanzia semplice."
+)
+condizione = condizione_input or None
+
 # Parametri avanzati
 with st.sidebar.expander("⚙ Parametri Avanzati"):
     # Spostato qui come richiesto
@@ -244,6 +182,151 @@ with st.sidebar.expander("⚙ Parametri Avanzati"):
         help="Usa lo stesso seed per ottenere risultati riproducibili per la generazione dei numeri casuali del pool."
     )
 
+    motori_disponibili = {
+        "Greedy lazy (coda a bucket)": "lazy",
+        "Greedy NumPy (vettoriale)": "numpy",
+        "Greedy parallelo (multi-processo)": "parallel",
+        "Greedy classico": "classic",
+        "Greedy per orbite (pool grandi)": "orbit",
+        "Greedy campionato (pool enormi)": "sampled",
+    }
+    motore_label = st.selectbox(
+        "🧠 Motore di calcolo",
+        list(motori_disponibili.keys()),
+        index=0,
+        key="engine_select",
+        help="Il greedy lazy aggiorna solo i candidati toccati da ogni scelta ed è molto più veloce. "
+             "I motori greedy producono esattamente le stesse combinazioni. Il greedy per orbite sceglie "
+             "gruppi di combinazioni ruotate e rende calcolabili pool di 30-40 numeri, con qualche "
+             "combinazione in più. Il greedy campionato valuta solo lotti di candidati estratti a caso "
+             "e non dipende dal numero di combinazioni del pool."
+    )
+    motore_greedy = motori_disponibili[motore_label]
+
+    budget_numpy_mb = st.number_input(
+        "💾 Budget memoria NumPy (MB)",
+        min_value=16, max_value=16384, value=DEFAULT_NUMPY_MEMORY_BUDGET // (1024 * 1024), step=64,
+        key="numpy_budget_input",
+        disabled=motore_greedy != "numpy",
+        help="Memoria massima per la tabella di incidenza del motore NumPy. "
+             "Se la tabella non ci sta, si usa automaticamente il greedy lazy in puro Python."
+    )
+
+    processi_paralleli = st.number_input(
+        "🧵 Processi paralleli",
+        min_value=1, max_value=max(1, default_workers()), value=max(1, default_workers()),
+        key="workers_input",
+        disabled=motore_greedy != "parallel",
+        help="Numero di processi che valutano i candidati in parallelo con il motore parallelo. "
+             "Il risultato è identico a quello dei motori seriali."
+    )
+
+    punti_fissi = st.number_input(
+        "🔁 Numeri fissi della rotazione",
+        min_value=0, max_value=3, value=0,
+        key="orbit_fixed_points_input",
+        disabled=motore_greedy != "orbit",
+        help="Il greedy per orbite fa ruotare ciclicamente i numeri del pool; i numeri più grandi indicati "
+             "qui restano fermi. Valori diversi danno sistemi diversi: conviene provarne più d'uno."
+    )
+
+    lotto_campionato = st.number_input(
+        "🎲 Candidati per passo",
+        min_value=10, max_value=5000, value=DEFAULT_BATCH_SIZE, step=50,
+        key="sampled_batch_input",
+        disabled=motore_greedy != "sampled",
+        help="Il greedy campionato estrae ad ogni passo questo numero di combinazioni candidate, favorendo i "
+             "numeri che compaiono in molti sottoinsiemi ancora scoperti, e sceglie la migliore. Più candidati "
+             "danno sistemi più piccoli e passi più lenti. Con lo stesso seed il risultato è lo stesso."
+    )
+
+    usa_cache_coperture = st.checkbox(
+        "💽 Usa cache delle coperture",
+        value=True,
+        key="cover_cache_checkbox",
+        help="Una copertura dipende solo da dimensione del pool, lunghezza, garanzia e limite, non dai numeri scelti. "
+             "Se già calcolata viene recuperata dal disco e rimappata sul pool corrente in pochi millisecondi."
+    )
+
+    estendi_precedente = st.checkbox(
+        "♻ Estendi il risultato precedente",
+        value=False,
+        key="extend_previous_checkbox",
+        help="Se cambiano solo la dimensione del pool (in più), i numeri fissi (aggiunti) o il limite di "
+             "combinazioni (più alto), il sistema appena calcolato viene esteso invece di essere ricalcolato: "
+             "si coprono solo i sottoinsiemi nuovi. È molto più veloce, ma di solito servono alcune "
+             "combinazioni in più rispetto a un calcolo completo."
+    )
+
+    secondi_ottimizzazione = st.number_input(
+        "✂ Ottimizzazione locale (secondi)",
+        min_value=0, max_value=600, value=0, step=5,
+        key="local_search_input",
+        help="Dopo il greedy cerca, entro il tempo indicato, una copertura con meno combinazioni "
+             "(simulated annealing con mosse di scambio). 0 = disattivata. "
+             "Alla scadenza si usa la migliore copertura valida trovata."
+    )
+
+    checkpoint_tabella = st.checkbox(
+        "📌 Mostra ogni miglioramento nella tabella",
+        value=False,
+        key="local_search_checkpoint",
+        disabled=secondi_ottimizzazione == 0,
+        help="Durante l'ottimizzazione locale aggiorna una tabella con l'ultima copertura migliore trovata."
+    )
+
+    traccia_memoria = st.checkbox(
+        "📈 Misura la memoria per fase",
+        value=False,
+        key="trace_memory_checkbox",
+        help="Registra il picco di memoria allocata in ogni fase (pannello Diagnostica e intestazione dei file). "
+             "Rallenta sensibilmente il calcolo."
+    )
+
+    profilazione = st.checkbox(
+        "🔬 Profilo cProfile",
+        value=False,
+        key="profile_checkbox",
+        help="Profila l'intera generazione con cProfile: nel pannello Diagnostica compaiono le funzioni più "
+             "costose e il file .pstats da scaricare."
+    )
+
+# Vincoli sulle singole combinazioni, applicati durante la generazione
+with st.sidebar.expander("🧩 Vincoli sulle combinazioni"):
+    somma_col1, somma_col2 = st.columns(2)
+    somma_min = somma_col1.number_input("Somma minima", min_value=0, value=0, key="sum_min_input",
+                                        help="Somma minima dei numeri di ogni combinazione (0 = nessun limite).")
+    somma_max = somma_col2.number_input("Somma massima", min_value=0, value=0, key="sum_max_input",
+                                        help="Somma massima dei numeri di ogni combinazione (0 = nessun limite).")
+    pari_min, pari_max = st.slider(
+        "Numeri pari per combinazione",
+        min_value=0, max_value=k_combination_length, value=(0, k_combination_length),
+        key="even_range_input",
+        help="Quanti numeri pari deve contenere ogni combinazione (tutto l'intervallo = nessun vincolo)."
+    )
+    max_consecutivi = st.number_input(
+        "Massimo numeri consecutivi",
+        min_value=0, max_value=k_combination_length, value=0,
+        key="max_consecutive_input",
+        help="Lunghezza massima di una sequenza di numeri consecutivi (es. 2 ammette 7-8 ma non 7-8-9; "
+             "1 = nessun consecutivo; 0 = nessun limite)."
+    )
+    max_per_decina = st.number_input(
+        "Massimo numeri per decina",
+        min_value=0, max_value=k_combination_length, value=0,
+        key="max_per_decade_input",
+        help="Numeri massimi della stessa decina (1-10, 11-20, ...) in ogni combinazione (0 = nessun limite)."
+    )
+
+vincoli = TicketConstraints(
+    sum_min=somma_min or None,
+    sum_max=somma_max or None,
+    even_min=pari_min or None,
+    even_max=pari_max if pari_max < k_combination_length else None,
+    max_consecutive=max_consecutivi or None,
+    max_per_decade=max_per_decina or None,
+)
+
 # Elaborazione input per i numeri fissi e il pool
 fixed_numbers_for_pool_construction = []
 if numeri_fissi_input.strip():
@@ -266,73 +349,53 @@ if max_combinazioni_input.strip():
     except ValueError:
         st.sidebar.error("❌ Formato max combinazioni non valido. Inserire un numero intero positivo.")
 
-# Set seed se specificato
-if seed_random > 0:
-    random.seed(seed_random)
-
-# Validazioni
-validazione_ok = True
-errori = []
-
-if range_max <= range_min:
-    errori.append("Il range massimo deve essere maggiore del range minimo.")
-    validazione_ok = False
-
-if garanzia > k_combination_length:
-    errori.append("La garanzia non può essere maggiore della lunghezza della combinazione.")
-    validazione_ok = False
+parita = {label: code for code, label in PARITY_LABELS.items()}[tipo_numeri_generazione]
 
 # Validazione: "Numeri da includere" (fissi nel pool) non devono essere fuori range/tipo
-# e la loro quantità non può superare il "Numeri totali per il sistema"
-valid_fixed_numbers_in_range_and_type = []
-for num in fixed_numbers_for_pool_construction:
-    if range_min <= num <= range_max:
-        if tipo_numeri_generazione == "Solo Pari" and num % 2 != 0:
-            continue
-        if tipo_numeri_generazione == "Solo Dispari" and num % 2 == 0:
-            continue
-        valid_fixed_numbers_in_range_and_type.append(num)
-        
+valid_fixed_numbers_in_range_and_type = valid_fixed_numbers(fixed_numbers_for_pool_construction, range_min, range_max, parita)
 if len(valid_fixed_numbers_in_range_and_type) != len(fixed_numbers_for_pool_construction):
     st.sidebar.warning("Alcuni 'Numeri da includere' sono stati ignorati perché fuori range o non conformi al filtro pari/dispari. Verranno considerati solo i validi.")
 fixed_numbers_for_pool_construction = valid_fixed_numbers_in_range_and_type # Aggiorna la lista dei fissi validi
 
+opzioni_motore = {}
+if motore_greedy == "numpy":
+    opzioni_motore = {"memory_budget": budget_numpy_mb * 1024 * 1024}
+elif motore_greedy == "parallel":
+    opzioni_motore = {"workers": processi_paralleli}
+elif motore_greedy == "orbit":
+    opzioni_motore = {"fixed_points": punti_fissi}
+elif motore_greedy == "sampled":
+    opzioni_motore = {"batch_size": lotto_campionato}
+
+# Tutti i parametri della generazione, come li usa il nucleo di calcolo
+config = RunConfig(
+    range_min=range_min,
+    range_max=range_max,
+    pool_size=numero_di_numeri,
+    k=k_combination_length,
+    guarantee=garanzia,
+    condition=condizione,
+    fixed_numbers=fixed_numbers_for_pool_construction,
+    parity=parita,
+    constraints=vincoli,
+    max_combinations=max_combinations,
+    seed=seed_random,
+    engine=motore_greedy,
+    engine_options=opzioni_motore,
+    local_search_seconds=secondi_ottimizzazione,
+)
 
-if len(fixed_numbers_for_pool_construction) > numero_di_numeri:
-    errori.append(f"Il numero di 'Numeri da includere' ({len(fixed_numbers_for_pool_construction)}) non può essere maggiore di 'Numeri totali per il sistema' ({numero_di_numeri}).")
-    validazione_ok = False
-
-# Calcola il numero massimo di numeri casuali che possiamo estrarre dal range filtrato,
-# dopo aver escluso i fissi già presenti.
-potential_numbers_for_sampling = []
-for num in range(range_min, range_max + 1):
-    if num in fixed_numbers_for_pool_construction: # Escludi i fissi che saranno nel pool
-        continue
-    if tipo_numeri_generazione == "Solo Pari" and num % 2 != 0:
-        continue
-    if tipo_numeri_generazione == "Solo Dispari" and num % 2 == 0:
-        continue
-    potential_numbers_for_sampling.append(num)
-
-# Validazione: Ci sono abbastanza numeri disponibili per formare il pool del sistema?
-numbers_to_sample_for_pool_size = numero_di_numeri - len(fixed_numbers_for_pool_construction)
-if numbers_to_sample_for_pool_size > 0: # Se dobbiamo pescare numeri casuali
-    if numbers_to_sample_for_pool_size > len(potential_numbers_for_sampling):
-        errori.append(f"Impossibile creare un pool di {numero_di_numeri} numeri. "
-                     f"Hai {len(fixed_numbers_for_pool_construction)} numeri fissi e solo {len(potential_numbers_for_sampling)} numeri casuali disponibili nel range e con i filtri. "
-                     f"Servono {numbers_to_sample_for_pool_size} numeri casuali in più.")
-        validazione_ok = False
-elif numbers_to_sample_for_pool_size < 0:
-    # Questo caso dovrebbe essere già catturato dal check `len(fixed_numbers_for_pool_construction) > numero_di_numeri`
-    pass
-
-
-# Validazione: Se k (lunghezza combinazione) è maggiore del numero totale di numeri del pool
-if k_combination_length > numero_di_numeri:
-    errori.append(f"La lunghezza della combinazione ({k_combination_length}) non può essere maggiore del 'Numeri totali per il sistema' ({numero_di_numeri}).")
+# Validazioni
+errori = validate_pool_parameters(range_min, range_max, numero_di_numeri, k_combination_length, garanzia,
+                                  fixed_numbers_for_pool_construction, parita, condizione, vincoli)
+validazione_ok = not errori
+
+# Stima preventiva: la generazione non parte se supererebbe la memoria disponibile per un job
+stima = preflight(config, gestore_job().job_memory_limit) if validazione_ok else None
+if stima is not None and not stima.allowed:
+    errori.append(stima.message)
     validazione_ok = False
 
-
 # Mostra errori
 if errori:
     for errore in errori:
@@ -349,148 +412,348 @@ with col2:
     st.write(f"📊 *Range:* {range_min} - {range_max}")
     st.write(f"🔢 *Lunghezza combinazione:* {k_combination_length}")
     st.write(f"📌 *Numeri da includere nel pool:* {fixed_numbers_for_pool_construction if fixed_numbers_for_pool_construction else 'Nessuno'}")
-    st.write(f"🎯 *Garanzia:* {garanzia}")
+    st.write(f"🎯 *Garanzia:* {config.guarantee_label}")
     st.write(f"🔒 *Max combinazioni finali:* {max_combinations if max_combinations else 'Nessun limite'}")
     st.write(f"🔄 *Tipo numeri nel pool:* {tipo_numeri_generazione}")
+    if vincoli.active:
+        st.write(f"🧩 *Vincoli sulle combinazioni:* {vincoli.label}")
     if seed_random > 0:
         st.write(f"🎲 *Seed:* {seed_random}")
+    if stima is not None:
+        st.write(f"📐 *Stima:* circa {stima.expected_size:,} combinazioni finali, "
+                 f"{format_bytes(stima.memory)} di memoria, {format_seconds(stima.seconds)}")
+        if stima.switched:
+            st.warning(stima.message)
+        with st.expander("📐 Dettagli della stima"):
+            st.caption(f"{stima.candidates:,} candidati C(v,k), {stima.subsets:,} sottoinsiemi da garantire "
+                       f"C(v,t), {stima.subsets_per_candidate:,} per combinazione C(k,t). Limite di memoria per "
+                       f"generazione: {format_bytes(stima.memory_limit)}. Le stime sono indicative.")
+            if stima.estimates:
+                st.dataframe(pd.DataFrame([
+                    {"Motore": nome,
+                     "Memoria": format_bytes(s.memory) if s.applicable else "—",
+                     "Tempo": format_seconds(s.seconds) if s.applicable else "—",
+                     "Note": s.note}
+                    for nome, s in stima.estimates.items()
+                ]), use_container_width=True, hide_index=True)
+    # Compilato dopo il pulsante, così le statistiche comprendono la richiesta corrente
+    segnaposto_cache = st.empty()
     st.markdown('</div>', unsafe_allow_html=True)
 
+def mostra_messaggi(messaggi):
+    for livello, messaggio in messaggi:
+        if livello == "warning":
+            st.warning(messaggio)
+        else:
+            st.info(messaggio)
+
+
+@st.fragment(run_every=0.5)
+def avanzamento_job(job_id):
+    """Mostra lo stato del job in corso; quando termina ne salva l'esito e ricarica la pagina."""
+    gestore = gestore_job()
+    try:
+        stato = gestore.status(job_id)
+    except KeyError:
+        # Job dimenticato (es. server riavviato o job scaduto)
+        st.session_state.pop("job_corrente", None)
+        st.rerun()
+
+    # Messaggi dell'interfaccia sulla richiesta, prima di quelli del job
+    stato.messages = st.session_state.get("messaggi_job", []) + stato.messages
+    if stato.finished:
+        esito = {"stato": stato, "outcome": None}
+        if stato.state == JOB_DONE:
+            esito["outcome"] = gestore.result(job_id)
+            impronta = st.session_state.get("impronta_job")
+            if impronta is not None:
+                cache_risultati().put(impronta, esito["outcome"])
+        else:
+            gestore.forget(job_id)
+        st.session_state["esito"] = esito
+        st.session_state.pop("job_corrente", None)
+        st.session_state.pop("impronta_job", None)
+        st.session_state.pop("messaggi_job", None)
+        st.rerun()
+
+    if stato.state == JOB_QUEUED:
+        st.info("⏳ In coda: la generazione partirà appena si libera un processo...")
+    else:
+        st.info(ETICHETTE_FASI.get(stato.phase, "🔄 Avvio generazione..."))
+        st.progress(min(stato.fraction, 1.0))
+    if stato.best_size is not None:
+        st.metric("✂ Copertura migliore", stato.best_size)
+    if stato.checkpoint:
+        st.dataframe(
+            pd.DataFrame(stato.checkpoint, columns=[f'N{i+1}' for i in range(len(stato.checkpoint[0]))]),
+            use_container_width=True, height=300
+        )
+    mostra_messaggi(stato.messages)
+    if st.button("❌ Annulla", key="annulla_job"):
+        gestore.cancel(job_id)
+        st.warning("⏹ Annullamento in corso...")
+
+
+def mostra_esito(esito):
+    """Mostra il risultato dell'ultima generazione della sessione."""
+    stato = esito["stato"]
+    outcome = esito["outcome"]
+    if stato.state == JOB_CANCELLED:
+        mostra_messaggi(stato.messages)
+        st.warning("⏹ Generazione annullata.")
+        return
+    if stato.state == JOB_FAILED:
+        mostra_messaggi(stato.messages)
+        st.error(f"❌ *Errore durante la generazione:* {stato.error}")
+        st.info("💡 Prova a modificare i parametri e riprova. Assicurati che il 'Pool di numeri del sistema' sia sufficientemente grande rispetto alla 'Lunghezza combinazione'.")
+        return
+
+    parametri = outcome.config
+    source_numbers_list = outcome.pool
+    final_combinations = outcome.combinations
+
+    # Doppia validazione finale sulla dimensione del pool generato, in caso di bug imprevisti
+    if len(source_numbers_list) != parametri.pool_size:
+        st.warning(f"Attenzione: la dimensione del pool di numeri generati ({len(source_numbers_list)}) non corrisponde a 'Numeri totali per il sistema' richiesti ({parametri.pool_size}). Questo può indicare un problema con i numeri fissi o i filtri. Il sistema userà {len(source_numbers_list)} numeri come base.")
+
+    st.success(f"🎲 *Pool di numeri del sistema ({parametri.parity_label.lower()}):* {source_numbers_list}")
+    st.success(f"✅ *Combinazioni iniziali generate:* {outcome.full_count:,}")
+    if outcome.full_count == 0:
+        st.error("❌ Nessuna combinazione generata o ridotta con i parametri specificati. Prova a regolare i parametri o a disattivare i numeri fissi/garanzia se la lista iniziale è troppo piccola.")
+        return
+    mostra_messaggi(stato.messages)
+    st.success(f"🎯 *Combinazioni finali:* {len(final_combinations):,}")
+
+    # Curva copertura/combinazioni: la selezione è ordinata, un budget più basso è un suo prefisso
+    curva = outcome.result.coverage_curve()
+    if len(curva) > 1 and outcome.result.required:
+        st.markdown("---")
+        st.subheader("📈 Copertura per numero di combinazioni")
+        st.line_chart(pd.DataFrame(
+            {"Copertura (%)": [coperti / outcome.result.required * 100 for coperti in curva]},
+            index=pd.RangeIndex(1, len(curva) + 1, name="Combinazioni"),
+        ))
+        budget = st.slider(
+            "✂ Combinazioni da usare",
+            min_value=1, max_value=len(curva), value=len(curva),
+            key=f"budget_slider_{id(outcome)}",
+            help="Tiene solo le prime combinazioni scelte dal motore, senza ricalcolare: tabella ed esportazioni "
+                 "riportano la copertura raggiunta con questo numero di combinazioni."
+        )
+        if budget < len(curva):
+            outcome = budget_outcome(outcome, budget)
+            final_combinations = outcome.combinations
+            st.info(f"✂ Usate le prime {budget:,} combinazioni su {len(curva):,}: copertura "
+                    f"{outcome.result.covered / outcome.result.required:.2%}.")
+
+    # Creazione DataFrame
+    df_output = pd.DataFrame(
+        final_combinations,
+        columns=[f'N{i+1}' for i in range(parametri.k)]
+    )
+    riduzione_perc = (1 - len(final_combinations) / outcome.full_count) * 100
+
+    # Visualizzazione risultati
+    st.markdown("---")
+    st.subheader("📊 Risultati Generati")
+
+    # Statistiche
+    col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
+    with col_stat1:
+        st.metric("🎯 Combinazioni Finali", len(final_combinations))
+    with col_stat2:
+        st.metric("📉 Riduzione", f"{riduzione_perc:.1f}%")
+    with col_stat3:
+        st.metric("🔢 Garanzia", parametri.guarantee_label)
+    with col_stat4:
+        if outcome.result.required:
+            st.metric("🛡 Copertura", f"{outcome.result.covered / outcome.result.required:.2%}")
+
+    # Tabella risultati
+    st.dataframe(df_output, use_container_width=True, height=400)
+
+    # Download: ogni file viene generato solo al click, senza ricaricare la pagina
+    formati = [formato for formato in PULSANTI_DOWNLOAD if formato != "parquet" or parquet_available()]
+    colonne_download = st.columns(len(formati))
+    for colonna, formato in zip(colonne_download, formati):
+        estensione, mime = EXPORT_FORMATS[formato]
+        with colonna:
+            st.download_button(
+                PULSANTI_DOWNLOAD[formato],
+                data=partial(dati_esportazione, formato, outcome.header_info, final_combinations,
+                             parametri.k, max(source_numbers_list)),
+                file_name=result_filename(parametri.guarantee, len(final_combinations), parametri.k, estensione),
+                mime=mime,
+                key=f"download_{formato}",
+                on_click="ignore",
+            )
+
+    with st.expander("🩺 Diagnostica"):
+        # Le sotto-fasi dei motori ("Fase › sotto-fase") sono già comprese nella loro fase
+        tempo_totale = sum(riga["secondi"] for riga in outcome.diagnostics if "›" not in riga["fase"])
+        st.caption(f"Tempo totale: {tempo_totale:.3f} s. I file vengono scritti solo al "
+                   "momento del download, quindi l'esportazione non compare tra le fasi.")
+        st.dataframe(
+            pd.DataFrame(outcome.diagnostics).rename(columns={
+                "fase": "Fase", "secondi": "Tempo (s)", "memoria_mb": "Picco memoria (MB)",
+                "dettagli": "Dettagli",
+            }),
+            use_container_width=True, hide_index=True
+        )
+        if outcome.profile is not None:
+            st.code(outcome.profile_text, language=None)
+            st.download_button(
+                "🔬 Scarica profilo (.pstats)", data=outcome.profile,
+                file_name="profilo_combinazioni.pstats", mime="application/octet-stream",
+                key="download_profile", on_click="ignore",
+            )
+
+
+# Ogni sessione del browser è un utente distinto per i limiti sui job in corso
+id_sessione = st.session_state.setdefault("id_sessione", uuid.uuid4().hex)
+job_corrente = st.session_state.get("job_corrente")
+
 with col1:
     # Pulsante principale
     generate_button = st.button(
         "🚀 Genera Combinazioni",
         type="primary",
-        disabled=not validazione_ok,
+        disabled=not validazione_ok or job_corrente is not None,
         use_container_width=True
     )
-    
+
     if generate_button and validazione_ok:
-        try:
-            start_time = st.empty()
-            start_time.info("🔄 Avvio generazione...")
-            
-            # --- LOGICA DI COSTRUZIONE DEL POOL DI NUMERI DEL SISTEMA (source_numbers_list) ---
-            # Questo è il pool di `numero_di_numeri` elementi da cui verranno generate tutte le combinazioni
-            
-            # Campiona i numeri casuali necessari per raggiungere la dimensione del pool,
-            # escludendo i numeri fissi già scelti e rispettando i filtri.
-            sampled_numbers = []
-            if numbers_to_sample_for_pool_size > 0: # Se dobbiamo pescare numeri casuali
-                sampled_numbers = random.sample(potential_numbers_for_sampling, numbers_to_sample_for_pool_size)
-            
-            # Costruisci la lista finale dei numeri sorgente (pool del sistema: fissi + campionati, unici e ordinati)
-            source_numbers_list = sorted(list(set(fixed_numbers_for_pool_construction + sampled_numbers)))
-            
-            # Doppia validazione finale sulla dimensione del pool generato, in caso di bug imprevisti
-            if len(source_numbers_list) != numero_di_numeri:
-                 st.warning(f"Attenzione: la dimensione del pool di numeri generati ({len(source_numbers_list)}) non corrisponde a 'Numeri totali per il sistema' richiesti ({numero_di_numeri}). Questo può indicare un problema con i numeri fissi o i filtri. Il sistema userà {len(source_numbers_list)} numeri come base.")
-            
-            # --- FINE LOGICA DI COSTRUZIONE DEL POOL ---
-
-            st.success(f"🎲 *Pool di numeri del sistema ({tipo_numeri_generazione.lower()}):* {source_numbers_list}")
-            
-            # Generazione combinazioni iniziali da questo pool
-            with st.spinner("Generazione combinazioni iniziali (da tutto il pool)..."):
-                # Ora passiamo il pool completo e k. La funzione genera tutte le combinazioni da esso.
-                full_combinations = generate_all_k_combinations_from_pool(
-                    source_numbers_list,
-                    k_combination_length
-                )
-            st.success(f"✅ *Combinazioni iniziali generate:* {len(full_combinations):,}")
-            
-            # Riduzione con garanzia
-            if len(full_combinations) > 0:
-                final_combinations = reduce_combinations_with_guarantee_greedy(
-                    full_combinations, garanzia, max_combinations
-                )
-                st.success(f"🎯 *Combinazioni finali:* {len(final_combinations):,}")
-                
-                # Creazione DataFrame
-                df_output = pd.DataFrame(
-                    final_combinations, 
-                    columns=[f'N{i+1}' for i in range(k_combination_length)]
-                )
-                
-                # Statistiche per l'intestazione
-                source_str = ','.join(map(str, source_numbers_list)) # Usa map(str, ...) per handle ints
-                if len(full_combinations) > 0: # Evita divisione per zero
-                    riduzione_perc = (1 - len(final_combinations)/len(full_combinations)) * 100
+        # Con un seed fissato il risultato è riproducibile: si cerca prima tra quelli già calcolati.
+        # Misure di memoria e profilo richiedono invece un'esecuzione nuova.
+        impronta = None
+        if cacheable(config) and not (traccia_memoria or profilazione):
+            impronta = config_fingerprint(config)
+        outcome_memorizzato = cache_risultati().get(impronta) if impronta is not None else None
+        if outcome_memorizzato is not None:
+            messaggi = [("info", "⚡ Risultato già calcolato con gli stessi parametri: servito dalla cache.")]
+            if outcome_memorizzato.verification is not None:
+                messaggi.append(("info", "✅ " + outcome_memorizzato.verification.summary_lines()[0]))
+            st.session_state["esito"] = {
+                "stato": JobStatus(job_id=None, state=JOB_DONE, messages=messaggi),
+                "outcome": outcome_memorizzato,
+            }
+        else:
+            # Estensione del risultato mostrato, se richiesta e compatibile con i nuovi parametri
+            precedente = None
+            messaggi_job = []
+            esito_precedente = st.session_state.get("esito")
+            if estendi_precedente and esito_precedente is not None and esito_precedente["outcome"] is not None:
+                motivi = extension_errors(esito_precedente["outcome"], config)
+                if motivi:
+                    messaggi_job.append(("info", "ℹ Estensione non possibile, eseguo un calcolo completo: "
+                                                 + " ".join(motivi)))
                 else:
-                    riduzione_perc = 0.0
-
-                header_info = [
-                    f"Generazione Combinazioni - Riepilogo",
-                    f"Data Generazione: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                    f"Numeri totali per il sistema (richiesti): {numero_di_numeri}",
-                    f"Pool di numeri effettivo usato: {len(source_numbers_list)} -> {source_str}",
-                    f"Range: {range_min}-{range_max}",
-                    f"Lunghezza Combinazione: {k_combination_length}",
-                    f"Numeri da includere nel pool (fissi): {fixed_numbers_for_pool_construction if fixed_numbers_for_pool_construction else 'Nessuno'}",
-                    f"Tipo numeri nel pool: {tipo_numeri_generazione}",
-                    f"Garanzia: {garanzia}",
-                    f"Max Combinazioni finali: {max_combinations if max_combinations else 'Nessun limite'}",
-                    f"Seed casualità: {seed_random if seed_random > 0 else 'Casuale'}",
-                    f"Combinazioni iniziali generate (da tutto il pool): {len(full_combinations):,}",
-                    f"Combinazioni finali (ridotte): {len(final_combinations):,}",
-                    f"Riduzione rispetto alle iniziali: {riduzione_perc:.1f}%",
-                    "", # Riga vuota per separazione
-                    "Combinazioni:"
-                ]
-                
-                # Visualizzazione risultati
-                st.markdown("---")
-                st.subheader("📊 Risultati Generati")
-                
-                # Statistiche
-                col_stat1, col_stat2, col_stat3 = st.columns(3)
-                with col_stat1:
-                    st.metric("🎯 Combinazioni Finali", len(final_combinations))
-                with col_stat2:
-                    st.metric("📉 Riduzione", f"{riduzione_perc:.1f}%")
-                with col_stat3:
-                    st.metric("🔢 Garanzia", garanzia)
-                
-                # Tabella risultati
-                st.dataframe(df_output, use_container_width=True, height=400)
-                
-                # Generazione file CSV con intestazione
-                csv_buffer = io.StringIO()
-                for line in header_info:
-                    csv_buffer.write(line + "\n")
-                df_output.to_csv(csv_buffer, index=False)
-                csv_data = csv_buffer.getvalue()
-                
-                filename = f"combinazioni_G{garanzia}_C{len(final_combinations)}_L{k_combination_length}.csv"
-                
-                col_download1, col_download2 = st.columns(2)
-                with col_download1:
-                    st.markdown(get_download_link(csv_data, filename, "text/csv", "📁 Scarica CSV"), unsafe_allow_html=True)
-                
-                with col_download2:
-                    # Genera anche un Excel con intestazione
-                    excel_buffer = io.BytesIO()
-                    with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                        # Scrivi l'intestazione come un DataFrame temporaneo
-                        header_df = pd.DataFrame(header_info)
-                        header_df.to_excel(writer, sheet_name='Riepilogo e Combinazioni', index=False, header=False)
-                        
-                        # Inizia il DataFrame delle combinazioni dopo l'header
-                        startrow = len(header_info)
-                        df_output.to_excel(writer, sheet_name='Riepilogo e Combinazioni', index=False, startrow=startrow)
-                    excel_data = excel_buffer.getvalue()
-                    
-                    filename_excel = filename.replace('.csv', '.xlsx')
-                    st.markdown(get_excel_download_link(excel_data, filename_excel, "📊 Scarica Excel"), unsafe_allow_html=True)
-                
-                start_time.empty()
-                
+                    precedente = esito_precedente["outcome"]
+                    impronta = None  # il risultato dipende da quello precedente
+            try:
+                job_corrente = gestore_job().submit(
+                    id_sessione, config, use_cache=usa_cache_coperture, track_memory=traccia_memoria,
+                    profile=profilazione, checkpoint=checkpoint_tabella, previous=precedente
+                )
+                st.session_state["job_corrente"] = job_corrente
+                st.session_state["impronta_job"] = impronta
+                st.session_state["messaggi_job"] = messaggi_job
+                st.session_state.pop("esito", None)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+
+    if job_corrente is not None:
+        avanzamento_job(job_corrente)
+    elif "esito" in st.session_state:
+        mostra_esito(st.session_state["esito"])
+
+statistiche_cache = cache_risultati().stats()
+segnaposto_cache.caption(
+    f"⚡ Cache risultati: {statistiche_cache.hits} serviti, {statistiche_cache.misses} calcolati "
+    f"({statistiche_cache.hit_rate:.0%} dalla cache), {statistiche_cache.entries} in memoria, "
+    f"{statistiche_cache.size_bytes / (1024 * 1024):.1f} di {statistiche_cache.max_bytes / (1024 * 1024):.0f} MB"
+)
+
+# Verifica di un sistema caricato dall'utente
+st.markdown("---")
+with st.expander("🔍 Verifica un sistema"):
+    st.markdown("Carica un sistema, generato qui o proveniente da un'altra fonte, per controllare quanti "
+                "sottoinsiemi del pool sono davvero coperti dalle sue combinazioni.")
+    file_sistema = st.file_uploader(
+        "📂 File del sistema",
+        type=["csv", "txt", "gz", "xlsx", "parquet", "bin"],
+        key="verify_upload",
+        help="CSV/TXT o Excel con una combinazione per riga (le righe non numeriche sono ignorate), "
+             "oppure un file esportato da questa app in qualunque formato."
+    )
+    col_verifica1, col_verifica2, col_verifica3 = st.columns([3, 1, 1])
+    with col_verifica1:
+        pool_verifica_input = st.text_input(
+            "🎲 Pool di numeri (separati da virgola)",
+            "",
+            key="verify_pool_input",
+            help="Vuoto = il pool scritto nell'intestazione del file, se presente, altrimenti tutti i numeri "
+                 "che compaiono nelle combinazioni."
+        )
+    with col_verifica2:
+        garanzia_verifica = st.number_input("🎯 Garanzia", min_value=1, max_value=10, value=3,
+                                            key="verify_guarantee_input")
+    with col_verifica3:
+        condizione_verifica = st.number_input("🎲 Se estratti (m)", min_value=0, max_value=20, value=0,
+                                              key="verify_condition_input",
+                                              help="Per la garanzia condizionata 't se m'; 0 = garanzia semplice.")
+        condizione_verifica = condizione_verifica if condizione_verifica > garanzia_verifica else None
+
+    if st.button("🔍 Verifica sistema", disabled=file_sistema is None, key="verify_button"):
+        try:
+            header_sistema, combinazioni_sistema = read_combinations(file_sistema, file_sistema.name)
+            if not combinazioni_sistema:
+                raise ValueError("Nessuna combinazione trovata nel file.")
+            if pool_verifica_input.strip():
+                try:
+                    pool_verifica = [int(x.strip()) for x in pool_verifica_input.split(',') if x.strip()]
+                except ValueError:
+                    raise ValueError("Formato del pool non valido. Inserire numeri interi separati da virgola.")
+                origine_pool = "indicato"
+            elif "pool" in header_parameters(header_sistema):
+                pool_verifica = header_parameters(header_sistema)["pool"]
+                origine_pool = "dall'intestazione del file"
             else:
-                st.error("❌ Nessuna combinazione generata o ridotta con i parametri specificati. Prova a regolare i parametri o a disattivare i numeri fissi/garanzia se la lista iniziale è troppo piccola.")
-                
-        except Exception as e:
-            st.error(f"❌ *Errore durante la generazione:* {str(e)}")
-            st.info("💡 Prova a modificare i parametri e riprova. Assicurati che il 'Pool di numeri del sistema' sia sufficientemente grande rispetto alla 'Lunghezza combinazione'.")
+                pool_verifica = sorted({numero for combinazione in combinazioni_sistema for numero in combinazione})
+                origine_pool = "numeri presenti nel sistema"
+            rapporto = verify_cover(combinazioni_sistema, pool_verifica, garanzia_verifica,
+                                    condition_size=condizione_verifica)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+        else:
+            st.caption(f"Pool ({origine_pool}, {len(rapporto.pool)} numeri): {rapporto.pool}")
+            # Con la garanzia condizionata si contano i gruppi di m numeri estratti
+            etichetta_verifica = (f"{garanzia_verifica} se {condizione_verifica}" if condizione_verifica
+                                  else f"{garanzia_verifica}")
+            unita_verifica = "gruppi estratti" if condizione_verifica else "sottoinsiemi"
+            singolare_verifica = "gruppo estratto" if condizione_verifica else "sottoinsieme"
+
+            col_esito1, col_esito2, col_esito3 = st.columns(3)
+            with col_esito1:
+                st.metric("🎫 Combinazioni", f"{rapporto.combinations:,}")
+            with col_esito2:
+                st.metric(f"✅ {unita_verifica.capitalize()} coperti", f"{rapporto.covered:,} / {rapporto.required:,}")
+            with col_esito3:
+                st.metric("🕳 Non coperti", f"{rapporto.uncovered_fraction:.2%}")
+            if rapporto.complete:
+                st.success(f"✅ Garanzia {etichetta_verifica} confermata: ogni {singolare_verifica} del pool è coperto.")
+            else:
+                st.warning(f"⚠ Garanzia {etichetta_verifica} non rispettata: {rapporto.uncovered:,} {unita_verifica} "
+                           f"non coperti. Alcuni esempi:")
+                st.dataframe(
+                    pd.DataFrame(rapporto.holes, columns=[f'N{i+1}' for i in range(len(rapporto.holes[0]))]),
+                    use_container_width=True, hide_index=True
+                )
+            if rapporto.outside_numbers:
+                st.info(f"ℹ Numeri fuori dal pool, ignorati: {rapporto.outside_numbers}")
+            if rapporto.short_combinations:
+                st.info(f"ℹ {rapporto.short_combinations:,} combinazioni hanno meno di {garanzia_verifica} "
+                        "numeri del pool e non coprono nulla.")
 
 # Footer informativo
 st.markdown("---")
@@ -499,7 +762,7 @@ with st.expander("📖 Come Funziona l'Algoritmo"):
     *🎯 Algoritmo Greedy con Garanzia:*
     
     1. **Generazione Pool di Numeri del Sistema**: Il sistema crea un pool di numeri (`Numeri totali per il sistema`) mescolando i tuoi 'Numeri da includere nel pool' (fissi) con numeri casuali (rispettando il range e il filtro pari/dispari). Questo è il set di numeri di base da cui si estrarrà.
-    2. **Generazione Combinazioni Iniziali**: Da questo pool di numeri di base, vengono generate *tutte* le possibili combinazioni della 'Lunghezza combinazione' desiderata.
+    2. **Generazione Combinazioni Iniziali**: Da questo pool di numeri di base, vengono generate *tutte* le possibili combinazioni della 'Lunghezza combinazione' desiderata che rispettano gli eventuali vincoli sulle combinazioni.
     3. **Analisi dei Sottoinsiemi (Target Sets)**: Vengono calcolati tutti i sottoinsiemi (es. le terzine se la garanzia è 3) di dimensione 'Garanzia' presenti nelle combinazioni iniziali. Questi sono gli elementi che l'algoritmo cercherà di "coprire".
     4. **Ottimizzazione (Greedy)**: L'algoritmo seleziona un sottoinsieme di queste combinazioni iniziali. Ad ogni passo, sceglie la combinazione che "copre" il maggior numero di 'target sets' non ancora coperti. Questo si ripete fino a quando tutti i 'target sets' sono coperti o si raggiunge un limite massimo di combinazioni.
     5. **Risultato**: Il sistema ti fornisce il set di combinazioni ridotte che soddisfa la 'Garanzia' richiesta.
@@ -514,16 +777,26 @@ with st.expander("❓ Aiuto e Suggerimenti"):
     - **Range Min/Max**: L'intervallo da cui vengono pescati i numeri casuali per completare il pool.
     - **Lunghezza combinazione**: Quanti numeri per ogni combinazione finale (es. 5 numeri per il Lotto). Non può essere maggiore del 'Numeri totali per il sistema'.
     - **Garanzia**: Quanti numeri devono essere garantiti in comune. Deve essere minore o uguale della 'Lunghezza combinazione'. Se è uguale, il sistema garantirà la presenza delle combinazioni esatte.
+    - **Se estratti nel pool (m)**: Garanzia condizionata 't se m', come nei sistemi del lotto (es. 3 se 4, 4 se 6): ogni gruppo di m numeri del pool ha almeno 'Garanzia' numeri in una combinazione, quindi se m numeri estratti sono nel pool si fanno almeno 'Garanzia' punti. Servono molte meno combinazioni della garanzia semplice. Usa un motore dedicato, con un indice dai sottoinsiemi di 'Garanzia' numeri ai gruppi di m numeri che li contengono e valutazione pigra dei guadagni; il motore di calcolo scelto, la cache delle coperture, l'ottimizzazione locale e l'estensione del risultato precedente valgono solo per la garanzia semplice. 0 = garanzia semplice.
     
     *⚙ Parametri Avanzati:*
     - **Tipo di numeri da generare nel pool**: Filtra i numeri casuali del pool (es. solo pari o solo dispari).
     - **Numeri da includere nel pool (fissi)**: Questi numeri saranno sempre parte del tuo 'Pool di numeri del sistema'. Se indichi un numero sufficiente di fissi, non verranno aggiunti numeri casuali.
     - **Max combinazioni finali**: Limite massimo al numero di combinazioni finali generate. Utile per controllare la dimensione del risultato e il tempo di calcolo.
-    - **Seed per casualità**: Ti permette di riprodurre gli stessi risultati (relativi alla generazione del pool casuale) in diverse esecuzioni.
+    - **Seed per casualità**: Ti permette di riprodurre gli stessi risultati (relativi alla generazione del pool casuale) in diverse esecuzioni. Con un seed fissato il risultato viene anche conservato in memoria: la stessa richiesta, da qualunque sessione, viene servita all'istante.
+    - **Usa cache delle coperture**: Salva su disco la migliore copertura trovata per ogni combinazione di parametri e la riusa, rimappandola sul nuovo pool, quando cambiano solo i numeri.
+    - **Motore di calcolo**: Il greedy lazy mantiene i guadagni dei candidati in una coda a bucket e li aggiorna solo dopo ogni scelta; il greedy NumPy calcola i punteggi di tutti i candidati con operazioni vettoriali (entro il budget di memoria indicato); il greedy parallelo divide i candidati tra più processi che condividono la mappa di copertura; il greedy classico ricalcola tutto ad ogni passo. Il risultato è identico (a parità di copertura vince la combinazione che viene prima in ordine lessicografico). Il greedy per orbite invece fa ruotare i numeri del pool e sceglie ogni volta un'intera orbita di combinazioni ruotate, valutando circa una combinazione su v: il sistema ha qualche combinazione in più, ma si calcola anche per pool di 30-40 numeri con lunghezza 6 o più, dove gli altri motori non ci stanno in tempo e memoria. Il greedy campionato non valuta affatto tutte le combinazioni: ad ogni passo estrae un lotto di candidati ('Candidati per passo'), ognuno costruito attorno a un sottoinsieme ancora scoperto e completato con i numeri che compaiono in più sottoinsiemi scoperti, e sceglie il migliore. Memoria e tempo dipendono solo dai sottoinsiemi da garantire e dal lotto, quindi funziona anche per pool di 40 numeri con lunghezza 10; il sistema è più grande di quello del greedy esatto, la copertura raggiunta viene riportata alla fine e con lo stesso seed il risultato è identico.
+    - **Stima**: Prima di ogni generazione si stimano, dai soli parametri, le combinazioni candidate, i sottoinsiemi da garantire, la memoria e il tempo di ogni motore. Se il motore scelto supererebbe la memoria disponibile per una generazione se ne usa automaticamente uno più leggero; se nessuno ci sta, la generazione viene bloccata con una spiegazione.
+    - **Estendi il risultato precedente**: Quando aggiungi un numero fisso, aumenti di poco i numeri del sistema o alzi il limite di combinazioni, parte dal sistema appena calcolato: tiene le sue combinazioni e aggiunge solo quelle che servono per i sottoinsiemi nuovi (quelli che contengono i numeri aggiunti). Costa una frazione del calcolo completo, in cambio di qualche combinazione in più.
+    - **Vincoli sulle combinazioni**: Somma dei numeri, numero di pari, massimo di numeri consecutivi e massimo di numeri per decina di ogni combinazione. Non vengono applicati dopo aver generato tutte le combinazioni: la generazione scarta subito le combinazioni parziali che non possono più rispettarli. Il sistema contiene solo combinazioni valide e garantisce i sottoinsiemi contenuti in almeno una di esse (con i vincoli alcuni sottoinsiemi, ad es. tre numeri consecutivi, non possono essere coperti). I motori per orbite e campionato richiedono tutte le combinazioni del pool: con i vincoli si usa il greedy lazy; la cache delle coperture e l'estensione del risultato precedente non si applicano.
+    - **Curva di copertura**: Il motore registra la copertura raggiunta dopo ogni combinazione scelta, durante lo stesso calcolo. Il grafico mostra quanta garanzia si ottiene con ogni numero di combinazioni e il cursore 'Combinazioni da usare' tiene solo le prime, senza ricalcolare: è come aver impostato quel 'Max combinazioni finali'. La copertura raggiunta è riportata anche nei file esportati.
+    - **Ottimizzazione locale**: Dopo il greedy prova a togliere combinazioni per il numero di secondi indicato, scambiando numeri all'interno delle combinazioni finché la garanzia torna valida. Il risultato finale è sempre una copertura completa, mai più grande di quella greedy.
     
     *⚡ Performance:*
     - L'algoritmo greedy può essere intensivo per un numero molto elevato di combinazioni iniziali o di sottoinsiemi da coprire. Riduci il 'Pool di numeri del sistema' o la 'Lunghezza combinazione' se i tempi sono eccessivi.
     - Il 'Max combinazioni finali' può aiutare a controllare le performance.
+    - Ogni risultato viene verificato in modo indipendente dall'algoritmo prima di essere mostrato: il messaggio "Garanzia verificata" conferma che tutti i sottoinsiemi del pool sono coperti. Con **Verifica un sistema** puoi controllare allo stesso modo un sistema caricato da file.
+    - Ogni generazione gira in background in un pool di processi condiviso: la pagina resta reattiva, mostra l'avanzamento e il pulsante **Annulla** interrompe il calcolo. Ogni sessione può avere una sola generazione in corso alla volta; il risultato resta visibile finché non ne avvii un'altra.
     """)
 
 st.markdown("---")
@@ -0,0 +1,248 @@
+"""
+Benchmark della generazione e della riduzione su una griglia di parametri (v, k, t).
+
+Per ogni caso misura il tempo di ogni fase (generazione, sottoinsiemi target,
+selezione greedy), la memoria di picco e la dimensione della copertura finale,
+e scrive i risultati in JSON. Con `--baseline` li confronta con un file di
+riferimento e termina con codice 1 se un caso è peggiorato oltre la soglia.
+
+Ogni caso gira in un processo separato, così il picco di memoria (RSS) è quello
+del solo caso, e usa un seed fisso derivato dai suoi parametri.
+
+Esempi:
+
+    python benchmarks/bench.py                                   # griglia rapida, stampa i risultati
+    python benchmarks/bench.py --grid full -o risultati.json
+    python benchmarks/bench.py --baseline benchmarks/baseline.json --threshold 0.3
+    python benchmarks/bench.py --save-baseline benchmarks/baseline.json
+
+I tempi dipendono dalla macchina: il baseline va rigenerato sulla macchina su
+cui si fa il confronto. La dimensione della copertura invece è deterministica
+e non deve mai aumentare.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import zlib
+from datetime import datetime
+from math import comb
+
+try:
+    import resource
+except ImportError:  # non disponibile su Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from combinazioni import (
+    ProgressReporter,
+    build_number_pool,
+    generate_all_k_combinations_from_pool,
+    numpy_available,
+    reduce_combinations,
+)
+from combinazioni.greedy import PHASE_GREEDY, PHASE_TARGETS
+
+# Casi (v, k, t) delle griglie
+GRIDS = {
+    "quick": [(12, 5, 3), (15, 5, 3), (15, 6, 4), (18, 6, 3), (20, 5, 2), (20, 6, 3)],
+    "full": [(12, 5, 3), (15, 5, 3), (15, 6, 4), (18, 6, 3), (20, 5, 2), (20, 6, 3),
+             (22, 6, 3), (20, 7, 4), (24, 6, 4), (25, 5, 3)],
+}
+
+# Il greedy classico è quadratico: si misura solo fino a questo numero di candidati
+CLASSIC_MAX_CANDIDATES = 5000
+
+DEFAULT_THRESHOLD = 0.25
+# Sotto questa differenza assoluta (secondi) un tempo peggiore è considerato rumore
+MIN_TIME_DELTA = 0.05
+RANGE_MIN, RANGE_MAX = 1, 90
+
+
+class PhaseTimer(ProgressReporter):
+    """Registra l'istante della prima notifica di ogni fase."""
+
+    def __init__(self):
+        self.started = {}
+
+    def progress(self, phase, fraction):
+        self.started.setdefault(phase, time.perf_counter())
+
+
+def case_key(v, k, t, engine):
+    return f"v{v}_k{k}_t{t}_{engine}"
+
+
+def case_seed(v, k, t):
+    """Seed fisso del caso: non dipende dal motore, così i motori vedono lo stesso pool."""
+    return zlib.crc32(f"{v}-{k}-{t}".encode()) or 1
+
+
+def build_cases(grid, engines):
+    cases = []
+    for v, k, t in GRIDS[grid]:
+        for engine in engines:
+            if engine == "classic" and comb(v, k) > CLASSIC_MAX_CANDIDATES:
+                continue
+            cases.append({"v": v, "k": k, "t": t, "engine": engine})
+    return cases
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss è in KB su Linux e in byte su macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_case(case, trace_memory=False):
+    """Esegue un caso e restituisce le misure. Pensata per un processo dedicato."""
+    v, k, t, engine = case["v"], case["k"], case["t"], case["engine"]
+    seed = case_seed(v, k, t)
+    rng = random.Random(seed)
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    pool = build_number_pool(RANGE_MIN, RANGE_MAX, v, rng=rng)
+    full_combinations = generate_all_k_combinations_from_pool(pool, k)
+    generated = time.perf_counter()
+
+    timer = PhaseTimer()
+    result = reduce_combinations(full_combinations, t, engine=engine, reporter=timer, rng=rng)
+    end = time.perf_counter()
+
+    greedy_start = timer.started.get(PHASE_GREEDY, end)
+    times = {
+        "generate": generated - start,
+        PHASE_TARGETS: greedy_start - generated,
+        PHASE_GREEDY: end - greedy_start,
+    }
+    measures = {
+        "case": case_key(v, k, t, engine),
+        "v": v, "k": k, "t": t, "engine": engine, "engine_used": result.engine, "seed": seed,
+        "candidates": len(full_combinations),
+        "times": {phase: round(seconds, 4) for phase, seconds in times.items()},
+        "total": round(end - start, 4),
+        "cover_size": len(result.selected),
+        "candidates_scanned": result.stats.get("candidates_scanned"),
+        "covered": result.covered,
+        "required": result.required,
+        "stop_reason": result.stop_reason,
+        "peak_rss_mb": _peak_rss_mb(),
+        "peak_tracemalloc_mb": None,
+    }
+    if trace_memory:
+        measures["peak_tracemalloc_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        tracemalloc.stop()
+    return measures
+
+
+def run_suite(cases, repeat=1, trace_memory=False):
+    """
+    Esegue i casi, ognuno in un processo nuovo, tenendo il tempo migliore su `repeat` ripetizioni.
+
+    La memoria tracciata con tracemalloc rallenta l'esecuzione: in quel caso
+    viene misurata in un'esecuzione aggiuntiva, esclusa dai tempi.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with context.Pool(processes=1, maxtasksperchild=1) as pool:
+        for case in cases:
+            runs = [pool.apply(run_case, (case,)) for _ in range(repeat)]
+            best = min(runs, key=lambda measures: measures["total"])
+            best["peak_rss_mb"] = max((r["peak_rss_mb"] for r in runs if r["peak_rss_mb"] is not None), default=None)
+            if trace_memory:
+                best["peak_tracemalloc_mb"] = pool.apply(run_case, (case, True))["peak_tracemalloc_mb"]
+            print(f"{best['case']:<24} {best['candidates']:>9,} candidati  {best['total']:>8.3f}s  "
+                  f"copertura {best['cover_size']:>6,}  RSS {best['peak_rss_mb']} MB", flush=True)
+            results.append(best)
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Confronta i risultati con il baseline.
+
+    È una regressione un tempo totale o un picco di memoria oltre `1 + threshold`
+    volte il baseline (per i tempi, anche oltre MIN_TIME_DELTA secondi), oppure
+    una copertura più grande.
+
+    Returns:
+        list: Le descrizioni delle regressioni (vuota se nessuna).
+    """
+    reference = {entry["case"]: entry for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        base = reference.get(entry["case"])
+        if base is None:
+            continue
+        name = entry["case"]
+        if entry["cover_size"] > base["cover_size"]:
+            regressions.append(f"{name}: copertura {base['cover_size']} -> {entry['cover_size']}")
+        if entry["total"] > base["total"] * (1 + threshold) and entry["total"] - base["total"] > MIN_TIME_DELTA:
+            regressions.append(f"{name}: tempo {base['total']:.3f}s -> {entry['total']:.3f}s")
+        for metric in ("peak_rss_mb", "peak_tracemalloc_mb"):
+            if entry.get(metric) is not None and base.get(metric) is not None:
+                if entry[metric] > base[metric] * (1 + threshold):
+                    regressions.append(f"{name}: {metric} {base[metric]} -> {entry[metric]}")
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark di generazione e riduzione delle combinazioni.")
+    parser.add_argument("--grid", choices=sorted(GRIDS), default="quick", help="Griglia di casi (predefinita: quick).")
+    parser.add_argument("--engines", nargs="+", default=None,
+                        help="Motori da misurare (predefiniti: classic, lazy e numpy se disponibile).")
+    parser.add_argument("--repeat", type=int, default=1, help="Ripetizioni per caso; si tiene la più veloce.")
+    parser.add_argument("--tracemalloc", action="store_true", help="Misura anche il picco di memoria Python con tracemalloc.")
+    parser.add_argument("-o", "--output", help="File JSON dei risultati.")
+    parser.add_argument("--baseline", help="File JSON di riferimento con cui confrontare i risultati.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Peggioramento relativo tollerato di tempo e memoria (predefinito: 0.25).")
+    parser.add_argument("--save-baseline", help="Salva i risultati come nuovo baseline in questo file.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    engines = args.engines or (["classic", "lazy"] + (["numpy"] if numpy_available() else []))
+    results = run_suite(build_cases(args.grid, engines), repeat=args.repeat, trace_memory=args.tracemalloc)
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "grid": args.grid,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(report, file, indent=2)
+                file.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        if regressions:
+            print("\nRegressioni rispetto al baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("\nNessuna regressione rispetto al baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+Nucleo di calcolo del Generatore di Combinazioni.
+
+Il pacchetto non dipende da Streamlit: contiene solo la logica combinatoria,
+così da poter essere riusato anche fuori dall'interfaccia web.
+"""
+
+from .conditional import (
+    MAX_CONDITIONAL_INDEX,
+    condition_gain_bound,
+    conditional_index_entries,
+    greedy_conditional,
+)
+from .constraints import TicketConstraints, constrained_ranks, iter_constrained
+from .cover_cache import DEFAULT_CACHE_MAX_BYTES, CoverCache, cached_reduce
+from .engines import ENGINES, EXACT_ENGINES, RANDOMIZED_ENGINES
+from .export import (
+    EXPORT_FORMATS,
+    build_header_info,
+    csv_text,
+    excel_bytes,
+    export_to_tempfile,
+    header_parameters,
+    iter_binary,
+    parquet_available,
+    read_binary,
+    read_combinations,
+    result_filename,
+    write_binary,
+    write_csv,
+    write_csv_gzip,
+    write_excel,
+    write_export,
+    write_parquet,
+)
+from .generation import (
+    DEFAULT_CHUNK_SIZE,
+    generate_all_k_combinations_from_pool,
+    iter_k_combinations_from_pool,
+    normalize_pool,
+)
+from .greedy import (
+    STOP_COMPLETE,
+    STOP_EXHAUSTED,
+    STOP_LIMIT,
+    STOP_NO_GAIN,
+    GreedyResult,
+    greedy_classic,
+    greedy_lazy,
+    record_gains,
+)
+from .incremental import extend_cover
+from .instrumentation import Instrumentation, PhaseMetrics
+from .jobs import (
+    JOB_CANCELLED,
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JobCancelled,
+    JobManager,
+    JobStatus,
+)
+from .local_search import PHASE_LOCAL_SEARCH, improve_cover
+from .numpy_backend import DEFAULT_NUMPY_MEMORY_BUDGET, greedy_numpy, numpy_available
+from .orbit import greedy_orbit, orbit_members, orbit_representatives
+from .parallel import default_workers, greedy_parallel
+from .pool import (
+    PARITY_ALL,
+    PARITY_EVEN,
+    PARITY_LABELS,
+    PARITY_ODD,
+    build_number_pool,
+    extend_number_pool,
+    sampling_candidates,
+    valid_fixed_numbers,
+    validate_pool_parameters,
+)
+from .preflight import (
+    FALLBACK_ENGINES,
+    MEMORY_LIMIT_ENV,
+    EngineEstimate,
+    PreflightReport,
+    default_memory_limit,
+    estimate_conditional,
+    estimate_conditional_size,
+    estimate_cover_size,
+    estimate_engine,
+    format_bytes,
+    format_seconds,
+    preflight,
+    schonheim_bound,
+)
+from .progress import LoggingReporter, ProgressReporter
+from .ranking import (
+    RankedCombinations,
+    SubsetRanker,
+    rank_colex,
+    rank_lex,
+    unrank_colex,
+    unrank_lex,
+)
+from .reduction import (
+    optimize_cover,
+    reduce_combinations,
+    reduce_combinations_with_guarantee_greedy,
+    verify_result,
+)
+from .result_cache import (
+    DEFAULT_RESULT_CACHE_MAX_BYTES,
+    CacheStats,
+    ResultCache,
+    cacheable,
+    config_fingerprint,
+    estimate_outcome_bytes,
+)
+from .runner import RunConfig, RunOutcome, budget_outcome, extension_errors, run
+from .sampled import DEFAULT_BATCH_SIZE, MAX_SAMPLED_UNIVERSE, greedy_sampled
+from .verify import MAX_VERIFY_UNIVERSE, GuaranteeError, VerificationReport, confirm_result, verify_cover
+
+__all__ = [
+    "MAX_CONDITIONAL_INDEX",
+    "condition_gain_bound",
+    "conditional_index_entries",
+    "greedy_conditional",
+    "TicketConstraints",
+    "constrained_ranks",
+    "iter_constrained",
+    "DEFAULT_CACHE_MAX_BYTES",
+    "CoverCache",
+    "cached_reduce",
+    "ENGINES",
+    "EXACT_ENGINES",
+    "RANDOMIZED_ENGINES",
+    "EXPORT_FORMATS",
+    "build_header_info",
+    "csv_text",
+    "excel_bytes",
+    "export_to_tempfile",
+    "header_parameters",
+    "iter_binary",
+    "parquet_available",
+    "read_binary",
+    "read_combinations",
+    "result_filename",
+    "write_binary",
+    "write_csv",
+    "write_csv_gzip",
+    "write_excel",
+    "write_export",
+    "write_parquet",
+    "DEFAULT_CHUNK_SIZE",
+    "generate_all_k_combinations_from_pool",
+    "iter_k_combinations_from_pool",
+    "normalize_pool",
+    "STOP_COMPLETE",
+    "STOP_EXHAUSTED",
+    "STOP_LIMIT",
+    "STOP_NO_GAIN",
+    "GreedyResult",
+    "greedy_classic",
+    "greedy_lazy",
+    "record_gains",
+    "extend_cover",
+    "Instrumentation",
+    "PhaseMetrics",
+    "JOB_CANCELLED",
+    "JOB_DONE",
+    "JOB_FAILED",
+    "JOB_QUEUED",
+    "JOB_RUNNING",
+    "JobCancelled",
+    "JobManager",
+    "JobStatus",
+    "PHASE_LOCAL_SEARCH",
+    "improve_cover",
+    "DEFAULT_NUMPY_MEMORY_BUDGET",
+    "greedy_numpy",
+    "numpy_available",
+    "greedy_orbit",
+    "orbit_members",
+    "orbit_representatives",
+    "default_workers",
+    "greedy_parallel",
+    "PARITY_ALL",
+    "PARITY_EVEN",
+    "PARITY_LABELS",
+    "PARITY_ODD",
+    "build_number_pool",
+    "extend_number_pool",
+    "sampling_candidates",
+    "valid_fixed_numbers",
+    "validate_pool_parameters",
+    "FALLBACK_ENGINES",
+    "MEMORY_LIMIT_ENV",
+    "EngineEstimate",
+    "PreflightReport",
+    "default_memory_limit",
+    "estimate_conditional",
+    "estimate_conditional_size",
+    "estimate_cover_size",
+    "estimate_engine",
+    "format_bytes",
+    "format_seconds",
+    "preflight",
+    "schonheim_bound",
+    "LoggingReporter",
+    "ProgressReporter",
+    "RankedCombinations",
+    "SubsetRanker",
+    "rank_colex",
+    "rank_lex",
+    "unrank_colex",
+    "unrank_lex",
+    "optimize_cover",
+    "reduce_combinations",
+    "reduce_combinations_with_guarantee_greedy",
+    "verify_result",
+    "DEFAULT_RESULT_CACHE_MAX_BYTES",
+    "CacheStats",
+    "ResultCache",
+    "cacheable",
+    "config_fingerprint",
+    "estimate_outcome_bytes",
+    "RunConfig",
+    "RunOutcome",
+    "budget_outcome",
+    "extension_errors",
+    "run",
+    "DEFAULT_BATCH_SIZE",
+    "MAX_SAMPLED_UNIVERSE",
+    "greedy_sampled",
+    "MAX_VERIFY_UNIVERSE",
+    "GuaranteeError",
+    "VerificationReport",
+    "confirm_result",
+    "verify_cover",
+]
@@ -0,0 +1,202 @@
+"""
+Esecuzione batch da riga di comando, senza Streamlit.
+
+Legge un file JSON o YAML con una lista di configurazioni (vedi `RunConfig`),
+le elabora in parallelo su più processi e scrive per ognuna un file per ogni
+formato richiesto (CSV, CSV compresso, Parquet, binario, Excel) nella cartella
+di output, più un `summary.json` riassuntivo.
+
+Esempio:
+
+    python -m combinazioni configs.json --output-dir risultati --jobs 8
+
+con `configs.json`:
+
+    [
+        {"name": "lotto15", "range_min": 1, "range_max": 90, "pool_size": 15,
+         "k": 5, "guarantee": 3, "fixed_numbers": [7, 21], "parity": "all", "seed": 42}
+    ]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .cover_cache import CoverCache
+from .export import EXPORT_FORMATS, write_export
+from .instrumentation import Instrumentation
+from .progress import LoggingReporter
+from .runner import RunConfig, run
+
+logger = logging.getLogger("combinazioni")
+
+# "both" è la combinazione storica CSV + Excel
+FORMATS = tuple(EXPORT_FORMATS) + ("both",)
+
+
+def expand_formats(formats):
+    """Espande "both" e rimuove i doppioni, mantenendo l'ordine."""
+    expanded = []
+    for export_format in formats:
+        expanded.extend(("csv", "xlsx") if export_format == "both" else (export_format,))
+    return list(dict.fromkeys(expanded))
+
+
+def load_configs(path):
+    """
+    Legge la lista di configurazioni da un file JSON o YAML.
+
+    Il file può contenere una lista di configurazioni oppure un oggetto con
+    la chiave "configs".
+
+    Returns:
+        list: Le `RunConfig`, con un nome assegnato a quelle che non ne hanno.
+
+    Raises:
+        ValueError: Se il file non è valido o se serve PyYAML e non è installato.
+    """
+    with open(path, encoding="utf-8") as file:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("Per leggere file YAML è necessario installare PyYAML.")
+            data = yaml.safe_load(file)
+        else:
+            data = json.load(file)
+
+    if isinstance(data, dict):
+        data = data.get("configs")
+    if not isinstance(data, list):
+        raise ValueError("Il file deve contenere una lista di configurazioni.")
+
+    configs = []
+    for index, item in enumerate(data, start=1):
+        config = RunConfig.from_dict(item)
+        if not config.name:
+            config.name = f"config_{index:03d}"
+        configs.append(config)
+    names = [config.name for config in configs]
+    if len(set(names)) != len(names):
+        raise ValueError("I nomi delle configurazioni devono essere univoci.")
+    return configs
+
+
+def _run_one(config, output_dir, output_formats, use_cache, trace_memory=False, profile=False):
+    # Eseguita in un processo separato: scrive i file e restituisce solo il riepilogo
+    start = time.perf_counter()
+    cover_cache = CoverCache() if use_cache else None
+    files = []
+    with Instrumentation(track_memory=trace_memory, profile=profile) as instrumentation:
+        outcome = run(config, reporter=LoggingReporter(logger, prefix=config.name), cover_cache=cover_cache,
+                      instrumentation=instrumentation)
+        for export_format in output_formats:
+            extension, _ = EXPORT_FORMATS[export_format]
+            path = os.path.join(output_dir, f"{config.name}.{extension}")
+            with instrumentation.phase(f"Esportazione {export_format}"), open(path, "wb") as file:
+                write_export(file, export_format, outcome.header_info, outcome.combinations, config.k,
+                             max(outcome.pool))
+            files.append(path)
+    if profile:
+        path = os.path.join(output_dir, f"{config.name}.pstats")
+        instrumentation.dump_profile(path)
+        files.append(path)
+    return {
+        "name": config.name,
+        "config": outcome.config.to_dict(),
+        "pool": outcome.pool,
+        "full_combinations": outcome.full_count,
+        "final_combinations": len(outcome.combinations),
+        "covered": outcome.result.covered,
+        "required": outcome.result.required,
+        "stop_reason": outcome.result.stop_reason,
+        "engine": outcome.result.engine,
+        "verified": None if outcome.verification is None else outcome.verification.complete,
+        "seconds": round(time.perf_counter() - start, 3),
+        "diagnostics": instrumentation.rows(),
+        "files": files,
+    }
+
+
+def run_batch(configs, output_dir, jobs=None, output_formats=("csv",), use_cache=True, trace_memory=False,
+              profile=False):
+    """
+    Elabora le configurazioni in parallelo e scrive i risultati in `output_dir`.
+
+    Args:
+        configs (list): Le `RunConfig` da eseguire.
+        output_dir (str): Cartella di output (creata se non esiste).
+        jobs (int, optional): Numero di processi; predefinito il numero di core.
+        output_formats (sequence): Formati da scrivere (chiavi di `EXPORT_FORMATS` o "both").
+        use_cache (bool): Se usare la cache persistente delle coperture.
+        trace_memory (bool): Se misurare il picco di memoria di ogni fase (più lento).
+        profile (bool): Se salvare un profilo cProfile `<nome>.pstats` per configurazione.
+
+    Returns:
+        list: Un riepilogo per configurazione, nello stesso ordine di `configs`;
+        le configurazioni fallite hanno la chiave "error".
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    output_formats = expand_formats(output_formats)
+    summaries = {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(_run_one, config, output_dir, output_formats, use_cache,
+                                   trace_memory, profile): config
+                   for config in configs}
+        for future in as_completed(futures):
+            config = futures[future]
+            try:
+                summaries[config.name] = future.result()
+                logger.info("[%s] %d combinazioni finali", config.name, summaries[config.name]["final_combinations"])
+            except Exception as e:
+                logger.error("[%s] Errore: %s", config.name, e)
+                summaries[config.name] = {"name": config.name, "config": config.to_dict(), "error": str(e)}
+
+    ordered = [summaries[config.name] for config in configs]
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as file:
+        json.dump(ordered, file, indent=2, ensure_ascii=False)
+    return ordered
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m combinazioni",
+        description="Genera in batch sistemi di combinazioni con garanzia, senza interfaccia web.",
+    )
+    parser.add_argument("configs", help="File JSON o YAML con la lista delle configurazioni.")
+    parser.add_argument("-o", "--output-dir", default="output", help="Cartella dei risultati (predefinita: output).")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Processi in parallelo (predefinito: numero di core).")
+    parser.add_argument("-f", "--format", choices=FORMATS, action="append", dest="formats",
+                        help="Formato dei file di output, ripetibile (predefinito: csv).")
+    parser.add_argument("--no-cache", action="store_true", help="Non usare la cache persistente delle coperture.")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Misura il picco di memoria di ogni fase con tracemalloc (più lento).")
+    parser.add_argument("--profile", action="store_true",
+                        help="Salva per ogni configurazione un profilo cProfile (<nome>.pstats).")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostra anche l'avanzamento delle fasi.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s")
+    try:
+        configs = load_configs(args.configs)
+    except (OSError, ValueError) as e:
+        logger.error("Impossibile leggere le configurazioni: %s", e)
+        return 2
+
+    summaries = run_batch(configs, args.output_dir, jobs=args.jobs, output_formats=args.formats or ["csv"],
+                          use_cache=not args.no_cache, trace_memory=args.trace_memory, profile=args.profile)
+    failed = sum(1 for summary in summaries if "error" in summary)
+    logger.info("Completate %d configurazioni su %d. Risultati in %s", len(summaries) - failed,
+                len(summaries), args.output_dir)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
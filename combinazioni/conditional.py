@@ -0,0 +1,299 @@
+"""
+Garanzia condizionata "t se m": greedy sugli m-sottoinsiemi del pool.
+
+Con la garanzia semplice ogni t-sottoinsieme del pool deve stare in una
+combinazione. I sistemi del lotto si esprimono invece come "t punti se m dei
+numeri estratti sono nel pool" (es. 3 se 4, 4 se 6): l'universo da coprire è
+quello degli m-sottoinsiemi del pool e un m-sottoinsieme è coperto se una
+combinazione scelta ha almeno t numeri in comune con esso, cioè se contiene
+uno dei suoi t-sottoinsiemi. Con m = t è la garanzia semplice; con m > t
+bastano molte meno combinazioni.
+
+Strutture:
+
+- indice inverso t-sottoinsieme -> m-sottoinsiemi che lo contengono: ogni
+  t-sottoinsieme ne ha esattamente C(v-t, m-t), quindi l'indice è una tabella
+  densa di C(v, t) righe (costruita in blocco con NumPy, se disponibile);
+- contatori incrementali `uncovered[T]` degli m-sottoinsiemi scoperti che
+  contengono T, aggiornati solo per gli m-sottoinsiemi appena coperti;
+- coda a bucket con valutazione pigra (CELF): il guadagno di un candidato
+  può solo diminuire, quindi il valore con cui è in coda è un limite
+  superiore. Si estraggono a blocchi i candidati col limite più alto e per
+  ognuno si prova prima il limite economico (somma dei contatori dei suoi
+  t-sottoinsiemi, calcolata in blocco dalla tabella candidato -> rank dei
+  t-sottoinsiemi); solo se non basta a scartarlo si conta il guadagno esatto
+  sull'indice. Se è ancora il migliore viene scelto, altrimenti torna in coda
+  con il nuovo valore.
+
+A parità di guadagno vince, come negli altri motori, il candidato che
+compare per primo nello spazio.
+"""
+
+import heapq
+from array import array
+from itertools import combinations
+from math import comb
+
+from .greedy import (
+    PHASE_GREEDY,
+    PHASE_TARGETS,
+    STOP_EXHAUSTED,
+    STOP_LIMIT,
+    STOP_NO_GAIN,
+    GreedyResult,
+    build_subset_table,
+    rank_typecode,
+)
+from .numpy_backend import _incidence_table, binomial_table, np, subset_rank_matrix, unrank_colex_matrix
+from .ranking import RankedCombinations, SubsetRanker, rank_colex, unrank_colex
+
+# Voci massime dell'indice inverso, C(v, m) · C(m, t)
+MAX_CONDITIONAL_INDEX = 1 << 26
+
+# m-sottoinsiemi elaborati per blocco nella costruzione con NumPy
+CONDITIONAL_CHUNK_SIZE = 1 << 16
+
+# Candidati estratti insieme dalla coda per il calcolo del limite economico
+POP_BLOCK_SIZE = 1024
+
+
+def condition_gain_bound(pool_size, k, guarantee_size, condition_size):
+    """
+    m-sottoinsiemi del pool coperti da una sola combinazione: quelli con almeno t numeri in comune.
+
+    È il guadagno di ogni candidato all'inizio e quindi il limite superiore di partenza.
+    """
+    return sum(comb(k, j) * comb(pool_size - k, condition_size - j)
+               for j in range(guarantee_size, min(k, condition_size) + 1))
+
+
+def conditional_index_entries(pool_size, guarantee_size, condition_size):
+    """Voci dell'indice inverso t-sottoinsieme -> m-sottoinsiemi, C(v, m) · C(m, t)."""
+    return comb(pool_size, condition_size) * comb(condition_size, guarantee_size)
+
+
+class _PythonIndex:
+    # Indice in un `array` piatto: gli m-sottoinsiemi che contengono il t-sottoinsieme r
+    # sono rows[r*stride:(r+1)*stride]. Tiene anche la tabella dei rank dei t-sottoinsiemi
+    # dei candidati (`build_subset_table`), da cui si calcolano i limiti economici.
+
+    def __init__(self, space, guarantee_size, condition_size, progress):
+        pool_size = len(space.pool)
+        self.table, self.table_stride, _, _ = build_subset_table(space, guarantee_size)
+        self.condition_size = condition_size
+        self.ranker = SubsetRanker(pool_size, condition_size, guarantee_size)
+        self.stride = comb(pool_size - guarantee_size, condition_size - guarantee_size)
+        self.universe = comb(pool_size, condition_size)
+        self.rows = array(rank_typecode(self.universe), [0]) * (self.ranker.count * self.stride)
+        fill = array("q", range(0, self.ranker.count * self.stride, self.stride))
+        update_interval = max(1, self.universe // 100)
+        for done, subset in enumerate(combinations(range(pool_size), condition_size), start=1):
+            subset_rank = rank_colex(subset)
+            for target in self.ranker.ranks(subset):
+                self.rows[fill[target]] = subset_rank
+                fill[target] += 1
+            if progress is not None and (done % update_interval == 0 or done == self.universe):
+                progress(PHASE_TARGETS, done / self.universe)
+        self.covered = bytearray(self.universe)
+        self.uncovered = array("q", [self.stride]) * self.ranker.count
+
+    def row(self, position):
+        return self.table[position * self.table_stride:(position + 1) * self.table_stride]
+
+    def restrict(self):
+        # Solo gli m-sottoinsiemi che contengono un t-sottoinsieme presente nei candidati sono da coprire
+        present = bytearray(self.ranker.count)
+        for target in self.table:
+            present[target] = 1
+        reachable = bytearray(self.universe)
+        for target, flag in enumerate(present):
+            if flag:
+                for subset_rank in self.rows[target * self.stride:(target + 1) * self.stride]:
+                    reachable[subset_rank] = 1
+        for subset_rank, flag in enumerate(reachable):
+            if not flag:
+                self.covered[subset_rank] = 1
+        for target in range(self.ranker.count):
+            self.uncovered[target] = sum(1 for subset_rank in self.rows[target * self.stride:(target + 1) * self.stride]
+                                         if not self.covered[subset_rank])
+        return self.universe - reachable.count(0)
+
+    def bounds(self, positions):
+        uncovered = self.uncovered
+        return [sum(uncovered[target] for target in self.row(position)) for position in positions]
+
+    def pending(self, ranks):
+        covered = self.covered
+        rows = self.rows
+        stride = self.stride
+        found = set()
+        for target in ranks:
+            if self.uncovered[target]:
+                found.update(subset_rank for subset_rank in rows[target * stride:(target + 1) * stride]
+                             if not covered[subset_rank])
+        return found
+
+    def cover(self, subset_ranks):
+        uncovered = self.uncovered
+        for subset_rank in subset_ranks:
+            self.covered[subset_rank] = 1
+            for target in self.ranker.ranks(unrank_colex(subset_rank, self.condition_size)):
+                uncovered[target] -= 1
+
+
+class _NumpyIndex:
+    # Come `_PythonIndex`, con l'indice in una matrice (C(v, t), stride) costruita in blocco:
+    # rank dei t-sottoinsiemi di tutti gli m-sottoinsiemi, poi ordinamento stabile per t-sottoinsieme.
+    # La tabella dei candidati è quella del backend NumPy, (C(v, k), C(k, t)).
+
+    def __init__(self, space, guarantee_size, condition_size, progress):
+        pool_size = len(space.pool)
+        self.table = _incidence_table(space, guarantee_size)
+        self.condition_size = condition_size
+        self.guarantee_size = guarantee_size
+        count = comb(pool_size, guarantee_size)
+        self.stride = comb(pool_size - guarantee_size, condition_size - guarantee_size)
+        self.universe = comb(pool_size, condition_size)
+        self.binomials = binomial_table(pool_size, max(guarantee_size, condition_size))
+        dtype = np.int32 if self.universe < 2 ** 31 else np.int64
+        per_subset = comb(condition_size, guarantee_size)
+        targets = np.empty(self.universe * per_subset, dtype=np.int32 if count < 2 ** 31 else np.int64)
+        for start in range(0, self.universe, CONDITIONAL_CHUNK_SIZE):
+            stop = min(start + CONDITIONAL_CHUNK_SIZE, self.universe)
+            subsets = unrank_colex_matrix(np.arange(start, stop), condition_size, self.binomials)
+            ranks = subset_rank_matrix(subsets, guarantee_size, self.binomials)
+            targets[start * per_subset:stop * per_subset] = ranks.ravel()
+            if progress is not None:
+                progress(PHASE_TARGETS, 0.5 * stop / self.universe)
+        # Voce i -> m-sottoinsieme i // per_subset: l'ordinamento stabile per t-sottoinsieme dà le righe
+        order = np.argsort(targets, kind="stable")
+        del targets
+        self.rows = (order // per_subset).astype(dtype).reshape(count, self.stride)
+        del order
+        if progress is not None:
+            progress(PHASE_TARGETS, 1.0)
+        self.covered = np.zeros(self.universe, dtype=np.uint8)
+        self.uncovered = np.full(count, self.stride, dtype=np.int64)
+        # Per contare i valori distinti senza ordinarli: ogni voce scrive un timbro nuovo e
+        # sopravvive solo l'ultima scrittura di ogni m-sottoinsieme
+        self.stamps = np.full(self.universe, -1, dtype=np.int64)
+        self.clock = 0
+
+    def row(self, position):
+        return self.table[position]
+
+    def restrict(self):
+        present = np.zeros(self.uncovered.shape[0], dtype=bool)
+        present[self.table.ravel()] = True
+        reachable = np.zeros(self.universe, dtype=bool)
+        reachable[self.rows[present].ravel()] = True
+        self.covered[~reachable] = 1
+        self.uncovered = self.stride - self.covered[self.rows].sum(axis=1, dtype=np.int64)
+        return int(reachable.sum())
+
+    def bounds(self, positions):
+        return self.uncovered[self.table[positions]].sum(axis=1).tolist()
+
+    def pending(self, ranks):
+        ranks = ranks[self.uncovered[ranks] > 0]
+        values = self.rows[ranks].ravel()
+        values = values[self.covered[values] == 0]
+        stamps = np.arange(self.clock, self.clock + values.shape[0])
+        self.clock += values.shape[0]
+        self.stamps[values] = stamps
+        return values[self.stamps[values] == stamps]
+
+    def cover(self, subset_ranks):
+        self.covered[subset_ranks] = 1
+        subsets = unrank_colex_matrix(subset_ranks, self.condition_size, self.binomials)
+        np.subtract.at(self.uncovered, subset_rank_matrix(subsets, self.guarantee_size, self.binomials).ravel(), 1)
+
+
+def greedy_conditional(full_combinations, guarantee_size, condition_size, max_combinations=None, progress=None):
+    """
+    Greedy per la garanzia "t se m": copre ogni m-sottoinsieme del pool con una combinazione
+    che abbia almeno t numeri in comune con esso.
+
+    Args:
+        full_combinations (sequence): Combinazioni candidate (tuple ordinate o `RankedCombinations`).
+        guarantee_size (int): Numeri garantiti t.
+        condition_size (int): Numeri estratti nel pool m (m >= t).
+        max_combinations (int, optional): Limite massimo di combinazioni da selezionare.
+        progress (callable, optional): Callback `progress(fase, frazione)`.
+
+    Returns:
+        GreedyResult: La selezione; `covered` e `required` contano gli m-sottoinsiemi.
+
+    Raises:
+        ValueError: Se m non è tra t e la dimensione del pool o l'indice sarebbe troppo grande.
+    """
+    space = RankedCombinations.from_combinations(full_combinations)
+    pool_size = len(space.pool)
+    k = space.k
+    if not guarantee_size <= condition_size <= pool_size:
+        raise ValueError(f"I numeri estratti nel pool ({condition_size}) devono essere almeno quelli garantiti "
+                         f"({guarantee_size}) e al massimo i numeri del pool ({pool_size}).")
+    entries = conditional_index_entries(pool_size, guarantee_size, condition_size)
+    if entries > MAX_CONDITIONAL_INDEX:
+        raise ValueError(f"Indice della garanzia condizionata troppo grande ({entries:,} voci): il massimo è "
+                         f"{MAX_CONDITIONAL_INDEX:,}.")
+
+    index = (_NumpyIndex if np is not None else _PythonIndex)(space, guarantee_size, condition_size, progress)
+    required = index.universe if space.is_complete else index.restrict()
+
+    result = GreedyResult(space=space, required=required, engine="conditional")
+    num_candidates = len(space)
+    # buckets[g]: heap delle posizioni dei candidati con limite superiore g; all'inizio tutti hanno
+    # lo stesso limite e la lista ordinata è già un heap
+    top = condition_gain_bound(pool_size, k, guarantee_size, condition_size)
+    buckets = [[] for _ in range(top + 1)]
+    buckets[top] = list(range(num_candidates))
+    remaining = num_candidates
+    scanned = 0
+    evaluations = 0
+
+    while result.covered < result.required and remaining:
+        best_index = None
+        while top > 0 and best_index is None:
+            heap = buckets[top]
+            if not heap:
+                top -= 1
+                continue
+            positions = [heapq.heappop(heap) for _ in range(min(POP_BLOCK_SIZE, len(heap)))]
+            scanned += len(positions)
+            # Limite economico: conta più volte gli m-sottoinsiemi con più di t numeri in comune
+            for position, gain in zip(positions, index.bounds(positions)):
+                if gain >= top and best_index is None:
+                    evaluations += 1
+                    pending = index.pending(index.row(position))
+                    gain = len(pending)
+                    if gain >= top:
+                        best_index = position
+                        continue
+                # Torna in coda con il limite migliore noto (i candidati dopo la scelta non vengono valutati)
+                heapq.heappush(buckets[min(gain, top)], position)
+
+        if best_index is None:
+            result.stop_reason = STOP_NO_GAIN
+            break
+
+        remaining -= 1
+        result.selected.append(best_index)
+        index.cover(pending)
+        result.covered += len(pending)
+        result.gains.append(len(pending))
+        if progress is not None:
+            progress(PHASE_GREEDY, result.covered / result.required)
+
+        if max_combinations is not None and len(result.selected) >= max_combinations:
+            if result.covered < result.required:
+                result.stop_reason = STOP_LIMIT
+            break
+    else:
+        if result.covered < result.required:
+            result.stop_reason = STOP_EXHAUSTED
+
+    result.stats["candidates_scanned"] = scanned
+    result.stats["gain_evaluations"] = evaluations
+    result.stats["condition"] = condition_size
+    return result
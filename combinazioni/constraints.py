@@ -0,0 +1,241 @@
+"""
+Vincoli sulle singole combinazioni, applicati durante la generazione.
+
+I filtri riguardano la combinazione e non il pool: somma dei numeri, numero
+di pari, massimo di numeri consecutivi e massimo di numeri per decina
+(decine naturali: 1-10, 11-20, ...). Invece di enumerare tutte le C(v, k)
+combinazioni e scartare quelle non valide, la generazione in profondità
+scarta le combinazioni parziali che non possono più essere completate nel
+rispetto dei vincoli, insieme a tutto il loro sottoalbero:
+
+- somma: la somma parziale più i numeri più piccoli (o più grandi) ancora
+  disponibili deve poter restare nell'intervallo;
+- pari: i pari già scelti più quelli ancora disponibili devono poter
+  rientrare nell'intervallo, tenendo conto dei dispari disponibili;
+- consecutivi e decine: si controllano all'aggiunta di ogni numero.
+
+Le combinazioni valide sono prodotte in ordine lessicografico insieme al
+loro rank, così lo spazio dei candidati resta un `RankedCombinations` e i
+motori (e i t-sottoinsiemi da garantire) vedono solo combinazioni valide.
+"""
+
+from array import array
+from dataclasses import asdict, dataclass, fields
+from math import comb
+
+from .ranking import chunked
+
+
+def decade_of(number):
+    """Decina naturale di un numero: 0 per 1-10, 1 per 11-20, ..."""
+    return (number - 1) // 10
+
+
+@dataclass
+class TicketConstraints:
+    """
+    Vincoli che ogni combinazione generata deve rispettare (None = nessun vincolo).
+
+    Attributes:
+        sum_min (int, optional): Somma minima dei numeri della combinazione.
+        sum_max (int, optional): Somma massima dei numeri della combinazione.
+        even_min (int, optional): Numero minimo di pari nella combinazione.
+        even_max (int, optional): Numero massimo di pari nella combinazione.
+        max_consecutive (int, optional): Lunghezza massima di una sequenza di numeri
+            consecutivi (1 = nessuna coppia di consecutivi).
+        max_per_decade (int, optional): Numeri massimi della stessa decina (1-10, 11-20, ...).
+    """
+    sum_min: int = None
+    sum_max: int = None
+    even_min: int = None
+    even_max: int = None
+    max_consecutive: int = None
+    max_per_decade: int = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Costruisce i vincoli da un dizionario (es. la chiave "constraints" di una configurazione).
+
+        Raises:
+            ValueError: Se il dizionario contiene chiavi sconosciute.
+        """
+        if isinstance(data, cls):
+            return data
+        known = {f.name for f in fields(cls)}
+        unknown = set(data or {}) - known
+        if unknown:
+            raise ValueError(f"Vincoli sconosciuti: {', '.join(sorted(unknown))}")
+        return cls(**(data or {}))
+
+    def to_dict(self):
+        """Dizionario dei soli vincoli impostati (vuoto se nessuno)."""
+        return {name: value for name, value in asdict(self).items() if value is not None}
+
+    @property
+    def active(self):
+        """True se almeno un vincolo è impostato."""
+        return bool(self.to_dict())
+
+    @property
+    def label(self):
+        """Descrizione leggibile dei vincoli impostati ("Nessuno" se non ce ne sono)."""
+        parts = []
+        if self.sum_min is not None or self.sum_max is not None:
+            parts.append(f"somma {_interval(self.sum_min, self.sum_max)}")
+        if self.even_min is not None or self.even_max is not None:
+            parts.append(f"pari {_interval(self.even_min, self.even_max)}")
+        if self.max_consecutive is not None:
+            parts.append(f"consecutivi al massimo {self.max_consecutive}")
+        if self.max_per_decade is not None:
+            parts.append(f"al massimo {self.max_per_decade} per decina")
+        return ", ".join(parts) if parts else "Nessuno"
+
+    def errors(self, k):
+        """
+        Controlla la coerenza dei vincoli con la lunghezza k delle combinazioni.
+
+        Returns:
+            list: I messaggi di errore (vuota se i vincoli sono validi).
+        """
+        errors = []
+        if self.sum_min is not None and self.sum_max is not None and self.sum_min > self.sum_max:
+            errors.append(f"La somma minima ({self.sum_min}) non può superare la somma massima ({self.sum_max}).")
+        for name, value in (("minimo", self.even_min), ("massimo", self.even_max)):
+            if value is not None and not 0 <= value <= k:
+                errors.append(f"Il numero {name} di pari ({value}) deve essere tra 0 e la lunghezza della "
+                              f"combinazione ({k}).")
+        if self.even_min is not None and self.even_max is not None and self.even_min > self.even_max:
+            errors.append(f"Il numero minimo di pari ({self.even_min}) non può superare il massimo ({self.even_max}).")
+        if self.max_consecutive is not None and self.max_consecutive < 1:
+            errors.append("Il massimo di numeri consecutivi deve essere almeno 1.")
+        if self.max_per_decade is not None and self.max_per_decade < 1:
+            errors.append("Il massimo di numeri per decina deve essere almeno 1.")
+        return errors
+
+    def accepts(self, numbers):
+        """True se la combinazione (numeri in ordine crescente) rispetta tutti i vincoli."""
+        total = sum(numbers)
+        if self.sum_min is not None and total < self.sum_min or self.sum_max is not None and total > self.sum_max:
+            return False
+        evens = sum(1 for n in numbers if n % 2 == 0)
+        if self.even_min is not None and evens < self.even_min or self.even_max is not None and evens > self.even_max:
+            return False
+        if self.max_consecutive is not None:
+            run = 1
+            for previous, n in zip(numbers, numbers[1:]):
+                run = run + 1 if n == previous + 1 else 1
+                if run > self.max_consecutive:
+                    return False
+        if self.max_per_decade is not None:
+            counts = {}
+            for n in numbers:
+                counts[decade_of(n)] = counts.get(decade_of(n), 0) + 1
+            if max(counts.values(), default=0) > self.max_per_decade:
+                return False
+        return True
+
+
+def _interval(low, high):
+    if low is None:
+        return f"≤ {high}"
+    if high is None:
+        return f"≥ {low}"
+    return f"{low}-{high}"
+
+
+def iter_constrained(pool, k, constraints):
+    """
+    Genera in profondità le k-combinazioni del pool che rispettano i vincoli.
+
+    Args:
+        pool (list): Il pool ordinato e senza duplicati.
+        k (int): La lunghezza delle combinazioni.
+        constraints (TicketConstraints): I vincoli da rispettare.
+
+    Returns:
+        iterator: Coppie `(rank, indici)` in ordine lessicografico, dove `rank` è il rank
+        lessicografico della combinazione tra le C(v, k) del pool e `indici` la tupla
+        degli indici nel pool.
+    """
+    n = len(pool)
+    sum_min = constraints.sum_min
+    sum_max = constraints.sum_max
+    even_min = constraints.even_min
+    even_max = constraints.even_max
+    max_run = constraints.max_consecutive
+    max_decade = constraints.max_per_decade
+
+    prefix = [0]
+    for number in pool:
+        prefix.append(prefix[-1] + number)
+    # Pari e dispari disponibili dalla posizione i in poi
+    evens_from = [0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        evens_from[i] = evens_from[i + 1] + (pool[i] % 2 == 0)
+    is_even = [number % 2 == 0 for number in pool]
+    decades = [decade_of(number) for number in pool]
+    decade_counts = {}
+    chosen = []
+
+    # binomials[a][b] = C(a, b), per il rank lessicografico
+    binomials = [[comb(a, b) for b in range(k + 1)] for a in range(n + 1)]
+
+    def extend(start, position, offset, total, evens, run):
+        # Sceglie l'indice in posizione `position`; `offset` è il rank lessicografico del primo
+        # completamento del prefisso, quindi quello della combinazione con l'indice j è
+        # offset + C(n - start, k - position) - C(n - j, k - position). All'ultima posizione
+        # produce in un solo blocco le combinazioni complete del prefisso.
+        remaining = k - position - 1
+        base = offset + binomials[n - start][k - position]
+        largest = prefix[n] - prefix[n - remaining]
+        leaves = [] if remaining == 0 else None
+        for j in range(start, n - remaining):
+            number = pool[j]
+            partial = total + number
+            if sum_max is not None and partial + prefix[j + 1 + remaining] - prefix[j + 1] > sum_max:
+                break  # i numeri successivi sono più grandi: nessun completamento possibile
+            if sum_min is not None and partial + largest < sum_min:
+                continue
+            even_count = evens + is_even[j]
+            if even_min is not None and even_count + min(remaining, evens_from[j + 1]) < even_min:
+                continue
+            if even_max is not None and even_count + max(0, remaining - (n - j - 1 - evens_from[j + 1])) > even_max:
+                continue
+            length = run + 1 if chosen and number == pool[chosen[-1]] + 1 else 1
+            if max_run is not None and length > max_run:
+                continue
+            decade = decades[j]
+            if max_decade is not None and decade_counts.get(decade, 0) >= max_decade:
+                continue
+            rank = base - binomials[n - j][k - position]
+            if leaves is not None:
+                leaves.append((rank, (*chosen, j)))
+                continue
+            chosen.append(j)
+            decade_counts[decade] = decade_counts.get(decade, 0) + 1
+            yield from extend(j + 1, position + 1, rank, partial, even_count, length)
+            decade_counts[decade] -= 1
+            chosen.pop()
+        if leaves:
+            yield leaves
+
+    if not 0 < k <= n:
+        return iter(())
+    return (leaf for leaves in extend(0, 0, 0, 0, 0, 0) for leaf in leaves)
+
+
+def constrained_ranks(pool, k, constraints):
+    """
+    Rank lessicografici delle k-combinazioni del pool che rispettano i vincoli.
+
+    Returns:
+        array: I rank (array di interi a 64 bit), in ordine crescente.
+    """
+    return array("q", (rank for rank, _ in iter_constrained(pool, k, constraints)))
+
+
+def iter_constrained_chunks(pool, k, constraints, chunk_size):
+    """Come `iter_constrained`, ma a blocchi (liste) di tuple di numeri."""
+    return chunked((tuple(pool[i] for i in indices) for _, indices in iter_constrained(pool, k, constraints)),
+                   chunk_size)
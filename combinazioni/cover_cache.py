@@ -0,0 +1,191 @@
+"""
+Cache persistente delle coperture canoniche.
+
+Un sistema di copertura dipende solo da (v, k, t) e dal limite di combinazioni,
+non dai numeri del pool: la copertura viene quindi salvata sugli indici
+0..v-1, come rank lessicografici delle combinazioni scelte, e rimappata sul
+pool corrente in O(dimensione) al momento della lettura.
+
+La cache è un database SQLite con rimozione LRU limitata in byte. Una voce
+viene sostituita solo da una copertura migliore: più sottoinsiemi coperti o,
+a parità, meno combinazioni.
+"""
+
+import os
+import sqlite3
+import time
+from array import array
+from contextlib import closing
+
+from .greedy import GreedyResult
+from .ranking import RankedCombinations
+
+# Dimensione massima predefinita dei dati in cache (byte)
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Variabile d'ambiente che sovrascrive la cartella della cache
+CACHE_DIR_ENV = "COMBINAZIONI_CACHE_DIR"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS covers (
+    v INTEGER NOT NULL,
+    k INTEGER NOT NULL,
+    t INTEGER NOT NULL,
+    max_combinations INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    covered INTEGER NOT NULL,
+    required INTEGER NOT NULL,
+    stop_reason TEXT NOT NULL,
+    ranks BLOB NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (v, k, t, max_combinations)
+)
+"""
+
+
+def default_cache_path():
+    """Percorso predefinito del database: `$COMBINAZIONI_CACHE_DIR` o `~/.cache/combinazioni`."""
+    directory = os.environ.get(CACHE_DIR_ENV) or os.path.join(os.path.expanduser("~"), ".cache", "combinazioni")
+    return os.path.join(directory, "covers.sqlite3")
+
+
+class CoverCache:
+    """
+    Cache su disco delle migliori coperture note per (v, k, t, max_combinations).
+
+    Args:
+        path (str, optional): Percorso del database SQLite; predefinito `default_cache_path()`.
+        max_bytes (int): Dimensione massima dei dati salvati; oltre questa soglia
+            vengono rimosse le voci usate meno di recente.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(_SCHEMA)
+
+    def _connect(self):
+        # Una connessione per operazione: la cache può essere usata da thread diversi
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _key(v, k, t, max_combinations):
+        return (v, k, t, max_combinations or 0)
+
+    def get(self, v, k, t, max_combinations=None):
+        """
+        Legge la copertura salvata per i parametri indicati.
+
+        Returns:
+            GreedyResult or None: Il risultato sugli indici 0..v-1 (`space` è None),
+            oppure None se la voce non esiste.
+        """
+        key = self._key(v, k, t, max_combinations)
+        with closing(self._connect()) as connection, connection:
+            row = connection.execute(
+                "SELECT covered, required, stop_reason, ranks FROM covers "
+                "WHERE v = ? AND k = ? AND t = ? AND max_combinations = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE covers SET last_access = ? "
+                "WHERE v = ? AND k = ? AND t = ? AND max_combinations = ?", (time.time(),) + key
+            )
+        covered, required, stop_reason, blob = row
+        ranks = array("q")
+        ranks.frombytes(blob)
+        return GreedyResult(selected=ranks.tolist(), covered=covered, required=required,
+                            stop_reason=stop_reason, engine="cache")
+
+    def put(self, v, k, t, max_combinations, result):
+        """
+        Salva la copertura se non esiste o se migliora quella presente.
+
+        Args:
+            result (GreedyResult): Risultato calcolato sullo spazio completo C(v, k);
+                le posizioni in `selected` sono quindi rank lessicografici sugli indici.
+
+        Returns:
+            bool: True se la voce è stata scritta.
+        """
+        key = self._key(v, k, t, max_combinations)
+        blob = array("q", result.selected).tobytes()
+        with closing(self._connect()) as connection, connection:
+            row = connection.execute(
+                "SELECT size, covered FROM covers "
+                "WHERE v = ? AND k = ? AND t = ? AND max_combinations = ?", key
+            ).fetchone()
+            if row is not None:
+                size, covered = row
+                if (result.covered, -len(result.selected)) <= (covered, -size):
+                    return False
+            connection.execute(
+                "INSERT OR REPLACE INTO covers "
+                "(v, k, t, max_combinations, size, covered, required, stop_reason, ranks, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (len(result.selected), result.covered, result.required,
+                       result.stop_reason, blob, time.time()),
+            )
+            self._evict(connection)
+        return True
+
+    def _evict(self, connection):
+        total = connection.execute("SELECT COALESCE(SUM(LENGTH(ranks)), 0) FROM covers").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = connection.execute(
+            "SELECT v, k, t, max_combinations, LENGTH(ranks) FROM covers ORDER BY last_access"
+        ).fetchall()
+        for v, k, t, max_combinations, size in rows:
+            if total <= self.max_bytes:
+                break
+            connection.execute(
+                "DELETE FROM covers WHERE v = ? AND k = ? AND t = ? AND max_combinations = ?",
+                (v, k, t, max_combinations),
+            )
+            total -= size
+
+    def clear(self):
+        """Svuota la cache."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM covers")
+
+
+def cached_reduce(space, guarantee_size, max_combinations, engine, cache, progress=None, **options):
+    """
+    Esegue un motore di riduzione passando prima dalla cache delle coperture.
+
+    La cache è usata solo per lo spazio completo delle combinazioni del pool
+    (l'unico caso in cui la copertura non dipende dai numeri). In caso di
+    successo la copertura salvata viene rimappata sul pool di `space`.
+
+    Args:
+        space (RankedCombinations): I candidati.
+        guarantee_size (int): Dimensione t dei sottoinsiemi da garantire.
+        max_combinations (int, optional): Limite massimo di combinazioni.
+        engine (callable): Il motore da eseguire in caso di mancata corrispondenza.
+        cache (CoverCache): La cache da usare.
+        progress (callable, optional): Callback `progress(fase, frazione)`.
+        **options: Opzioni specifiche del motore.
+
+    Returns:
+        GreedyResult: Il risultato; `engine == "cache"` se letto dalla cache.
+    """
+    space = RankedCombinations.from_combinations(space)
+    if not space.is_complete:
+        return engine(space, guarantee_size, max_combinations, progress=progress, **options)
+
+    key = (len(space.pool), space.k, guarantee_size, max_combinations)
+    cached = cache.get(*key)
+    if cached is not None:
+        cached.space = space
+        return cached
+
+    result = engine(space, guarantee_size, max_combinations, progress=progress, **options)
+    cache.put(*key, result)
+    return result
@@ -0,0 +1,33 @@
+"""
+Registro dei motori di riduzione disponibili.
+
+Ogni motore ha la firma `motore(full_combinations, guarantee_size,
+max_combinations=None, progress=None, **opzioni)` e restituisce un `GreedyResult`.
+
+I motori in `EXACT_ENGINES` implementano lo stesso greedy e restituiscono la
+stessa selezione; gli altri sono costruzioni alternative con risultati propri.
+Quelli in `RANDOMIZED_ENGINES` accettano anche l'opzione `rng` e sono
+riproducibili solo con lo stesso generatore casuale.
+"""
+
+from .greedy import greedy_classic, greedy_lazy
+from .numpy_backend import greedy_numpy
+from .orbit import greedy_orbit
+from .parallel import greedy_parallel
+from .sampled import greedy_sampled
+
+# Motori disponibili, per nome
+ENGINES = {
+    "classic": greedy_classic,
+    "lazy": greedy_lazy,
+    "numpy": greedy_numpy,
+    "parallel": greedy_parallel,
+    "orbit": greedy_orbit,
+    "sampled": greedy_sampled,
+}
+
+# Motori che producono esattamente la selezione del greedy classico
+EXACT_ENGINES = ("classic", "lazy", "numpy", "parallel")
+
+# Motori che usano un generatore casuale (opzione `rng`)
+RANDOMIZED_ENGINES = ("sampled",)
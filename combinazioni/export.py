@@ -0,0 +1,458 @@
+"""
+Esportazione dei risultati, con intestazione di riepilogo.
+
+Tutti i formati vengono scritti in streaming, a blocchi di combinazioni, su un
+file binario aperto: la memoria usata non dipende dal numero di righe.
+
+Formati disponibili (chiavi di `EXPORT_FORMATS`):
+
+- "csv": testo CSV con l'intestazione in testa;
+- "csv.gz": lo stesso CSV compresso con gzip;
+- "parquet": tabella Parquet con l'intestazione nei metadati (richiede pyarrow);
+- "bin": formato binario compatto, un byte (o due) per numero, rileggibile con `read_binary`;
+- "xlsx": Excel in modalità write-only di openpyxl.
+
+pyarrow e openpyxl sono dipendenze opzionali e vengono importati al momento dell'uso.
+
+`read_combinations` rilegge tutti questi formati, e anche sistemi esterni in
+CSV/testo o Excel con una combinazione per riga.
+"""
+
+import csv
+import gzip
+import io
+import json
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from datetime import datetime
+from importlib.util import find_spec
+
+from .ranking import chunked
+
+# Numero di combinazioni scritte per blocco
+EXPORT_CHUNK_SIZE = 65536
+
+# Formato binario: magic, k, byte per numero, lunghezza dell'intestazione (little-endian)
+BINARY_MAGIC = b"CMB1"
+_BINARY_PREAMBLE = struct.Struct("<4sBBI")
+
+# formato -> (estensione, tipo MIME)
+EXPORT_FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "csv.gz": ("csv.gz", "application/gzip"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "bin": ("bin", "application/octet-stream"),
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def result_filename(guarantee, count, k, extension="csv"):
+    """Nome file standard dei risultati, es. `combinazioni_G3_C62_L5.csv`."""
+    return f"combinazioni_G{guarantee}_C{count}_L{k}.{extension}"
+
+
+def build_header_info(config, pool, full_count, final_count, generated_at=None, diagnostics=None,
+                      verification=None, result=None):
+    """
+    Righe di riepilogo scritte in testa ai file esportati.
+
+    Args:
+        config (RunConfig): I parametri della generazione.
+        pool (list): Il pool di numeri effettivamente usato.
+        full_count (int): Numero di combinazioni iniziali.
+        final_count (int): Numero di combinazioni finali.
+        generated_at (datetime, optional): Data di generazione; predefinita adesso.
+        diagnostics (list, optional): Righe di diagnostica (vedi `Instrumentation.summary_lines`)
+            aggiunte dopo il riepilogo.
+        verification (VerificationReport, optional): Esito della verifica della garanzia,
+            riportato subito dopo il riepilogo.
+        result (GreedyResult, optional): Il risultato della riduzione, di cui si riporta
+            la copertura raggiunta con le combinazioni finali.
+
+    Returns:
+        list: Le righe dell'intestazione, terminate da una riga vuota e "Combinazioni:".
+    """
+    generated_at = generated_at or datetime.now()
+    source_str = ','.join(map(str, pool)) # Usa map(str, ...) per handle ints
+    if full_count > 0: # Evita divisione per zero
+        riduzione_perc = (1 - final_count / full_count) * 100
+    else:
+        riduzione_perc = 0.0
+
+    header_info = [
+        f"Generazione Combinazioni - Riepilogo",
+        f"Data Generazione: {generated_at.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"Numeri totali per il sistema (richiesti): {config.pool_size}",
+        f"Pool di numeri effettivo usato: {len(pool)} -> {source_str}",
+        f"Range: {config.range_min}-{config.range_max}",
+        f"Lunghezza Combinazione: {config.k}",
+        f"Numeri da includere nel pool (fissi): {config.fixed_numbers if config.fixed_numbers else 'Nessuno'}",
+        f"Tipo numeri nel pool: {config.parity_label}",
+        f"Vincoli sulle combinazioni: {config.constraints.label}",
+        f"Garanzia: {config.guarantee_label}",
+        f"Max Combinazioni finali: {config.max_combinations if config.max_combinations else 'Nessun limite'}",
+        f"Seed casualità: {config.seed if config.seed > 0 else 'Casuale'}",
+        f"Combinazioni iniziali generate (da tutto il pool{', con i vincoli' if config.constraints.active else ''}): "
+        f"{full_count:,}",
+        f"Combinazioni finali (ridotte): {final_count:,}",
+        f"Riduzione rispetto alle iniziali: {riduzione_perc:.1f}%",
+    ]
+    if result is not None and result.required:
+        unit = "gruppi estratti" if config.condition_size is not None else "sottoinsiemi"
+        header_info.append(f"Copertura garanzia con {final_count:,} combinazioni: "
+                           f"{result.covered / result.required:.2%} ({result.covered:,}/{result.required:,} {unit})")
+    if verification is not None:
+        header_info.extend(verification.summary_lines())
+    header_info.extend(diagnostics or [])
+    header_info.extend([
+        "", # Riga vuota per separazione
+        "Combinazioni:"
+    ])
+    return header_info
+
+
+def column_names(k):
+    """Intestazioni delle colonne delle combinazioni: N1..Nk."""
+    return [f'N{i+1}' for i in range(k)]
+
+
+def parquet_available():
+    """True se pyarrow è installato e l'esportazione Parquet è disponibile."""
+    return find_spec("pyarrow") is not None
+
+
+def write_csv(file, header_info, combinations, k):
+    """
+    Scrive intestazione e combinazioni in formato CSV su un file di testo aperto.
+
+    Args:
+        file: File di testo (o buffer) in scrittura.
+        header_info (list): Righe di intestazione.
+        combinations (iterable): Combinazioni (tuple di numeri).
+        k (int): Lunghezza delle combinazioni.
+    """
+    for line in header_info:
+        file.write(line + "\n")
+    writer = csv.writer(file, lineterminator="\n")
+    writer.writerow(column_names(k))
+    for chunk in chunked(combinations, EXPORT_CHUNK_SIZE):
+        writer.writerows(chunk)
+
+
+def csv_text(header_info, combinations, k):
+    """Restituisce il CSV completo come stringa."""
+    buffer = io.StringIO()
+    write_csv(buffer, header_info, combinations, k)
+    return buffer.getvalue()
+
+
+def _write_csv_binary(file, header_info, combinations, k):
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    write_csv(text, header_info, combinations, k)
+    text.flush()
+    text.detach()  # il file resta aperto per il chiamante
+
+
+def write_csv_gzip(file, header_info, combinations, k):
+    """Come `write_csv`, ma compresso con gzip su un file binario aperto."""
+    with gzip.GzipFile(fileobj=file, mode="wb", compresslevel=6) as compressed:
+        _write_csv_binary(compressed, header_info, combinations, k)
+
+
+def write_parquet(file, header_info, combinations, k):
+    """
+    Scrive le combinazioni in formato Parquet, un row group per blocco.
+
+    L'intestazione è salvata nei metadati dello schema, alla chiave "header_info" (JSON).
+
+    Raises:
+        ValueError: Se pyarrow non è installato.
+    """
+    if not parquet_available():
+        raise ValueError("Per l'esportazione Parquet è necessario installare pyarrow.")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    names = column_names(k)
+    schema = pa.schema([(name, pa.int32()) for name in names],
+                       metadata={"header_info": json.dumps(header_info, ensure_ascii=False)})
+    with pq.ParquetWriter(file, schema) as writer:
+        for chunk in chunked(combinations, EXPORT_CHUNK_SIZE):
+            columns = [pa.array(column, type=pa.int32()) for column in zip(*chunk)]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+
+def write_binary(file, header_info, combinations, k, max_value=255):
+    """
+    Scrive le combinazioni nel formato binario compatto.
+
+    Struttura: magic "CMB1", k (1 byte), byte per numero (1 byte), lunghezza
+    dell'intestazione (4 byte), intestazione in UTF-8 (righe separate da "\\n"),
+    poi una riga di k interi senza segno little-endian per combinazione.
+
+    Args:
+        max_value (int): Numero più grande presente; oltre 255 si usano 2 byte per numero.
+
+    Raises:
+        ValueError: Se un numero è negativo o non rappresentabile.
+    """
+    width = 1 if max_value < 256 else 2
+    typecode = "B" if width == 1 else "H"
+    header = "\n".join(header_info).encode("utf-8")
+    file.write(_BINARY_PREAMBLE.pack(BINARY_MAGIC, k, width, len(header)))
+    file.write(header)
+    for chunk in chunked(combinations, EXPORT_CHUNK_SIZE):
+        try:
+            row = array(typecode, (n for combo in chunk for n in combo))
+        except OverflowError:
+            raise ValueError(f"Numeri fuori dall'intervallo del formato binario (0..{256 ** width - 1}).")
+        if sys.byteorder == "big":
+            row.byteswap()
+        file.write(row.tobytes())
+
+
+def iter_binary(file, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Legge un file nel formato binario compatto.
+
+    Returns:
+        tuple: `(header_info, k, iteratore)` dove l'iteratore produce le
+        combinazioni come tuple di numeri, leggendo il file a blocchi.
+
+    Raises:
+        ValueError: Se il file non è nel formato atteso.
+    """
+    preamble = file.read(_BINARY_PREAMBLE.size)
+    if len(preamble) != _BINARY_PREAMBLE.size:
+        raise ValueError("File binario troncato.")
+    magic, k, width, header_length = _BINARY_PREAMBLE.unpack(preamble)
+    if magic != BINARY_MAGIC or width not in (1, 2) or k == 0:
+        raise ValueError("Il file non è nel formato binario delle combinazioni.")
+    header = file.read(header_length).decode("utf-8")
+    header_info = header.split("\n") if header else []
+    row_size = k * width
+
+    def rows():
+        while True:
+            data = file.read(row_size * chunk_size)
+            if not data:
+                return
+            if len(data) % row_size:
+                raise ValueError("File binario troncato.")
+            values = array("B" if width == 1 else "H")
+            values.frombytes(data)
+            if sys.byteorder == "big":
+                values.byteswap()
+            for start in range(0, len(values), k):
+                yield tuple(values[start:start + k])
+
+    return header_info, k, rows()
+
+
+def read_binary(file):
+    """Come `iter_binary`, ma restituisce `(header_info, combinazioni)` con la lista completa."""
+    header_info, _, rows = iter_binary(file)
+    return header_info, list(rows)
+
+
+# Separatori dei numeri nei file di testo esterni
+_TEXT_SEPARATORS = re.compile(r"[,;\s]+")
+
+
+def _parse_row(values):
+    # Una riga è una combinazione se contiene solo numeri interi
+    numbers = []
+    for value in values:
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        elif isinstance(value, str):
+            try:
+                value = int(value)
+            except ValueError:
+                return None
+        if not isinstance(value, int) or isinstance(value, bool):
+            return None
+        numbers.append(value)
+    return tuple(numbers) or None
+
+
+def _read_text(text):
+    header_info, combinations = [], []
+    for line in text.splitlines():
+        stripped = line.strip()
+        combination = _parse_row(_TEXT_SEPARATORS.split(stripped)) if stripped else None
+        if combination is None:
+            header_info.append(stripped)
+        else:
+            combinations.append(combination)
+    return header_info, combinations
+
+
+def _read_excel(file):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        header_info, combinations = [], []
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            cells = [cell for cell in row if cell is not None]
+            combination = _parse_row(cells) if cells else None
+            if combination is None:
+                header_info.append(" ".join(str(cell) for cell in cells))
+            else:
+                combinations.append(combination)
+        return header_info, combinations
+    finally:
+        workbook.close()
+
+
+def _read_parquet(file):
+    if not parquet_available():
+        raise ValueError("Per leggere file Parquet è necessario installare pyarrow.")
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(file)
+    metadata = table.schema.metadata or {}
+    header_info = json.loads(metadata[b"header_info"]) if b"header_info" in metadata else []
+    columns = [table.column(i).to_pylist() for i in range(table.num_columns)]
+    return header_info, list(zip(*columns))
+
+
+def read_combinations(file, file_name):
+    """
+    Legge le combinazioni da un file esportato da qui o da un sistema esterno.
+
+    Il formato si ricava dall'estensione: .csv/.txt, .csv.gz, .xlsx, .parquet, .bin.
+    Nei file di testo e nei fogli Excel è una combinazione ogni riga composta
+    solo da numeri interi (separati da virgole, punti e virgola, tabulazioni o
+    spazi); tutte le altre righe sono considerate intestazione.
+
+    Args:
+        file: File binario aperto in lettura.
+        file_name (str): Nome del file, usato per riconoscerne il formato.
+
+    Returns:
+        tuple: `(header_info, combinazioni)`, con le combinazioni come tuple di numeri.
+
+    Raises:
+        ValueError: Se il formato non è riconosciuto o il file non è leggibile.
+    """
+    name = file_name.lower()
+    try:
+        if name.endswith(".bin"):
+            return read_binary(file)
+        if name.endswith(".parquet"):
+            return _read_parquet(file)
+        if name.endswith(".xlsx"):
+            return _read_excel(file)
+        if name.endswith(".gz"):
+            with gzip.GzipFile(fileobj=file, mode="rb") as compressed:
+                return _read_text(compressed.read().decode("utf-8-sig"))
+        if name.endswith((".csv", ".txt")):
+            return _read_text(file.read().decode("utf-8-sig"))
+    except (OSError, UnicodeDecodeError, KeyError, json.JSONDecodeError) as e:
+        raise ValueError(f"Impossibile leggere '{file_name}': {e}")
+    raise ValueError(f"Formato non riconosciuto per '{file_name}': usare CSV, TXT, CSV.GZ, XLSX, Parquet o BIN.")
+
+
+def header_parameters(header_info):
+    """
+    Ricava pool e garanzia dall'intestazione di un file esportato da qui.
+
+    Returns:
+        dict: Le chiavi "pool" (lista di numeri), "guarantee" (int) e, per la garanzia
+        condizionata "t se m", "condition" (int), solo se presenti.
+    """
+    parameters = {}
+    for line in header_info:
+        if line.startswith("Pool di numeri effettivo usato:") and "->" in line:
+            numbers = line.split("->", 1)[1]
+            parameters["pool"] = [int(n) for n in numbers.split(",") if n.strip()]
+        elif line.startswith("Garanzia:"):
+            value = line.split(":", 1)[1].strip()
+            guarantee, _, condition = value.partition(" se ")
+            if guarantee.isdigit():
+                parameters["guarantee"] = int(guarantee)
+            if condition.isdigit():
+                parameters["condition"] = int(condition)
+    return parameters
+
+
+def write_excel(file, header_info, combinations, k):
+    """
+    Scrive l'Excel con intestazione e combinazioni nello stesso foglio.
+
+    Usa la modalità write-only di openpyxl, che non tiene in memoria le righe già scritte.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Riepilogo e Combinazioni')
+    # Intestazione nella prima colonna, poi i nomi delle colonne e le combinazioni
+    for line in header_info:
+        sheet.append([line if line else None])
+    sheet.append(column_names(k))
+    for chunk in chunked(combinations, EXPORT_CHUNK_SIZE):
+        for combo in chunk:
+            sheet.append(combo)
+    workbook.save(file)
+
+
+def excel_bytes(header_info, combinations, k):
+    """
+    Crea il file Excel con intestazione e combinazioni nello stesso foglio.
+
+    Returns:
+        bytes: Il contenuto del file .xlsx.
+    """
+    excel_buffer = io.BytesIO()
+    write_excel(excel_buffer, header_info, combinations, k)
+    return excel_buffer.getvalue()
+
+
+def write_export(file, export_format, header_info, combinations, k, max_value=255):
+    """
+    Scrive i risultati nel formato `export_format` su un file binario aperto.
+
+    Args:
+        file: File binario in scrittura.
+        export_format (str): Una delle chiavi di `EXPORT_FORMATS`.
+        header_info (list): Righe di intestazione.
+        combinations (iterable): Combinazioni (tuple di numeri), consumate una volta sola.
+        k (int): Lunghezza delle combinazioni.
+        max_value (int): Numero più grande presente (serve solo al formato binario).
+
+    Raises:
+        ValueError: Se il formato è sconosciuto o non disponibile.
+    """
+    if export_format == "csv":
+        _write_csv_binary(file, header_info, combinations, k)
+    elif export_format == "csv.gz":
+        write_csv_gzip(file, header_info, combinations, k)
+    elif export_format == "parquet":
+        write_parquet(file, header_info, combinations, k)
+    elif export_format == "bin":
+        write_binary(file, header_info, combinations, k, max_value)
+    elif export_format == "xlsx":
+        write_excel(file, header_info, combinations, k)
+    else:
+        raise ValueError(f"Formato di esportazione sconosciuto '{export_format}'.")
+
+
+def export_to_tempfile(export_format, header_info, combinations, k, max_value=255):
+    """
+    Scrive i risultati in un file temporaneo e lo restituisce riavvolto all'inizio.
+
+    Il file viene cancellato alla chiusura.
+    """
+    file = tempfile.TemporaryFile()
+    try:
+        write_export(file, export_format, header_info, combinations, k, max_value)
+    except BaseException:
+        file.close()
+        raise
+    file.seek(0)
+    return file
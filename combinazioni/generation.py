@@ -0,0 +1,93 @@
+"""
+Generazione delle combinazioni candidate da un pool di numeri.
+
+Il pool viene validato, deduplicato e ordinato una sola volta; da quel momento
+`itertools.combinations` produce già combinazioni uniche, ordinate e in ordine
+lessicografico, senza bisogno di riordinarle o di passarle per un `set`.
+Le combinazioni vengono quindi fornite in streaming (a blocchi) oppure come
+`RankedCombinations`, che non le materializza affatto.
+
+Con dei vincoli sulle combinazioni (`TicketConstraints`) la generazione in
+profondità di `constraints` sostituisce `itertools.combinations` e scarta i
+prefissi che non possono portare a combinazioni valide: lo spazio contiene
+solo i rank delle combinazioni che rispettano i vincoli.
+"""
+
+from itertools import combinations
+from math import comb
+
+from .constraints import constrained_ranks, iter_constrained_chunks
+from .ranking import RankedCombinations, chunked
+
+# Numero di combinazioni per blocco nella generazione in streaming
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def normalize_pool(source_numbers_pool, k):
+    """
+    Valida il pool e la lunghezza k, restituendo il pool ordinato e senza duplicati.
+
+    Args:
+        source_numbers_pool (list): La lista (pool) di numeri da cui generare le combinazioni.
+        k (int): La lunghezza desiderata di ogni combinazione.
+
+    Returns:
+        list: Il pool ordinato e senza duplicati.
+
+    Raises:
+        ValueError: Se il pool non contiene solo interi, se k non è positivo o
+            se k supera la dimensione del pool.
+    """
+    if not isinstance(source_numbers_pool, list) or not all(isinstance(n, int) for n in source_numbers_pool):
+        raise ValueError("Il 'pool' di numeri sorgente deve contenere solo numeri interi.")
+    if not isinstance(k, int) or k <= 0:
+        raise ValueError("La lunghezza 'k' della combinazione deve essere un numero intero positivo.")
+
+    pool = sorted(set(source_numbers_pool))
+    if k > len(pool):
+        raise ValueError(f"Impossibile generare combinazioni di lunghezza {k} da un pool di soli {len(pool)} numeri.")
+    return pool
+
+
+def generate_all_k_combinations_from_pool(source_numbers_pool, k, constraints=None):
+    """
+    Genera tutte le combinazioni di k numeri dal pool fornito.
+
+    Le combinazioni non vengono materializzate: sono rappresentate dai loro rank
+    lessicografici e convertite in tuple solo quando vengono lette.
+
+    Args:
+        source_numbers_pool (list): La lista (pool) di numeri da cui generare le combinazioni.
+        k (int): La lunghezza desiderata di ogni combinazione.
+        constraints (TicketConstraints, optional): Vincoli che ogni combinazione deve rispettare.
+
+    Returns:
+        RankedCombinations: Sequenza di tuple ordinate di k numeri, in ordine lessicografico;
+        completa (senza rank memorizzati) se nessun vincolo scarta combinazioni.
+    """
+    pool = normalize_pool(source_numbers_pool, k)
+    if constraints is None or not constraints.active:
+        return RankedCombinations(pool, k)
+    ranks = constrained_ranks(pool, k, constraints)
+    return RankedCombinations(pool, k, None if len(ranks) == comb(len(pool), k) else ranks)
+
+
+def iter_k_combinations_from_pool(source_numbers_pool, k, chunk_size=DEFAULT_CHUNK_SIZE, constraints=None):
+    """
+    Genera in streaming, a blocchi, tutte le combinazioni di k numeri dal pool.
+
+    La memoria occupata è limitata a un blocco alla volta, indipendentemente da C(v, k).
+
+    Args:
+        source_numbers_pool (list): La lista (pool) di numeri da cui generare le combinazioni.
+        k (int): La lunghezza desiderata di ogni combinazione.
+        chunk_size (int): Numero massimo di combinazioni per blocco.
+        constraints (TicketConstraints, optional): Vincoli che ogni combinazione deve rispettare.
+
+    Returns:
+        iterator: Blocchi (liste) di tuple ordinate di k numeri, in ordine lessicografico.
+    """
+    pool = normalize_pool(source_numbers_pool, k)  # validazione immediata, non al primo blocco
+    if constraints is not None and constraints.active:
+        return iter_constrained_chunks(pool, k, constraints, chunk_size)
+    return chunked(combinations(pool, k), chunk_size)
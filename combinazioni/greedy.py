@@ -0,0 +1,367 @@
+"""
+Motori greedy per la riduzione delle combinazioni con garanzia.
+
+Entrambi i motori risolvono lo stesso problema di copertura: scegliere,
+tra le combinazioni candidate, un sottoinsieme che contenga ogni sottoinsieme
+di dimensione `guarantee_size` presente nei candidati.
+
+I candidati sono gestiti come `RankedCombinations` e i sottoinsiemi target
+come rank interi (vedi `ranking`): la copertura è un `bytearray` indicizzato
+per rank.
+
+Regola di spareggio: a parità di nuovi sottoinsiemi coperti vince la
+combinazione che compare per prima nella lista dei candidati. Poiché le
+combinazioni generate sono in ordine lessicografico, a parità vince la
+combinazione lessicograficamente più piccola. I due motori applicano la
+stessa regola e restituiscono quindi esattamente la stessa selezione.
+
+Ogni motore registra anche il guadagno di ogni scelta (sottoinsiemi nuovi
+coperti), da cui si ricava senza costi aggiuntivi la curva della copertura
+in funzione del numero di combinazioni: un limite più basso è un prefisso
+della selezione (`GreedyResult.truncated`).
+"""
+
+import heapq
+from array import array
+from dataclasses import dataclass, field
+from itertools import accumulate
+from math import comb
+
+from .ranking import RankedCombinations, SubsetRanker
+
+# Motivi di arresto dell'algoritmo greedy
+STOP_COMPLETE = "complete"    # tutti i sottoinsiemi target sono coperti
+STOP_NO_GAIN = "no_gain"      # nessun candidato copre nuovi sottoinsiemi
+STOP_LIMIT = "limit"          # raggiunto il limite massimo di combinazioni
+STOP_EXHAUSTED = "exhausted"  # candidati esauriti
+
+# Fasi riportate alla callback di avanzamento
+PHASE_TARGETS = "targets"
+PHASE_GREEDY = "greedy"
+
+
+@dataclass
+class GreedyResult:
+    """
+    Risultato di un motore greedy.
+
+    Attributes:
+        space (RankedCombinations): I candidati su cui ha lavorato il motore.
+        selected (list): Posizioni in `space` delle combinazioni scelte, nell'ordine di selezione.
+        covered (int): Numero di sottoinsiemi target coperti dalla selezione.
+        required (int): Numero totale di sottoinsiemi target.
+        stop_reason (str): Uno tra STOP_COMPLETE, STOP_NO_GAIN, STOP_LIMIT, STOP_EXHAUSTED.
+        engine (str): Nome del motore che ha prodotto il risultato.
+        stats (dict): Contatori diagnostici; "candidates_scanned" è il numero di
+            candidati esaminati per fare le scelte.
+        gains (list): Sottoinsiemi target nuovi coperti da ciascuna scelta, nell'ordine
+            di `selected` (vuota se non registrati, vedi `record_gains`).
+    """
+    space: RankedCombinations = None
+    selected: list = field(default_factory=list)
+    covered: int = 0
+    required: int = 0
+    stop_reason: str = STOP_COMPLETE
+    engine: str = ""
+    stats: dict = field(default_factory=dict)
+    gains: list = field(default_factory=list)
+
+    def combinations(self):
+        """Restituisce le combinazioni scelte come tuple di numeri, nell'ordine di selezione."""
+        return [self.space[position] for position in self.selected]
+
+    def coverage_curve(self):
+        """
+        Sottoinsiemi target coperti dopo ciascuna scelta, nell'ordine di selezione.
+
+        Returns:
+            list: Un valore cumulativo per combinazione scelta (l'ultimo è `covered`);
+            vuota se i guadagni delle scelte non sono registrati.
+        """
+        if len(self.gains) != len(self.selected):
+            return []
+        return list(accumulate(self.gains, initial=self.covered - sum(self.gains)))[1:]
+
+    def truncated(self, count):
+        """
+        Risultato con le sole prime `count` combinazioni scelte, senza ricalcolare.
+
+        Per i motori greedy un prefisso della selezione è esattamente la selezione
+        che avrebbero fatto con limite `count`.
+
+        Raises:
+            ValueError: Se `count` non è tra 1 e il numero di combinazioni scelte o
+                i guadagni delle scelte non sono registrati.
+        """
+        if len(self.gains) != len(self.selected):
+            raise ValueError("Guadagni delle scelte non registrati: impossibile ridurre la selezione.")
+        if not 0 < count <= len(self.selected):
+            raise ValueError(f"Il numero di combinazioni deve essere tra 1 e {len(self.selected)}.")
+        if count == len(self.selected):
+            return self
+        covered = self.covered - sum(self.gains[count:])
+        return GreedyResult(space=self.space, selected=self.selected[:count], covered=covered,
+                            required=self.required, stop_reason=STOP_LIMIT if covered < self.required else STOP_COMPLETE,
+                            engine=self.engine, stats=dict(self.stats), gains=self.gains[:count])
+
+
+def record_gains(result, guarantee_size):
+    """
+    Registra i guadagni delle scelte di un risultato che non li ha.
+
+    Serve per le selezioni che non vengono da un passo greedy alla volta (cache
+    delle coperture, orbite, estensione incrementale, ottimizzazione locale):
+    una sola passata sulla selezione ordinata segna i t-sottoinsiemi coperti.
+
+    Args:
+        result (GreedyResult): Il risultato; `gains` viene compilato sul posto.
+        guarantee_size (int): Dimensione t dei sottoinsiemi garantiti.
+
+    Returns:
+        GreedyResult: Lo stesso risultato.
+    """
+    if len(result.gains) == len(result.selected):
+        return result
+    space = result.space
+    ranker = SubsetRanker(len(space.pool), space.k, guarantee_size)
+    covered = bytearray(ranker.count)
+    gains = []
+    for position in result.selected:
+        gain = 0
+        for subset_rank in ranker.ranks(space.indices(position)):
+            if not covered[subset_rank]:
+                covered[subset_rank] = 1
+                gain += 1
+        gains.append(gain)
+    result.gains = gains
+    return result
+
+
+def _report(progress, phase, fraction):
+    if progress is not None:
+        progress(phase, fraction)
+
+
+def rank_typecode(max_value):
+    """Typecode di `array` sufficiente a contenere interi fino a `max_value`."""
+    return "i" if max_value < 2 ** 31 else "q"
+
+
+def build_subset_table(space, guarantee_size, progress=None):
+    """
+    Calcola i rank dei t-sottoinsiemi di ogni candidato.
+
+    Args:
+        space (RankedCombinations): I candidati.
+        guarantee_size (int): Dimensione t dei sottoinsiemi.
+        progress (callable, optional): Callback `progress(fase, frazione)`.
+
+    Returns:
+        tuple: `(table, stride, universe, required)` dove `table[i*stride:(i+1)*stride]`
+        contiene i rank del candidato i, `universe` è C(v, t) e `required` il
+        numero di sottoinsiemi distinti presenti nei candidati.
+    """
+    ranker = SubsetRanker(len(space.pool), space.k, guarantee_size)
+    stride = ranker.stride
+    table = array(rank_typecode(ranker.count))
+    num_candidates = len(space)
+    update_interval = max(1, num_candidates // 100)
+    for position, indices in enumerate(space.iter_indices()):
+        table.extend(ranker.ranks(indices))
+        if (position + 1) % update_interval == 0 or (position + 1) == num_candidates:
+            _report(progress, PHASE_TARGETS, (position + 1) / num_candidates)
+
+    if space.is_complete:
+        required = ranker.count
+    else:
+        is_target = bytearray(ranker.count)
+        for subset_rank in table:
+            is_target[subset_rank] = 1
+        required = is_target.count(1)
+    return table, stride, ranker.count, required
+
+
+def greedy_classic(full_combinations, guarantee_size, max_combinations=None, progress=None):
+    """
+    Greedy classico: ad ogni passo ricalcola la copertura di tutti i candidati rimasti.
+
+    Complessità O(iterazioni × C(v,k) × C(k,t)); utile come riferimento.
+
+    Args:
+        full_combinations (sequence): Combinazioni candidate (tuple ordinate o `RankedCombinations`).
+        guarantee_size (int): Dimensione t dei sottoinsiemi da garantire.
+        max_combinations (int, optional): Limite massimo di combinazioni da selezionare.
+        progress (callable, optional): Callback `progress(fase, frazione)`.
+
+    Returns:
+        GreedyResult: La selezione e lo stato di copertura finale.
+    """
+    space = RankedCombinations.from_combinations(full_combinations)
+    table, stride, universe, required = build_subset_table(space, guarantee_size, progress)
+    num_candidates = len(space)
+
+    result = GreedyResult(space=space, required=required, engine="classic")
+    covered = bytearray(universe)
+    taken = bytearray(num_candidates)
+    remaining = num_candidates
+
+    scanned = 0
+    while result.covered < result.required and remaining:
+        best_index = None
+        best_new_coverage = -1
+        scanned += remaining
+
+        for position in range(num_candidates):
+            if taken[position]:
+                continue
+            start = position * stride
+            new_coverage = sum(1 for subset_rank in table[start:start + stride]
+                               if not covered[subset_rank])
+            if new_coverage > best_new_coverage:
+                best_new_coverage = new_coverage
+                best_index = position
+
+        if best_new_coverage == 0:
+            result.stop_reason = STOP_NO_GAIN
+            break
+
+        taken[best_index] = 1
+        remaining -= 1
+        result.selected.append(best_index)
+        result.gains.append(best_new_coverage)
+        start = best_index * stride
+        for subset_rank in table[start:start + stride]:
+            if not covered[subset_rank]:
+                covered[subset_rank] = 1
+                result.covered += 1
+        _report(progress, PHASE_GREEDY, result.covered / result.required)
+
+        if max_combinations is not None and len(result.selected) >= max_combinations:
+            result.stop_reason = STOP_LIMIT
+            break
+    else:
+        if result.covered < result.required:
+            result.stop_reason = STOP_EXHAUSTED
+
+    result.stats["candidates_scanned"] = scanned
+    return result
+
+
+def greedy_lazy(full_combinations, guarantee_size, max_combinations=None, progress=None, covered_ranks=None):
+    """
+    Greedy con coda di priorità a bucket e aggiornamento incrementale dei guadagni.
+
+    Ogni candidato ha un contatore dei sottoinsiemi ancora scoperti che contiene
+    ed è inserito nel bucket corrispondente a quel valore. Quando una combinazione
+    viene scelta si aggiornano solo i candidati che condividono i sottoinsiemi
+    appena coperti; le voci ormai obsolete nei bucket vengono scartate in modo
+    pigro al momento dell'estrazione. La selezione è identica a `greedy_classic`.
+
+    Con `covered_ranks` la selezione riprende da uno stato di copertura già
+    raggiunto (es. da una selezione precedente troncata dal limite): i guadagni
+    partono dai soli sottoinsiemi ancora scoperti e `covered` comprende quelli
+    già coperti.
+
+    Args:
+        full_combinations (sequence): Combinazioni candidate (tuple ordinate o `RankedCombinations`).
+        guarantee_size (int): Dimensione t dei sottoinsiemi da garantire.
+        max_combinations (int, optional): Limite massimo di combinazioni da selezionare.
+        progress (callable, optional): Callback `progress(fase, frazione)`.
+        covered_ranks (iterable, optional): Rank colessicografici dei t-sottoinsiemi già coperti.
+
+    Returns:
+        GreedyResult: La selezione e lo stato di copertura finale.
+    """
+    space = RankedCombinations.from_combinations(full_combinations)
+    table, stride, universe, required = build_subset_table(space, guarantee_size, progress)
+    num_candidates = len(space)
+
+    # Indice inverso sottoinsieme -> candidati, in formato compresso (CSR):
+    # i candidati che contengono il rank r sono members[offsets[r]:offsets[r + 1]]
+    offsets = array(rank_typecode(len(table)), [0]) * (universe + 1)
+    for subset_rank in table:
+        offsets[subset_rank + 1] += 1
+    for subset_rank in range(universe):
+        offsets[subset_rank + 1] += offsets[subset_rank]
+    members = array(rank_typecode(num_candidates), [0]) * len(table)
+    fill = array(offsets.typecode, offsets[:-1])
+    for entry, subset_rank in enumerate(table):
+        members[fill[subset_rank]] = entry // stride
+        fill[subset_rank] += 1
+    del fill
+
+    result = GreedyResult(space=space, required=required, engine="lazy")
+    covered = bytearray(universe)
+    taken = bytearray(num_candidates)
+    gains = array("i", [stride]) * num_candidates
+
+    # buckets[g] è un heap di posizioni di candidati con guadagno g (con voci obsolete);
+    # inizialmente tutti hanno guadagno massimo e la lista ordinata è già un heap.
+    max_gain = comb(space.k, guarantee_size)
+    buckets = [[] for _ in range(max_gain + 1)]
+    if covered_ranks is None:
+        buckets[max_gain] = list(range(num_candidates))
+    else:
+        for subset_rank in covered_ranks:
+            covered[subset_rank] = 1
+        counted = bytearray(universe)
+        for subset_rank in table:
+            if covered[subset_rank] and not counted[subset_rank]:
+                counted[subset_rank] = 1
+                result.covered += 1
+        del counted
+        # Inserite in ordine di posizione, le liste dei bucket restano degli heap
+        for position in range(num_candidates):
+            start = position * stride
+            gain = sum(1 for subset_rank in table[start:start + stride] if not covered[subset_rank])
+            gains[position] = gain
+            buckets[gain].append(position)
+    top = max_gain
+    remaining = num_candidates
+    scanned = 0  # voci estratte dai bucket, comprese quelle obsolete
+
+    while result.covered < result.required and remaining:
+        best_index = None
+        while top > 0:
+            heap = buckets[top]
+            while heap and (taken[heap[0]] or gains[heap[0]] != top):
+                heapq.heappop(heap)
+                scanned += 1
+            if heap:
+                best_index = heapq.heappop(heap)
+                scanned += 1
+                break
+            top -= 1
+
+        if best_index is None:
+            result.stop_reason = STOP_NO_GAIN
+            break
+
+        taken[best_index] = 1
+        remaining -= 1
+        result.selected.append(best_index)
+        result.gains.append(top)
+        start = best_index * stride
+        for subset_rank in table[start:start + stride]:
+            if covered[subset_rank]:
+                continue
+            covered[subset_rank] = 1
+            result.covered += 1
+            for other in members[offsets[subset_rank]:offsets[subset_rank + 1]]:
+                if taken[other]:
+                    continue
+                gain = gains[other] - 1
+                gains[other] = gain
+                heapq.heappush(buckets[gain], other)
+        _report(progress, PHASE_GREEDY, result.covered / result.required)
+
+        if max_combinations is not None and len(result.selected) >= max_combinations:
+            result.stop_reason = STOP_LIMIT
+            break
+    else:
+        if result.covered < result.required:
+            result.stop_reason = STOP_EXHAUSTED
+
+    result.stats["candidates_scanned"] = scanned
+    return result
+
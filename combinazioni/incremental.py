@@ -0,0 +1,139 @@
+"""
+Estensione incrementale di una copertura quando i parametri cambiano di poco.
+
+Due modifiche tipiche non richiedono di ricalcolare il sistema da zero:
+
+- limite di combinazioni aumentato: se la copertura precedente era stata
+  troncata dal limite, il greedy riprende dal suo stato di copertura invece
+  di ripartire dalla prima scelta;
+- pool esteso da P a P ∪ {x}: le combinazioni precedenti coprono già tutti i
+  t-sottoinsiemi di P, restano da coprire solo quelli che contengono x. Una
+  combinazione che li copre conviene che contenga x, e coprire {x} ∪ S per ogni
+  (t-1)-sottoinsieme S di P con combinazioni {x} ∪ B equivale a coprire i
+  (t-1)-sottoinsiemi di P con (k-1)-combinazioni B: un problema molto più
+  piccolo, risolto con i motori normali (e con la loro cache) e poi esteso
+  aggiungendo x. Più numeri nuovi si aggiungono uno alla volta.
+
+Il risultato contiene le combinazioni precedenti seguite da quelle aggiunte
+e in genere è un po' più grande di quello di un calcolo completo sul nuovo pool.
+"""
+
+from math import comb
+
+from .cover_cache import cached_reduce
+from .engines import ENGINES, EXACT_ENGINES, RANDOMIZED_ENGINES
+from .greedy import STOP_COMPLETE, STOP_LIMIT, GreedyResult, greedy_lazy, record_gains
+from .ranking import RankedCombinations, SubsetRanker, rank_lex
+
+
+def _index_tuples(combinations_, pool):
+    # Combinazioni di numeri -> tuple crescenti di indici nel pool
+    position = {number: index for index, number in enumerate(pool)}
+    try:
+        return [tuple(sorted(position[number] for number in combination)) for combination in combinations_]
+    except KeyError as e:
+        raise ValueError(f"La copertura precedente contiene il numero {e.args[0]}, assente dal nuovo pool.") from None
+
+
+def _cover_new_number(pool_size, k, guarantee_size, max_combinations, engine, engine_options, cover_cache,
+                      progress):
+    # Copre i t-sottoinsiemi che contengono il nuovo numero con combinazioni che lo contengono:
+    # restituisce il risultato del sotto-problema (v, k-1, t-1) sugli indici 0..v-1 del pool corrente.
+    space = RankedCombinations(range(pool_size), k - 1)
+    if guarantee_size == 1:
+        # Basta una combinazione qualsiasi che contenga il nuovo numero
+        return GreedyResult(space=space, selected=[0], covered=1, required=1, engine="incremental")
+    if guarantee_size == k:
+        # Garanzia esatta: servono tutte le combinazioni con il nuovo numero
+        total = len(space)
+        selected = list(range(min(total, max_combinations) if max_combinations is not None else total))
+        return GreedyResult(space=space, selected=selected, covered=len(selected), required=total,
+                            stop_reason=STOP_LIMIT if len(selected) < total else STOP_COMPLETE,
+                            engine="incremental")
+    function = ENGINES[engine]
+    if cover_cache is not None and engine in EXACT_ENGINES:
+        return cached_reduce(space, guarantee_size - 1, max_combinations, function, cover_cache,
+                             progress=progress, **engine_options)
+    return function(space, guarantee_size - 1, max_combinations, progress=progress, **engine_options)
+
+
+def extend_cover(previous, pool, guarantee_size, max_combinations=None, engine="lazy", engine_options=None,
+                 cover_cache=None, progress=None, rng=None):
+    """
+    Estende una copertura dello spazio completo di un pool a un pool più grande o a un limite più alto.
+
+    Args:
+        previous (GreedyResult): La copertura di partenza, sullo spazio completo del pool precedente.
+        pool (list): Il nuovo pool; deve contenere tutti i numeri del precedente.
+        guarantee_size (int): Dimensione t dei sottoinsiemi da garantire.
+        max_combinations (int, optional): Limite massimo di combinazioni, comprese quelle precedenti.
+        engine (str): Motore per i sotto-problemi dei numeri nuovi, una delle chiavi di `ENGINES`.
+            La ripresa dopo un limite usa sempre il greedy lazy.
+        engine_options (dict, optional): Opzioni specifiche del motore.
+        cover_cache (CoverCache, optional): Cache persistente, usata per i sotto-problemi.
+        progress (callable, optional): Callback `progress(fase, frazione)`.
+        rng (random.Random, optional): Generatore per i motori di `RANDOMIZED_ENGINES`.
+
+    Returns:
+        GreedyResult: Sullo spazio completo del nuovo pool: le combinazioni precedenti seguite da
+        quelle aggiunte, con `engine == "incremental"`.
+
+    Raises:
+        ValueError: Se la copertura precedente non è sullo spazio completo o usa numeri fuori dal nuovo pool.
+    """
+    if not previous.space.is_complete:
+        raise ValueError("Si può estendere solo una copertura di tutte le combinazioni del pool.")
+    engine_options = dict(engine_options or {})
+    if engine in RANDOMIZED_ENGINES:
+        engine_options["rng"] = rng
+    k = previous.space.k
+    old_pool = list(previous.space.pool)
+    pool = sorted(set(pool))
+    new_numbers = sorted(set(pool) - set(old_pool))
+    budget = None if max_combinations is None else max_combinations - len(previous.selected)
+
+    # 1. Ripresa del greedy sul pool precedente, se la copertura era stata troncata dal limite
+    selected = previous.combinations()
+    covered = previous.covered
+    scanned = 0
+    complete = previous.covered == previous.required
+    if not complete and (budget is None or budget > 0):
+        ranker = SubsetRanker(len(old_pool), k, guarantee_size)
+        covered_ranks = (subset_rank for indices in _index_tuples(selected, old_pool)
+                         for subset_rank in ranker.ranks(indices))
+        resumed = greedy_lazy(RankedCombinations(old_pool, k), guarantee_size, budget, progress,
+                              covered_ranks=covered_ranks)
+        selected += resumed.combinations()
+        covered = resumed.covered
+        scanned += resumed.stats.get("candidates_scanned", 0)
+        complete = resumed.covered == resumed.required
+        if budget is not None:
+            budget -= len(resumed.selected)
+
+    # 2. Un numero nuovo alla volta: sotto-problema (v, k-1, t-1) sul pool corrente
+    current = list(old_pool)
+    for number in new_numbers:
+        if budget is not None and budget <= 0:
+            complete = False
+            break
+        extra = _cover_new_number(len(current), k, guarantee_size, budget, engine, engine_options, cover_cache,
+                                  progress)
+        # Gli indici del sotto-problema sono posizioni nel pool corrente
+        selected += [tuple(sorted([current[index] for index in indices] + [number]))
+                     for indices in extra.combinations()]
+        covered += extra.covered
+        scanned += extra.stats.get("candidates_scanned", 0)
+        complete = complete and extra.covered == extra.required
+        if budget is not None:
+            budget -= len(extra.selected)
+        current = sorted(current + [number])
+
+    v = len(pool)
+    space = RankedCombinations(pool, k)
+    result = GreedyResult(space=space, covered=covered, required=comb(v, guarantee_size), engine="incremental",
+                          selected=[rank_lex(indices, v) for indices in _index_tuples(selected, pool)])
+    result.stop_reason = STOP_COMPLETE if complete else STOP_LIMIT
+    result.stats["candidates_scanned"] = scanned
+    result.stats["previous_size"] = len(previous.selected)
+    result.stats["new_numbers"] = len(new_numbers)
+    return record_gains(result, guarantee_size)
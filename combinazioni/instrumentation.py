@@ -0,0 +1,238 @@
+"""
+Misure per fase del flusso di generazione: tempi, memoria, contatori.
+
+Uso tipico:
+
+    with Instrumentation(track_memory=True) as instrumentation:   # oppure start() / stop()
+        with instrumentation.phase("Generazione combinazioni"):
+            ...
+        with instrumentation.phase("Riduzione") as metrics:
+            result = reduce_combinations(..., reporter=instrumentation.reporter(reporter))
+            instrumentation.record_result(metrics, result)
+
+La memoria è il picco di allocazioni Python misurato con `tracemalloc` (opzionale,
+perché rallenta il calcolo). Con `profile=True` l'intero blocco viene profilato
+con cProfile e le statistiche possono essere salvate in formato pstats.
+"""
+
+import cProfile
+import io
+import marshal
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from .greedy import PHASE_GREEDY, PHASE_TARGETS
+from .local_search import PHASE_LOCAL_SEARCH
+from .progress import ProgressReporter
+
+# Nomi delle sotto-fasi dei motori, ricavate dalle notifiche di avanzamento
+ENGINE_PHASE_NAMES = {
+    PHASE_TARGETS: "sottoinsiemi target",
+    PHASE_GREEDY: "selezione greedy",
+    PHASE_LOCAL_SEARCH: "ricerca locale",
+}
+
+
+@dataclass
+class PhaseMetrics:
+    """
+    Misure di una fase.
+
+    Attributes:
+        name (str): Nome della fase.
+        seconds (float): Durata in secondi.
+        peak_memory (int, optional): Picco di memoria allocata durante la fase, in byte
+            (None se la memoria non è tracciata).
+        details (dict): Contatori specifici della fase (iterazioni, candidati esaminati, ...).
+        parent (str, optional): Fase di cui questa è una sotto-fase.
+    """
+    name: str
+    seconds: float = 0.0
+    peak_memory: int = None
+    details: dict = field(default_factory=dict)
+    parent: str = None
+
+
+class _PhaseMarker(ProgressReporter):
+    """Inoltra le notifiche al reporter originale annotando l'inizio di ogni fase del motore."""
+
+    def __init__(self, marks, inner):
+        self.marks = marks
+        self.inner = inner
+
+    def progress(self, phase, fraction):
+        self.marks.setdefault(phase, time.perf_counter())
+        self.inner.progress(phase, fraction)
+
+    def info(self, message):
+        self.inner.info(message)
+
+    def warning(self, message):
+        self.inner.warning(message)
+
+
+class Instrumentation:
+    """
+    Raccoglie le misure delle fasi di un'esecuzione.
+
+    Args:
+        track_memory (bool): Se misurare il picco di memoria di ogni fase con tracemalloc.
+        profile (bool): Se profilare l'esecuzione con cProfile.
+    """
+
+    def __init__(self, track_memory=False, profile=False):
+        self.track_memory = track_memory
+        self.phases = []
+        self.profiler = cProfile.Profile() if profile else None
+        self._marks = {}
+        self._started_tracemalloc = False
+        self._running = False
+
+    def start(self):
+        """Avvia tracemalloc e il profiler, se richiesti."""
+        if self._running:
+            return
+        self._running = True
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def stop(self):
+        """Ferma tracemalloc e il profiler; si può chiamare più volte."""
+        if not self._running:
+            return
+        self._running = False
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Misura il blocco come fase `name`.
+
+        Le notifiche di avanzamento ricevute durante la fase tramite `reporter()`
+        la suddividono in sotto-fasi (es. sottoinsiemi target e selezione greedy).
+
+        Yields:
+            PhaseMetrics: Le misure della fase, a cui il chiamante può aggiungere dettagli.
+        """
+        metrics = PhaseMetrics(name)
+        self.phases.append(metrics)
+        self._marks.clear()
+        measure_memory = self.track_memory and tracemalloc.is_tracing()
+        if measure_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            end = time.perf_counter()
+            metrics.seconds = end - start
+            if measure_memory:
+                metrics.peak_memory = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+            self._split(metrics, start, end)
+
+    def _split(self, metrics, start, end):
+        # Una sotto-fase va dalla sua prima notifica alla prima notifica della successiva
+        marks = sorted((moment, phase) for phase, moment in self._marks.items())
+        if not marks:
+            return
+        boundaries = [moment for moment, _ in marks[1:]] + [end]
+        # Il tempo prima della prima notifica appartiene alla prima sotto-fase
+        moments = [start] + [moment for moment, _ in marks[1:]]
+        for (_, phase), begin, finish in zip(marks, moments, boundaries):
+            self.phases.append(PhaseMetrics(name=ENGINE_PHASE_NAMES.get(phase, phase),
+                                            seconds=finish - begin, parent=metrics.name))
+        self._marks.clear()
+
+    def reporter(self, inner=None):
+        """Reporter da passare ai motori per suddividere la fase corrente in sotto-fasi."""
+        return _PhaseMarker(self._marks, inner or ProgressReporter())
+
+    @staticmethod
+    def record_result(metrics, result):
+        """Aggiunge alla fase i contatori di un `GreedyResult`."""
+        metrics.details["combinazioni scelte"] = len(result.selected)
+        metrics.details["motore"] = result.engine
+        moves = result.stats.get("local_search_moves")
+        scanned = result.stats.get("candidates_scanned")
+        if moves is not None:
+            # Risultato della ricerca locale: i contatori del greedy si riferiscono alla fase precedente
+            metrics.details["mosse ricerca locale"] = moves
+        elif scanned is not None:
+            metrics.details["candidati esaminati"] = scanned
+            if result.selected:
+                metrics.details["candidati per scelta"] = round(scanned / len(result.selected), 1)
+
+    @property
+    def total_seconds(self):
+        """Durata complessiva delle fasi principali."""
+        return sum(metrics.seconds for metrics in self.phases if metrics.parent is None)
+
+    def rows(self):
+        """Le misure come lista di dizionari, una riga per fase (le sotto-fasi dopo la loro fase)."""
+        rows = []
+        for metrics in self.phases:
+            rows.append({
+                "fase": metrics.name if metrics.parent is None else f"{metrics.parent} › {metrics.name}",
+                "secondi": round(metrics.seconds, 4),
+                "memoria_mb": None if metrics.peak_memory is None else round(metrics.peak_memory / (1024 * 1024), 2),
+                "dettagli": ", ".join(f"{key}: {value}" for key, value in metrics.details.items()),
+            })
+        return rows
+
+    def summary_lines(self):
+        """Righe di diagnostica per l'intestazione dei file esportati."""
+        lines = [f"Diagnostica (tempo totale {self.total_seconds:.3f} s):"]
+        for row in self.rows():
+            line = f"  {row['fase']}: {row['secondi']:.3f} s"
+            if row["memoria_mb"] is not None:
+                line += f", picco memoria {row['memoria_mb']:.2f} MB"
+            if row["dettagli"]:
+                line += f", {row['dettagli']}"
+            lines.append(line)
+        return lines
+
+    def profile_bytes(self):
+        """
+        Le statistiche cProfile nel formato dei file pstats (leggibile con `pstats` o snakeviz).
+
+        Raises:
+            ValueError: Se la profilazione non è attiva.
+        """
+        if self.profiler is None:
+            raise ValueError("Profilazione non attiva.")
+        self.stop()
+        self.profiler.create_stats()
+        return marshal.dumps(self.profiler.stats)
+
+    def dump_profile(self, path):
+        """Salva le statistiche cProfile in un file pstats."""
+        data = self.profile_bytes()
+        with open(path, "wb") as file:
+            file.write(data)
+
+    def profile_text(self, limit=25, sort="cumulative"):
+        """Le funzioni più costose del profilo, come testo."""
+        if self.profiler is None:
+            return ""
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).strip_dirs().sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
@@ -0,0 +1,309 @@
+"""
+Esecuzione delle generazioni in background, con annullamento e limiti per utente.
+
+Le generazioni girano in un pool limitato di processi condiviso da tutte le
+sessioni: l'interfaccia riceve un identificativo del job, ne legge
+periodicamente lo stato (fase, avanzamento, messaggi, migliore copertura
+trovata) e può chiederne l'annullamento. Un job sopravvive ai rerun della
+pagina finché il suo risultato non viene ritirato.
+
+Lo stato dei job in esecuzione passa per un dizionario condiviso gestito da un
+`multiprocessing.Manager`; l'annullamento è un `Event` che il reporter del job
+controlla ad ogni notifica di avanzamento, così il calcolo si ferma al primo
+punto utile senza dover terminare il processo.
+"""
+
+import multiprocessing
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from .cover_cache import CoverCache
+from .instrumentation import Instrumentation
+from .parallel import default_workers
+from .preflight import default_memory_limit
+from .progress import ProgressReporter
+from .runner import run
+
+# Stati di un job
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+DEFAULT_JOBS_PER_OWNER = 1
+# I job conclusi e mai ritirati vengono dimenticati dopo questo tempo (secondi)
+DEFAULT_FINISHED_TTL = 3600
+# Intervallo minimo tra due aggiornamenti dello stato condiviso (secondi)
+STATE_UPDATE_INTERVAL = 0.2
+
+
+class JobCancelled(Exception):
+    """Sollevata nel processo del job quando ne è stato chiesto l'annullamento."""
+
+
+@dataclass
+class JobStatus:
+    """
+    Stato di un job, come visto dall'interfaccia.
+
+    Attributes:
+        job_id (str): Identificativo del job.
+        state (str): Uno tra JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_CANCELLED.
+        phase (str, optional): Fase in corso (es. "targets", "greedy", "local_search").
+        fraction (float): Avanzamento della fase (0..1).
+        best_size (int, optional): Dimensione della migliore copertura trovata dalla ricerca locale.
+        checkpoint (list, optional): Le combinazioni di quella copertura, se richieste.
+        messages (list): Coppie `(livello, messaggio)` con livello "info" o "warning".
+        error (str, optional): Il messaggio di errore se il job è fallito.
+    """
+    job_id: str
+    state: str
+    phase: str = None
+    fraction: float = 0.0
+    best_size: int = None
+    checkpoint: list = None
+    messages: list = field(default_factory=list)
+    error: str = None
+
+    @property
+    def finished(self):
+        return self.state in FINISHED_STATES
+
+
+class _JobReporter(ProgressReporter):
+    """Reporter eseguito nel processo del job: scrive lo stato condiviso e controlla l'annullamento."""
+
+    def __init__(self, job_id, shared, cancel_event, checkpoint):
+        self.job_id = job_id
+        self.shared = shared
+        self.cancel_event = cancel_event
+        self.checkpoint = checkpoint
+        self.state = {"state": JOB_RUNNING, "phase": None, "fraction": 0.0, "best_size": None,
+                      "checkpoint": None, "messages": []}
+        self._last_update = 0.0
+        self._publish(force=True)
+
+    def _publish(self, force=False):
+        now = time.monotonic()
+        if force or now - self._last_update >= STATE_UPDATE_INTERVAL:
+            self._last_update = now
+            self.shared[self.job_id] = dict(self.state)
+            if self.cancel_event.is_set():
+                raise JobCancelled()
+
+    def progress(self, phase, fraction):
+        changed = phase != self.state["phase"]
+        self.state["phase"] = phase
+        self.state["fraction"] = fraction
+        self._publish(force=changed)
+
+    def info(self, message):
+        self.state["messages"] = self.state["messages"] + [("info", message)]
+        self._publish(force=True)
+
+    def warning(self, message):
+        self.state["messages"] = self.state["messages"] + [("warning", message)]
+        self._publish(force=True)
+
+    def improvement(self, result):
+        self.state["best_size"] = len(result.selected)
+        if self.checkpoint:
+            self.state["checkpoint"] = sorted(result.combinations())
+        self._publish(force=True)
+
+
+def _execute_job(job_id, config, shared, cancel_event, use_cache, track_memory, profile, checkpoint, previous,
+                 memory_limit):
+    # Eseguita nel processo del pool
+    reporter = _JobReporter(job_id, shared, cancel_event, checkpoint)
+    cover_cache = None
+    if use_cache:
+        try:
+            cover_cache = CoverCache()
+        except (OSError, sqlite3.Error) as e:
+            reporter.warning(f"⚠ Cache delle coperture non disponibile: {e}")
+    with Instrumentation(track_memory=track_memory, profile=profile) as instrumentation:
+        outcome = run(config, reporter=reporter, cover_cache=cover_cache, instrumentation=instrumentation,
+                      on_improvement=reporter.improvement, previous=previous, memory_limit=memory_limit)
+    if profile:
+        outcome.profile_text = instrumentation.profile_text()
+        outcome.profile = instrumentation.profile_bytes()
+    reporter.state["fraction"] = 1.0
+    reporter.state["state"] = JOB_DONE
+    shared[job_id] = dict(reporter.state)
+    return outcome
+
+
+@dataclass
+class _Job:
+    job_id: str
+    owner: str
+    future: object
+    cancel_event: object
+    submitted: float
+    finished: float = None
+
+
+class JobManager:
+    """
+    Pool di processi che esegue le generazioni in background.
+
+    Args:
+        max_workers (int, optional): Job eseguiti contemporaneamente; gli altri restano
+            in coda. Predefinito metà dei core (almeno 1).
+        max_jobs_per_owner (int): Job non conclusi consentiti per ogni utente (sessione).
+        finished_ttl (float): Secondi dopo i quali un job concluso e non ritirato viene dimenticato.
+        memory_limit (int, optional): Memoria complessiva a disposizione dei job (byte), divisa
+            in parti uguali tra i processi; predefinita `default_memory_limit()`.
+    """
+
+    def __init__(self, max_workers=None, max_jobs_per_owner=DEFAULT_JOBS_PER_OWNER,
+                 finished_ttl=DEFAULT_FINISHED_TTL, memory_limit=None):
+        self.max_workers = max_workers or max(1, default_workers() // 2)
+        self.max_jobs_per_owner = max_jobs_per_owner
+        self.finished_ttl = finished_ttl
+        # I job in esecuzione contemporanea si dividono la memoria
+        self.job_memory_limit = (memory_limit or default_memory_limit()) // self.max_workers
+        context = multiprocessing.get_context()
+        self._manager = context.Manager()
+        self._shared = self._manager.dict()
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, owner, config, use_cache=True, track_memory=False, profile=False, checkpoint=False,
+               previous=None):
+        """
+        Accoda una generazione.
+
+        Args:
+            owner (str): Identificativo dell'utente (es. la sessione Streamlit).
+            config (RunConfig): I parametri della generazione.
+            use_cache (bool): Se usare la cache persistente delle coperture.
+            track_memory (bool): Se misurare la memoria di ogni fase.
+            profile (bool): Se profilare il job con cProfile (vedi `RunOutcome.profile`).
+            checkpoint (bool): Se pubblicare nello stato le combinazioni di ogni
+                copertura migliore trovata dall'ottimizzazione locale.
+            previous (RunOutcome, optional): Risultato precedente da estendere invece di
+                ricalcolare (vedi `run`).
+
+        Returns:
+            str: L'identificativo del job.
+
+        Raises:
+            ValueError: Se l'utente ha già il numero massimo di job non conclusi.
+        """
+        with self._lock:
+            self._purge()
+            active = [job for job in self._jobs.values() if job.owner == owner and not job.future.done()]
+            if len(active) >= self.max_jobs_per_owner:
+                raise ValueError(f"Hai già {len(active)} generazioni in corso: attendi che terminino o annullale.")
+            job_id = uuid.uuid4().hex
+            cancel_event = self._manager.Event()
+            self._shared[job_id] = {"state": JOB_QUEUED}
+            future = self._executor.submit(_execute_job, job_id, config, self._shared, cancel_event,
+                                           use_cache, track_memory, profile, checkpoint, previous,
+                                           self.job_memory_limit)
+            job = _Job(job_id=job_id, owner=owner, future=future, cancel_event=cancel_event,
+                       submitted=time.time())
+            future.add_done_callback(lambda _, job=job: setattr(job, "finished", time.time()))
+            self._jobs[job_id] = job
+        return job_id
+
+    def _get(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Job sconosciuto '{job_id}'.")
+        return job
+
+    def status(self, job_id):
+        """
+        Restituisce lo stato corrente del job.
+
+        Raises:
+            KeyError: Se il job non esiste (o è già stato ritirato).
+        """
+        job = self._get(job_id)
+        state = dict(self._shared.get(job_id, {}))
+        status = JobStatus(job_id=job_id, state=state.get("state", JOB_QUEUED), phase=state.get("phase"),
+                           fraction=state.get("fraction", 0.0), best_size=state.get("best_size"),
+                           checkpoint=state.get("checkpoint"), messages=state.get("messages", []))
+        future = job.future
+        if future.done():
+            if future.cancelled():
+                status.state = JOB_CANCELLED
+            else:
+                error = future.exception()
+                if isinstance(error, JobCancelled):
+                    status.state = JOB_CANCELLED
+                elif error is not None:
+                    status.state = JOB_FAILED
+                    status.error = str(error)
+                else:
+                    status.state = JOB_DONE
+        return status
+
+    def result(self, job_id, forget=True):
+        """
+        Restituisce il `RunOutcome` di un job concluso con successo.
+
+        Args:
+            forget (bool): Se dimenticare il job dopo averne letto il risultato.
+
+        Raises:
+            KeyError: Se il job non esiste.
+            ValueError: Se il job non è concluso con successo.
+        """
+        job = self._get(job_id)
+        status = self.status(job_id)
+        if status.state != JOB_DONE:
+            raise ValueError(f"Il job non è concluso con successo (stato: {status.state}).")
+        outcome = job.future.result()
+        if forget:
+            self.forget(job_id)
+        return outcome
+
+    def cancel(self, job_id):
+        """Chiede l'annullamento del job: immediato se è in coda, al primo punto utile se è in esecuzione."""
+        self._cancel_job(self._get(job_id))
+
+    def forget(self, job_id):
+        """Rimuove un job concluso (un job ancora attivo viene prima annullato)."""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is None:
+            return
+        if not job.future.done():
+            self._cancel_job(job)
+        self._shared.pop(job_id, None)
+
+    @staticmethod
+    def _cancel_job(job):
+        if not job.future.cancel():
+            job.cancel_event.set()
+
+    def active_jobs(self, owner):
+        """Identificativi dei job non conclusi dell'utente."""
+        return [job.job_id for job in self._jobs.values() if job.owner == owner and not job.future.done()]
+
+    def _purge(self):
+        # Chiamata con il lock acquisito
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished is not None and now - job.finished > self.finished_ttl]
+        for job_id in expired:
+            self._jobs.pop(job_id)
+            self._shared.pop(job_id, None)
+
+    def shutdown(self):
+        """Annulla i job in corso e chiude il pool."""
+        for job in list(self._jobs.values()):
+            self._cancel_job(job)
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._manager.shutdown()
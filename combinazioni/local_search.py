@@ -0,0 +1,227 @@
+"""
+Ottimizzazione locale delle coperture prodotte dai motori greedy.
+
+La copertura greedy è di solito più grande delle migliori coperture note. Questo
+modulo prova a ridurla entro un tempo massimo con il simulated annealing:
+
+1. si toglie dalla copertura la combinazione che copre meno sottoinsiemi in
+   modo esclusivo, lasciando alcuni sottoinsiemi scoperti;
+2. si cerca di tornare a zero sottoinsiemi scoperti con mosse di scambio:
+   si sceglie un sottoinsieme scoperto T e si sostituisce una combinazione
+   della copertura con una che contiene T;
+3. se ci si riesce si ha una copertura valida più piccola e si riparte dal punto 1.
+
+Per ogni t-sottoinsieme si tiene il numero di combinazioni della copertura che
+lo contengono, più la lista dei sottoinsiemi scoperti: il costo di una mossa si
+calcola guardando solo i C(k, t) sottoinsiemi delle due combinazioni coinvolte.
+
+Alla scadenza del tempo viene restituita la migliore copertura valida trovata,
+che nel caso peggiore è quella di partenza.
+"""
+
+import math
+import random
+import time
+from array import array
+
+from .greedy import STOP_COMPLETE, GreedyResult, _report, build_subset_table
+from .ranking import SubsetRanker, rank_lex, unrank_colex
+
+PHASE_LOCAL_SEARCH = "local_search"
+
+DEFAULT_INITIAL_TEMPERATURE = 0.4
+DEFAULT_COOLING = 0.9998
+MIN_TEMPERATURE = 0.15
+# Combinazioni estratte a caso tra cui scegliere quella da modificare ad ogni mossa
+SAMPLED_BLOCKS = 8
+
+
+class _CoverState:
+    """Copertura corrente con i contatori per sottoinsieme e la lista dei scoperti."""
+
+    def __init__(self, universe, blocks, block_ranks):
+        self.blocks = list(blocks)
+        self.block_ranks = list(block_ranks)
+        self.counts = array("i", [0]) * universe
+        # uncovered contiene i rank scoperti; slot[r] è la loro posizione nella lista (-1 se coperto)
+        self.uncovered = []
+        self.slot = array("q", [-1]) * universe
+        for ranks in self.block_ranks:
+            for r in ranks:
+                self.counts[r] += 1
+
+    def _uncover(self, r):
+        self.slot[r] = len(self.uncovered)
+        self.uncovered.append(r)
+
+    def _cover(self, r):
+        position = self.slot[r]
+        last = self.uncovered.pop()
+        if last != r:
+            self.uncovered[position] = last
+            self.slot[last] = position
+        self.slot[r] = -1
+
+    def exclusive_counts(self):
+        """Per ogni combinazione, quanti sottoinsiemi copre solo lei."""
+        counts = self.counts
+        return [sum(1 for r in ranks if counts[r] == 1) for ranks in self.block_ranks]
+
+    def remove(self, index):
+        """Toglie la combinazione `index` dalla copertura."""
+        counts = self.counts
+        for r in self.block_ranks[index]:
+            counts[r] -= 1
+            if counts[r] == 0:
+                self._uncover(r)
+        last = len(self.blocks) - 1
+        self.blocks[index] = self.blocks[last]
+        self.block_ranks[index] = self.block_ranks[last]
+        self.blocks.pop()
+        self.block_ranks.pop()
+
+    def delta(self, index, new_ranks):
+        """Variazione del numero di scoperti sostituendo la combinazione `index`."""
+        counts = self.counts
+        old_ranks = self.block_ranks[index]
+        old_set = set(old_ranks)
+        new_set = set(new_ranks)
+        lost = sum(1 for r in old_ranks if counts[r] == 1 and r not in new_set)
+        gained = sum(1 for r in new_ranks if counts[r] == 0 and r not in old_set)
+        return lost - gained
+
+    def replace(self, index, block, new_ranks):
+        """Sostituisce la combinazione `index` aggiornando contatori e scoperti."""
+        counts = self.counts
+        for r in self.block_ranks[index]:
+            counts[r] -= 1
+            if counts[r] == 0:
+                self._uncover(r)
+        for r in new_ranks:
+            if counts[r] == 0:
+                self._cover(r)
+            counts[r] += 1
+        self.blocks[index] = block
+        self.block_ranks[index] = new_ranks
+
+
+def _target_index(space, guarantee_size):
+    # Per uno spazio parziale: indice inverso sottoinsieme -> posizioni dei candidati che lo contengono
+    table, stride, _, _ = build_subset_table(space, guarantee_size)
+    members = {}
+    for entry, subset_rank in enumerate(table):
+        members.setdefault(subset_rank, []).append(entry // stride)
+    return members
+
+
+def improve_cover(result, guarantee_size, time_budget, progress=None, on_improvement=None, rng=None,
+                  max_iterations=None, initial_temperature=DEFAULT_INITIAL_TEMPERATURE, cooling=DEFAULT_COOLING):
+    """
+    Riduce una copertura completa con il simulated annealing, entro un tempo massimo.
+
+    Args:
+        result (GreedyResult): Il risultato di un motore, con copertura completa.
+        guarantee_size (int): Dimensione t dei sottoinsiemi garantiti.
+        time_budget (float): Secondi a disposizione.
+        progress (callable, optional): Callback `progress(fase, frazione)`, con fase
+            PHASE_LOCAL_SEARCH e frazione pari al tempo trascorso.
+        on_improvement (callable, optional): Chiamata con il nuovo `GreedyResult`
+            ogni volta che si trova una copertura valida più piccola.
+        rng (random.Random, optional): Generatore casuale. Predefinito il modulo `random`.
+        max_iterations (int, optional): Limite di mosse, oltre a quello di tempo.
+        initial_temperature (float): Temperatura iniziale del simulated annealing.
+        cooling (float): Fattore di raffreddamento applicato ad ogni mossa.
+
+    Returns:
+        GreedyResult: La migliore copertura valida trovata (quella iniziale se non
+        si trova di meglio o se la copertura di partenza non è completa).
+    """
+    space = result.space
+    if result.stop_reason != STOP_COMPLETE or guarantee_size >= space.k or len(result.selected) <= 1:
+        return result
+
+    rng = rng or random
+    n = len(space.pool)
+    k = space.k
+    ranker = SubsetRanker(n, k, guarantee_size)
+    if space.is_complete:
+        position_of = None
+        members = None
+    else:
+        position_of = {space.rank(position): position for position in range(len(space))}
+        members = _target_index(space, guarantee_size)
+
+    blocks = [space.indices(position) for position in result.selected]
+    state = _CoverState(ranker.count, blocks, [ranker.ranks(block) for block in blocks])
+    best = result
+
+    start = time.monotonic()
+    deadline = start + time_budget
+    next_report = start
+    iterations = 0
+    temperature = initial_temperature
+
+    while True:
+        if not state.uncovered:
+            # Copertura valida: la registra se migliore e toglie una combinazione
+            # Una mossa può reinserire una combinazione già presente: i doppioni si scartano
+            selected = list(dict.fromkeys(rank_lex(block, n) for block in state.blocks))
+            if position_of is not None:
+                selected = [position_of[rank] for rank in selected]
+            if len(selected) < len(best.selected):
+                best = GreedyResult(space=space, selected=selected, covered=result.covered,
+                                    required=result.required, stop_reason=STOP_COMPLETE,
+                                    engine=f"{result.engine}+local")
+                if on_improvement is not None:
+                    on_improvement(best)
+            if len(state.blocks) <= 1:
+                break
+            exclusive = state.exclusive_counts()
+            state.remove(exclusive.index(min(exclusive)))
+            temperature = initial_temperature
+            continue
+
+        iterations += 1
+        if max_iterations is not None and iterations > max_iterations:
+            break
+        if iterations % 256 == 0:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if now >= next_report:
+                _report(progress, PHASE_LOCAL_SEARCH, (now - start) / time_budget)
+                next_report = now + 0.1
+
+        # Mossa: si sceglie un sottoinsieme scoperto T e, tra alcune combinazioni della
+        # copertura estratte a caso, quella con più numeri in comune con T; le si
+        # aggiungono i numeri mancanti di T al posto di altrettanti numeri estranei a T
+        target = state.uncovered[rng.randrange(len(state.uncovered))]
+        if members is None:
+            target_indices = unrank_colex(target, guarantee_size)
+            target_set = set(target_indices)
+            index = -1
+            best_overlap = -1
+            for _ in range(SAMPLED_BLOCKS):
+                candidate = rng.randrange(len(state.blocks))
+                overlap = len(target_set.intersection(state.blocks[candidate]))
+                if overlap > best_overlap:
+                    index, best_overlap = candidate, overlap
+            old_block = state.blocks[index]
+            missing = [i for i in target_indices if i not in old_block]
+            others = [i for i in old_block if i not in target_set]
+            dropped = set(rng.sample(others, len(missing)))
+            block = tuple(sorted([i for i in old_block if i not in dropped] + missing))
+        else:
+            index = rng.randrange(len(state.blocks))
+            candidates = members[target]
+            block = space.indices(candidates[rng.randrange(len(candidates))])
+        new_ranks = ranker.ranks(block)
+
+        delta = state.delta(index, new_ranks)
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            state.replace(index, block, new_ranks)
+        temperature = max(MIN_TEMPERATURE, temperature * cooling)
+
+    _report(progress, PHASE_LOCAL_SEARCH, 1.0)
+    best.stats = dict(result.stats, local_search_moves=iterations)
+    return best
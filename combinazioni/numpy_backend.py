@@ -0,0 +1,203 @@
+"""
+Backend NumPy (opzionale) per il greedy con garanzia.
+
+Precalcola una volta per esecuzione la tabella di incidenza candidato -> rank
+dei t-sottoinsiemi, un array denso `int32` di forma (C(v,k), C(k,t)). Il
+punteggio di tutti i candidati si ottiene con un'unica somma vettoriale sulla
+maschera di copertura e, dopo ogni scelta, i guadagni vengono aggiornati in
+blocco solo per i candidati che condividono i sottoinsiemi appena coperti.
+
+Se NumPy non è installato o la tabella supererebbe il budget di memoria,
+si ricade sul motore `greedy_lazy` in puro Python, che produce la stessa
+selezione.
+"""
+
+from itertools import combinations
+from math import comb
+
+try:
+    import numpy as np
+except ImportError:  # NumPy è una dipendenza opzionale
+    np = None
+
+from .greedy import (
+    PHASE_GREEDY,
+    PHASE_TARGETS,
+    STOP_EXHAUSTED,
+    STOP_LIMIT,
+    STOP_NO_GAIN,
+    GreedyResult,
+    greedy_lazy,
+)
+from .generation import DEFAULT_CHUNK_SIZE
+from .ranking import RankedCombinations
+
+# Budget di memoria predefinito per le strutture NumPy (byte)
+DEFAULT_NUMPY_MEMORY_BUDGET = 512 * 1024 * 1024
+
+
+def numpy_available():
+    """True se NumPy è installato."""
+    return np is not None
+
+
+def estimate_numpy_memory(num_candidates, k, guarantee_size, pool_size):
+    """
+    Stima la memoria di picco del backend NumPy, in byte.
+
+    Comprende la tabella di incidenza (int32), l'indice inverso con il relativo
+    ordinamento (int64 + int32), i guadagni e le maschere. Gli indici dei
+    candidati sono elaborati a blocchi e non contano.
+    """
+    stride = comb(k, guarantee_size)
+    entries = num_candidates * stride
+    universe = comb(pool_size, guarantee_size)
+    return entries * (4 + 8 + 4) + num_candidates * 8 + universe * 9
+
+
+def binomial_table(pool_size, guarantee_size):
+    """Matrice `int64` con binomials[j, c] = C(c, j + 1), per c < pool_size e j < guarantee_size."""
+    return np.array([[comb(c, j + 1) for c in range(pool_size)] for j in range(guarantee_size)],
+                    dtype=np.int64)
+
+
+def subset_rank_matrix(indices, guarantee_size, binomials, out=None):
+    """
+    Rank colessicografici dei t-sottoinsiemi di ogni riga di `indices`.
+
+    Args:
+        indices (numpy.ndarray): Matrice (n, k) di indici nel pool, crescenti per riga.
+        guarantee_size (int): Dimensione t dei sottoinsiemi.
+        binomials (numpy.ndarray): Tabella di `binomial_table` per il pool.
+        out (numpy.ndarray, optional): Matrice (n, C(k, t)) azzerata in cui scrivere i rank.
+
+    Returns:
+        numpy.ndarray: La matrice (n, C(k, t)) dei rank; la colonna j corrisponde al
+        j-esimo t-sottoinsieme delle posizioni in ordine lessicografico.
+    """
+    patterns = list(combinations(range(indices.shape[1]), guarantee_size))
+    if out is None:
+        out = np.zeros((indices.shape[0], len(patterns)), dtype=np.int64)
+    for column, pattern in enumerate(patterns):
+        for j, position in enumerate(pattern):
+            out[:, column] += binomials[j, indices[:, position]]
+    return out
+
+
+def unrank_colex_matrix(ranks, size, binomials):
+    """
+    Sottoinsiemi di `size` indici con i rank colessicografici dati, in blocco.
+
+    Args:
+        ranks (sequence): I rank colessicografici.
+        size (int): Dimensione dei sottoinsiemi.
+        binomials (numpy.ndarray): Tabella di `binomial_table` con almeno `size` righe.
+
+    Returns:
+        numpy.ndarray: Matrice (len(ranks), size) di indici, crescenti per riga.
+    """
+    remainder = np.array(ranks, dtype=np.int64)
+    out = np.empty((remainder.shape[0], size), dtype=np.int64)
+    for j in range(size, 0, -1):
+        column = np.searchsorted(binomials[j - 1], remainder, side="right") - 1
+        out[:, j - 1] = column
+        remainder -= binomials[j - 1, column]
+    return out
+
+
+def _incidence_table(space, guarantee_size, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Per ogni blocco di candidati: matrice (blocco, k) degli indici nel pool e somma
+    # dei coefficienti binomiali colonna per colonna. table[:, j] è il rank colex
+    # del j-esimo t-sottoinsieme; la matrice degli indici non è mai completa in memoria.
+    k = space.k
+    binomials = binomial_table(len(space.pool), guarantee_size).astype(np.int32)
+    table = np.zeros((len(space), comb(k, guarantee_size)), dtype=np.int32)
+    row = 0
+    for chunk in space.iter_chunks(chunk_size):
+        indices = np.array(chunk, dtype=np.int16).reshape(len(chunk), k)
+        subset_rank_matrix(indices, guarantee_size, binomials, out=table[row:row + len(chunk)])
+        row += len(chunk)
+    return table
+
+
+def greedy_numpy(full_combinations, guarantee_size, max_combinations=None, progress=None,
+                 memory_budget=DEFAULT_NUMPY_MEMORY_BUDGET):
+    """
+    Greedy vettorializzato con NumPy; stessa selezione di `greedy_classic`.
+
+    Args:
+        full_combinations (sequence): Combinazioni candidate (tuple ordinate o `RankedCombinations`).
+        guarantee_size (int): Dimensione t dei sottoinsiemi da garantire.
+        max_combinations (int, optional): Limite massimo di combinazioni da selezionare.
+        progress (callable, optional): Callback `progress(fase, frazione)`.
+        memory_budget (int): Memoria massima (byte) concessa alle strutture NumPy;
+            oltre questa soglia si usa il motore in puro Python.
+
+    Returns:
+        GreedyResult: La selezione e lo stato di copertura finale.
+    """
+    space = RankedCombinations.from_combinations(full_combinations)
+    num_candidates = len(space)
+    pool_size = len(space.pool)
+    estimate = estimate_numpy_memory(num_candidates, space.k, guarantee_size, pool_size)
+    if np is None or estimate > memory_budget or comb(pool_size, guarantee_size) >= 2 ** 31:
+        return greedy_lazy(space, guarantee_size, max_combinations, progress)
+
+    table = _incidence_table(space, guarantee_size)
+    stride = table.shape[1]
+    universe = comb(pool_size, guarantee_size)
+    if space.is_complete:
+        required = universe
+    else:
+        is_target = np.zeros(universe, dtype=bool)
+        is_target[table.ravel()] = True
+        required = int(is_target.sum())
+        del is_target
+    if progress is not None:
+        progress(PHASE_TARGETS, 1.0)
+
+    # Indice inverso rank -> candidati: members[offsets[r]:offsets[r + 1]]
+    flat = table.ravel()
+    order = np.argsort(flat, kind="stable")
+    members = (order // stride).astype(np.int32)
+    del order
+    offsets = np.zeros(universe + 1, dtype=np.int64)
+    np.cumsum(np.bincount(flat, minlength=universe), out=offsets[1:])
+
+    covered = np.zeros(universe, dtype=np.uint8)
+    # Punteggio iniziale di tutti i candidati in un'unica somma sulla maschera
+    gains = stride - covered[table].sum(axis=1, dtype=np.int32)
+
+    result = GreedyResult(space=space, required=required, engine="numpy")
+    remaining = num_candidates
+    scanned = 0
+    while result.covered < result.required and remaining:
+        best_index = int(np.argmax(gains))  # primo massimo: stesso spareggio dei motori Python
+        scanned += remaining  # argmax valuta tutti i candidati non ancora scelti
+        if gains[best_index] <= 0:
+            result.stop_reason = STOP_NO_GAIN
+            break
+
+        remaining -= 1
+        result.selected.append(best_index)
+        row = table[best_index]
+        newly = row[covered[row] == 0]
+        covered[newly] = 1
+        result.covered += len(newly)
+        result.gains.append(len(newly))
+        # Aggiornamento in blocco dei candidati che condividono i sottoinsiemi appena coperti
+        affected = np.concatenate([members[offsets[r]:offsets[r + 1]] for r in newly])
+        np.subtract.at(gains, affected, 1)
+        gains[best_index] = -1
+        if progress is not None:
+            progress(PHASE_GREEDY, result.covered / result.required)
+
+        if max_combinations is not None and len(result.selected) >= max_combinations:
+            result.stop_reason = STOP_LIMIT
+            break
+    else:
+        if result.covered < result.required:
+            result.stop_reason = STOP_EXHAUSTED
+
+    result.stats["candidates_scanned"] = scanned
+    return result
@@ -0,0 +1,213 @@
+"""
+Greedy per orbite sotto un gruppo ciclico di permutazioni del pool.
+
+Il gruppo ruota i primi `m = v - fixed_points` indici del pool (i -> i + 1 mod m)
+e lascia fermi gli ultimi `fixed_points`. Un'orbita di combinazioni è l'insieme
+delle sue rotazioni: invece di valutare tutte le C(v, k) combinazioni, il
+motore valuta un solo rappresentante per orbita (circa C(v, k) / m candidati)
+e sceglie ogni volta un'orbita intera.
+
+La copertura si ragiona per orbite anche sui t-sottoinsiemi: un'orbita di
+combinazioni contiene un rappresentante di un'orbita di t-sottoinsiemi se e
+solo se, ruotando, li contiene tutti. Il guadagno di un'orbita è quindi il
+numero di t-sottoinsiemi nuovi coperti dalle orbite che tocca, e il greedy
+sceglie l'orbita con il miglior guadagno per combinazione aggiunta (a parità,
+la prima generata), con rivalutazione pigra dei guadagni.
+
+Non serve l'elenco dei candidati: il motore lavora solo sullo spazio completo
+delle combinazioni del pool, e il risultato non coincide con quello dei motori
+greedy esatti (di solito è un po' più grande, ma si calcola anche per pool di
+30-40 numeri con k >= 6).
+"""
+
+import heapq
+from array import array
+from itertools import combinations
+from math import comb
+
+from .greedy import (
+    PHASE_GREEDY,
+    PHASE_TARGETS,
+    STOP_LIMIT,
+    STOP_NO_GAIN,
+    GreedyResult,
+    greedy_lazy,
+)
+from .ranking import RankedCombinations, SubsetRanker, rank_lex
+
+# Massimo numero di t-sottoinsiemi gestibili (la mappa delle orbite usa 4 byte ciascuno)
+MAX_ORBIT_UNIVERSE = 1 << 26
+
+
+def _cyclic_representatives(m, size):
+    # Orbite dei size-sottoinsiemi di Z_m: ogni orbita ha un elemento che contiene 0, e tra
+    # questi il rappresentante è quello con la sequenza dei salti ciclici lessicograficamente
+    # minima. Il periodo della sequenza dà la dimensione dell'orbita.
+    if size == 0:
+        yield (), 1
+        return
+    if size == 1:
+        yield (0,), m
+        return
+    # Il primo salto è il minimo, quindi non supera m / size
+    for first in range(1, m // size + 1):
+        for tail in combinations(range(first + 1, m), size - 2):
+            rest = (first,) + tail
+            subset = (0,) + rest
+            gaps = tuple(b - a for a, b in zip(subset, rest)) + (m - subset[-1],)
+            period = size
+            for shift in range(1, size):
+                rotated = gaps[shift:] + gaps[:shift]
+                if rotated < gaps:
+                    period = None
+                    break
+                if rotated == gaps:
+                    period = shift
+                    break
+            if period is not None:
+                yield subset, m * period // size
+
+
+def orbit_representatives(pool_size, size, fixed_points=0):
+    """
+    Rappresentanti delle orbite dei `size`-sottoinsiemi degli indici del pool.
+
+    Args:
+        pool_size (int): Numero v di elementi del pool.
+        size (int): Dimensione dei sottoinsiemi.
+        fixed_points (int): Indici finali lasciati fermi dal gruppo.
+
+    Returns:
+        iterator: Coppie `(indici crescenti, dimensione dell'orbita)`.
+    """
+    m = pool_size - fixed_points
+    for count in range(min(fixed_points, size) + 1):
+        if size - count > m:
+            continue
+        for fixed_part in combinations(range(m, pool_size), count):
+            for rotating, orbit_size in _cyclic_representatives(m, size - count):
+                yield rotating + fixed_part, orbit_size
+
+
+def orbit_members(indices, orbit_size, m):
+    """Le `orbit_size` combinazioni dell'orbita di `indices` (indici crescenti), come tuple crescenti."""
+    rotating = [i for i in indices if i < m]
+    fixed_part = tuple(i for i in indices if i >= m)
+    return [tuple(sorted((i + shift) % m for i in rotating)) + fixed_part for shift in range(orbit_size)]
+
+
+def greedy_orbit(full_combinations, guarantee_size, max_combinations=None, progress=None, fixed_points=0):
+    """
+    Greedy per orbite sotto il gruppo ciclico degli indici del pool.
+
+    Args:
+        full_combinations (sequence): Combinazioni candidate (tuple ordinate o `RankedCombinations`);
+            il motore richiede lo spazio completo, altrimenti usa `greedy_lazy`.
+        guarantee_size (int): Dimensione t dei sottoinsiemi da garantire.
+        max_combinations (int, optional): Limite massimo di combinazioni; l'ultima
+            orbita viene troncata se necessario.
+        progress (callable, optional): Callback `progress(fase, frazione)`.
+        fixed_points (int): Numeri del pool (i più grandi) lasciati fermi dalla rotazione.
+
+    Returns:
+        GreedyResult: La selezione, orbita per orbita, e la copertura ottenuta.
+
+    Raises:
+        ValueError: Se `fixed_points` non è valido o i t-sottoinsiemi sono troppi.
+    """
+    space = RankedCombinations.from_combinations(full_combinations)
+    if not space.is_complete:
+        return greedy_lazy(space, guarantee_size, max_combinations, progress)
+    pool_size = len(space.pool)
+    k = space.k
+    if not 0 <= fixed_points < pool_size:
+        raise ValueError(f"I punti fissi devono essere tra 0 e {pool_size - 1}.")
+    universe = comb(pool_size, guarantee_size)
+    if universe > MAX_ORBIT_UNIVERSE:
+        raise ValueError(f"Troppi sottoinsiemi da garantire ({universe:,}) per il motore per orbite.")
+    m = pool_size - fixed_points
+    binomials = [[comb(c, j + 1) for c in range(pool_size)] for j in range(guarantee_size)]
+
+    # Orbite dei t-sottoinsiemi: orbit_of[rank colex] -> orbita, con le relative dimensioni
+    orbit_of = array("i", [-1]) * universe
+    target_sizes = array("i")
+    for indices, orbit_size in orbit_representatives(pool_size, guarantee_size, fixed_points):
+        orbit_id = len(target_sizes)
+        target_sizes.append(orbit_size)
+        for member in orbit_members(indices, orbit_size, m):
+            orbit_of[sum(binomials[j][c] for j, c in enumerate(member))] = orbit_id
+
+    # Orbite delle combinazioni: rappresentante, dimensione e orbite di t-sottoinsiemi toccate
+    ranker = SubsetRanker(pool_size, k, guarantee_size)
+    expected = max(1, comb(pool_size, k) // m)  # numero approssimato di orbite
+    update_interval = max(1, expected // 100)
+    representatives = []
+    sizes = array("i")
+    offsets = array("q", [0])
+    touched = array("i")
+    for number, (indices, orbit_size) in enumerate(orbit_representatives(pool_size, k, fixed_points), start=1):
+        representatives.append(indices)
+        sizes.append(orbit_size)
+        touched.extend(set(orbit_of[subset_rank] for subset_rank in ranker.ranks(indices)))
+        offsets.append(len(touched))
+        if progress is not None and number % update_interval == 0:
+            progress(PHASE_TARGETS, min(1.0, number / expected))
+    if progress is not None:
+        progress(PHASE_TARGETS, 1.0)
+
+    covered_orbits = bytearray(len(target_sizes))
+
+    def gain(candidate):
+        return sum(target_sizes[t] for t in touched[offsets[candidate]:offsets[candidate + 1]]
+                   if not covered_orbits[t])
+
+    # Coda con rivalutazione pigra: i guadagni per combinazione possono solo diminuire
+    heap = [(-gain(candidate) / sizes[candidate], candidate) for candidate in range(len(sizes))]
+    heapq.heapify(heap)
+    scanned = len(heap)
+
+    result = GreedyResult(space=space, required=universe, engine="orbit")
+    truncated = False
+    while result.covered < result.required:
+        if not heap:
+            result.stop_reason = STOP_NO_GAIN
+            break
+        score, candidate = heapq.heappop(heap)
+        scanned += 1
+        current = gain(candidate)
+        if current == 0:
+            continue
+        if -current / sizes[candidate] != score:
+            heapq.heappush(heap, (-current / sizes[candidate], candidate))
+            continue
+
+        members = orbit_members(representatives[candidate], sizes[candidate], m)
+        if max_combinations is not None and len(result.selected) + len(members) > max_combinations:
+            members = members[:max_combinations - len(result.selected)]
+            truncated = True
+        result.selected.extend(rank_lex(member, pool_size) for member in members)
+        if truncated:
+            result.covered = _count_covered(result, ranker)
+        else:
+            for t in touched[offsets[candidate]:offsets[candidate + 1]]:
+                covered_orbits[t] = 1
+            result.covered += current
+        if progress is not None:
+            progress(PHASE_GREEDY, result.covered / result.required)
+        if max_combinations is not None and len(result.selected) >= max_combinations:
+            if result.covered < result.required:
+                result.stop_reason = STOP_LIMIT
+            break
+
+    result.stats["candidates_scanned"] = scanned
+    result.stats["orbits"] = len(sizes)
+    return result
+
+
+def _count_covered(result, ranker):
+    # Copertura esatta di una selezione che termina con un'orbita troncata
+    covered = bytearray(ranker.count)
+    for position in result.selected:
+        for subset_rank in ranker.ranks(result.space.indices(position)):
+            covered[subset_rank] = 1
+    return ranker.count - covered.count(0)
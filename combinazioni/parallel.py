@@ -0,0 +1,225 @@
+"""
+Valutazione parallela dei candidati del greedy su più processi.
+
+I candidati vengono suddivisi in blocchi contigui, uno per processo. La mappa
+di copertura sta in memoria condivisa (`multiprocessing.shared_memory`) e non
+viene mai ri-serializzata: ad ogni iterazione il coordinatore invia ai worker
+solo la posizione dell'ultima combinazione scelta, ogni worker trova il
+miglior candidato del proprio blocco leggendo la copertura condivisa e il
+coordinatore riduce i migliori locali al migliore globale (guadagno massimo,
+a parità la posizione più bassa). La selezione coincide quindi con quella
+dei motori seriali.
+
+Ogni worker tiene i guadagni dei propri candidati in una coda a bucket con
+valutazione pigra: i valori memorizzati sono limiti superiori (i guadagni
+possono solo diminuire) e vengono ricalcolati sulla copertura condivisa solo
+quando un candidato arriva in cima alla coda.
+"""
+
+import heapq
+import multiprocessing
+import os
+from array import array
+from multiprocessing import shared_memory
+
+from .greedy import (
+    PHASE_GREEDY,
+    PHASE_TARGETS,
+    STOP_EXHAUSTED,
+    STOP_LIMIT,
+    STOP_NO_GAIN,
+    GreedyResult,
+    greedy_lazy,
+    rank_typecode,
+)
+from .ranking import RankedCombinations, SubsetRanker
+
+
+def default_workers():
+    """Numero di processi predefinito: i core disponibili."""
+    return os.cpu_count() or 1
+
+
+def _worker_main(conn, covered_name, targets_name, pool, k, ranks, start, stop, guarantee_size):
+    # `ranks` è None per lo spazio completo, altrimenti contiene solo i rank del blocco
+    covered_shm = shared_memory.SharedMemory(name=covered_name)
+    targets_shm = shared_memory.SharedMemory(name=targets_name) if targets_name else None
+    covered = covered_shm.buf
+    try:
+        if ranks is None:
+            block = RankedCombinations(pool, k).iter_indices(start, stop)
+        else:
+            block = RankedCombinations(pool, k, ranks).iter_indices()
+        ranker = SubsetRanker(len(pool), k, guarantee_size)
+        stride = ranker.stride
+        table = array(rank_typecode(ranker.count))
+        for indices in block:
+            table.extend(ranker.ranks(indices))
+        if targets_shm is not None:
+            targets = targets_shm.buf
+            for subset_rank in table:
+                targets[subset_rank] = 1
+            del targets
+
+        size = stop - start
+        taken = bytearray(size)
+        bounds = array("i", [stride]) * size
+        buckets = [[] for _ in range(stride + 1)]
+        buckets[stride] = list(range(size))
+        top = stride
+        conn.send("ready")
+
+        while True:
+            command, picked = conn.recv()
+            if command == "stop":
+                break
+            if picked is not None and start <= picked < stop:
+                taken[picked - start] = 1
+
+            # Migliore candidato locale: ricalcolo pigro dei limiti superiori
+            best = (0, None)
+            examined = 0
+            while top > 0:
+                heap = buckets[top]
+                while heap:
+                    local = heap[0]
+                    examined += 1
+                    if taken[local] or bounds[local] != top:
+                        heapq.heappop(heap)
+                        continue
+                    offset = local * stride
+                    gain = sum(1 for subset_rank in table[offset:offset + stride]
+                               if not covered[subset_rank])
+                    if gain == top:
+                        best = (gain, start + local)
+                        break
+                    heapq.heappop(heap)
+                    bounds[local] = gain
+                    heapq.heappush(buckets[gain], local)
+                if best[1] is not None:
+                    break
+                top -= 1
+            conn.send(best + (examined,))
+    finally:
+        del covered
+        covered_shm.close()
+        if targets_shm is not None:
+            targets_shm.close()
+        conn.close()
+
+
+def greedy_parallel(full_combinations, guarantee_size, max_combinations=None, progress=None, workers=None):
+    """
+    Greedy con valutazione dei candidati distribuita su più processi.
+
+    Args:
+        full_combinations (sequence): Combinazioni candidate (tuple ordinate o `RankedCombinations`).
+        guarantee_size (int): Dimensione t dei sottoinsiemi da garantire.
+        max_combinations (int, optional): Limite massimo di combinazioni da selezionare.
+        progress (callable, optional): Callback `progress(fase, frazione)`.
+        workers (int, optional): Numero di processi; predefinito il numero di core.
+            Con un solo processo si usa `greedy_lazy`.
+
+    Returns:
+        GreedyResult: La selezione e lo stato di copertura finale, identica a quella seriale.
+    """
+    space = RankedCombinations.from_combinations(full_combinations)
+    num_candidates = len(space)
+    workers = min(workers or default_workers(), num_candidates)
+    if workers <= 1:
+        return greedy_lazy(space, guarantee_size, max_combinations, progress)
+
+    ranker = SubsetRanker(len(space.pool), space.k, guarantee_size)
+    universe = ranker.count
+    covered_shm = shared_memory.SharedMemory(create=True, size=universe)
+    targets_shm = None if space.is_complete else shared_memory.SharedMemory(create=True, size=universe)
+    covered = covered_shm.buf
+    covered[:universe] = bytes(universe)
+    if targets_shm is not None:
+        targets_shm.buf[:universe] = bytes(universe)
+
+    context = multiprocessing.get_context()
+    connections = []
+    processes = []
+    try:
+        bounds = [num_candidates * w // workers for w in range(workers + 1)]
+        for w in range(workers):
+            start, stop = bounds[w], bounds[w + 1]
+            ranks = None if space.ranks is None else space.ranks[start:stop]
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker_main,
+                args=(child_conn, covered_shm.name, targets_shm.name if targets_shm else None,
+                      space.pool, space.k, ranks, start, stop, guarantee_size),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            connections.append(parent_conn)
+            processes.append(process)
+
+        for done, conn in enumerate(connections, start=1):
+            conn.recv()
+            if progress is not None:
+                progress(PHASE_TARGETS, done / workers)
+
+        if targets_shm is None:
+            required = universe
+        else:
+            required = bytes(targets_shm.buf[:universe]).count(1)
+
+        result = GreedyResult(space=space, required=required, engine="parallel")
+        picked = None
+        remaining = num_candidates
+        scanned = 0
+        while result.covered < result.required and remaining:
+            for conn in connections:
+                conn.send(("step", picked))
+            best_gain, best_index = 0, None
+            for conn in connections:
+                gain, position, examined = conn.recv()
+                scanned += examined
+                # I blocchi sono in ordine crescente: a parità resta la posizione più bassa
+                if position is not None and gain > best_gain:
+                    best_gain, best_index = gain, position
+
+            if best_index is None:
+                result.stop_reason = STOP_NO_GAIN
+                break
+
+            picked = best_index
+            remaining -= 1
+            result.selected.append(best_index)
+            result.gains.append(best_gain)
+            for subset_rank in ranker.ranks(space.indices(best_index)):
+                if not covered[subset_rank]:
+                    covered[subset_rank] = 1
+                    result.covered += 1
+            if progress is not None:
+                progress(PHASE_GREEDY, result.covered / result.required)
+
+            if max_combinations is not None and len(result.selected) >= max_combinations:
+                result.stop_reason = STOP_LIMIT
+                break
+        else:
+            if result.covered < result.required:
+                result.stop_reason = STOP_EXHAUSTED
+        result.stats["candidates_scanned"] = scanned
+        return result
+    finally:
+        for conn in connections:
+            try:
+                conn.send(("stop", None))
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        del covered
+        covered_shm.close()
+        covered_shm.unlink()
+        if targets_shm is not None:
+            targets_shm.close()
+            targets_shm.unlink()
@@ -0,0 +1,150 @@
+"""
+Costruzione del pool di numeri del sistema.
+
+Il pool è formato dai numeri fissi indicati dall'utente, completati con numeri
+estratti a caso dal range, nel rispetto del filtro pari/dispari.
+"""
+
+import random
+
+# Filtri pari/dispari sui numeri del pool
+PARITY_ALL = "all"
+PARITY_EVEN = "even"
+PARITY_ODD = "odd"
+
+# Etichette mostrate nell'interfaccia e nell'intestazione dei file esportati
+PARITY_LABELS = {
+    PARITY_ALL: "Tutti",
+    PARITY_EVEN: "Solo Pari",
+    PARITY_ODD: "Solo Dispari",
+}
+
+
+def matches_parity(number, parity):
+    """True se `number` rispetta il filtro pari/dispari `parity`."""
+    if parity == PARITY_EVEN:
+        return number % 2 == 0
+    if parity == PARITY_ODD:
+        return number % 2 != 0
+    return True
+
+
+def valid_fixed_numbers(fixed_numbers, range_min, range_max, parity=PARITY_ALL):
+    """
+    Filtra i numeri fissi tenendo solo quelli nel range e conformi al filtro.
+
+    Returns:
+        list: I numeri fissi validi, ordinati e senza duplicati.
+    """
+    return [n for n in sorted(set(fixed_numbers))
+            if range_min <= n <= range_max and matches_parity(n, parity)]
+
+
+def sampling_candidates(range_min, range_max, fixed_numbers=(), parity=PARITY_ALL):
+    """Numeri del range, esclusi i fissi, da cui estrarre quelli casuali del pool."""
+    fixed = set(fixed_numbers)
+    return [n for n in range(range_min, range_max + 1)
+            if n not in fixed and matches_parity(n, parity)]
+
+
+def validate_pool_parameters(range_min, range_max, pool_size, k, guarantee, fixed_numbers=(), parity=PARITY_ALL,
+                             condition=None, constraints=None):
+    """
+    Controlla la coerenza dei parametri del sistema.
+
+    Args:
+        fixed_numbers (list): Numeri fissi già filtrati con `valid_fixed_numbers`.
+        condition (int, optional): Numeri estratti nel pool m della garanzia condizionata "t se m".
+        constraints (TicketConstraints, optional): Vincoli sulle singole combinazioni.
+
+    Returns:
+        list: I messaggi di errore (vuota se i parametri sono validi).
+    """
+    errors = []
+    if range_max <= range_min:
+        errors.append("Il range massimo deve essere maggiore del range minimo.")
+
+    if guarantee > k:
+        errors.append("La garanzia non può essere maggiore della lunghezza della combinazione.")
+
+    if len(fixed_numbers) > pool_size:
+        errors.append(f"Il numero di 'Numeri da includere' ({len(fixed_numbers)}) non può essere maggiore di 'Numeri totali per il sistema' ({pool_size}).")
+
+    # Ci sono abbastanza numeri disponibili per formare il pool del sistema?
+    to_sample = pool_size - len(fixed_numbers)
+    available = sampling_candidates(range_min, range_max, fixed_numbers, parity)
+    if to_sample > len(available):
+        errors.append(f"Impossibile creare un pool di {pool_size} numeri. "
+                      f"Hai {len(fixed_numbers)} numeri fissi e solo {len(available)} numeri casuali disponibili nel range e con i filtri. "
+                      f"Servono {to_sample} numeri casuali in più.")
+
+    if k > pool_size:
+        errors.append(f"La lunghezza della combinazione ({k}) non può essere maggiore del 'Numeri totali per il sistema' ({pool_size}).")
+
+    if condition is not None and not guarantee <= condition <= pool_size:
+        errors.append(f"I numeri estratti nel pool ({condition}) devono essere almeno quanti la garanzia ({guarantee}) "
+                      f"e al massimo i 'Numeri totali per il sistema' ({pool_size}).")
+
+    if constraints is not None:
+        errors.extend(constraints.errors(k))
+    return errors
+
+
+def build_number_pool(range_min, range_max, pool_size, fixed_numbers=(), parity=PARITY_ALL, rng=None):
+    """
+    Costruisce il pool del sistema: numeri fissi più numeri casuali dal range.
+
+    Args:
+        range_min (int): Estremo inferiore del range.
+        range_max (int): Estremo superiore del range.
+        pool_size (int): Numero totale di numeri del pool.
+        fixed_numbers (list): Numeri da includere sempre (già validi per range e filtro).
+        parity (str): Filtro PARITY_ALL, PARITY_EVEN o PARITY_ODD.
+        rng (random.Random, optional): Generatore casuale; con lo stesso seed
+            produce lo stesso pool. Predefinito il modulo `random`.
+
+    Returns:
+        list: Il pool ordinato e senza duplicati.
+
+    Raises:
+        ValueError: Se non ci sono abbastanza numeri per riempire il pool.
+    """
+    rng = rng or random
+    fixed = sorted(set(fixed_numbers))
+    to_sample = pool_size - len(fixed)
+    sampled = []
+    if to_sample > 0:
+        available = sampling_candidates(range_min, range_max, fixed, parity)
+        if to_sample > len(available):
+            raise ValueError(f"Impossibile creare un pool di {pool_size} numeri: "
+                             f"servono {to_sample} numeri casuali ma ne sono disponibili solo {len(available)}.")
+        sampled = rng.sample(available, to_sample)
+    return sorted(set(fixed + sampled))
+
+
+def extend_number_pool(pool, range_min, range_max, pool_size, fixed_numbers=(), parity=PARITY_ALL, rng=None):
+    """
+    Estende un pool esistente senza togliere nessuno dei suoi numeri.
+
+    Al pool si aggiungono i numeri fissi mancanti e, fino a `pool_size`, numeri
+    estratti a caso dal range nel rispetto del filtro pari/dispari.
+
+    Args:
+        pool (list): Il pool da estendere.
+        range_min (int): Estremo inferiore del range.
+        range_max (int): Estremo superiore del range.
+        pool_size (int): Numero totale di numeri del pool esteso.
+        fixed_numbers (list): Numeri da includere sempre (già validi per range e filtro).
+        parity (str): Filtro PARITY_ALL, PARITY_EVEN o PARITY_ODD.
+        rng (random.Random, optional): Generatore casuale. Predefinito il modulo `random`.
+
+    Returns:
+        list: Il pool esteso, ordinato e senza duplicati.
+
+    Raises:
+        ValueError: Se il pool esteso supererebbe `pool_size` o non ci sono abbastanza numeri.
+    """
+    base = sorted(set(pool) | set(fixed_numbers))
+    if len(base) > pool_size:
+        raise ValueError(f"Il pool esteso avrebbe {len(base)} numeri, più dei {pool_size} richiesti.")
+    return build_number_pool(range_min, range_max, pool_size, base, parity, rng)
@@ -0,0 +1,421 @@
+"""
+Stima preventiva di memoria e tempo di una generazione, con limite di memoria.
+
+Prima di fare qualsiasi calcolo si stimano, dai soli parametri, le grandezze
+che determinano il costo della riduzione: C(v, k) candidati, C(v, t)
+sottoinsiemi da garantire e C(k, t) sottoinsiemi per candidato. Memoria e
+tempo di ogni motore sono modelli lineari in queste grandezze, con costanti
+misurate su una macchina di riferimento (tracemalloc e tempo reale, Python 3.11):
+servono a capire l'ordine di grandezza, non a prevedere i secondi esatti.
+
+Se il motore richiesto supererebbe il limite di memoria, `preflight` sceglie
+il motore più veloce tra quelli di `FALLBACK_ENGINES` che ci stanno; se
+nessuno ci sta la generazione viene rifiutata con una spiegazione, invece di
+lasciare che il processo esaurisca la memoria del server.
+
+La garanzia condizionata "t se m" ha un solo motore (`greedy_conditional`):
+se non ci sta la generazione viene rifiutata.
+
+Con i vincoli sulle combinazioni il numero di candidati dipende dal pool
+estratto e non è noto in anticipo: le stime usano C(v, k), che ne è un limite
+superiore.
+"""
+
+import os
+from dataclasses import dataclass, field
+from math import ceil, comb
+
+from .conditional import MAX_CONDITIONAL_INDEX, condition_gain_bound, conditional_index_entries
+from .numpy_backend import estimate_numpy_memory, numpy_available
+from .orbit import MAX_ORBIT_UNIVERSE
+from .parallel import default_workers
+from .sampled import DEFAULT_BATCH_SIZE, MAX_SAMPLED_UNIVERSE
+from .verify import MAX_VERIFY_UNIVERSE, VERIFY_CHUNK_SIZE
+
+# Variabile d'ambiente con il limite di memoria per generazione (MB)
+MEMORY_LIMIT_ENV = "COMBINAZIONI_MEMORY_LIMIT_MB"
+# Limite usato se la memoria fisica non è rilevabile (byte)
+FALLBACK_MEMORY_LIMIT = 4 * 1024 ** 3
+
+# Motori provati, in ordine di velocità stimata, quando quello richiesto non ci sta
+FALLBACK_ENGINES = ("numpy", "lazy", "orbit", "classic", "sampled")
+# Un motore alternativo viene proposto solo se la stima di tempo resta sotto questa soglia (secondi)
+MAX_FALLBACK_SECONDS = 3600
+
+# Costanti calibrate: byte e secondi per voce della tabella candidato × sottoinsieme (C(v,k)·C(k,t)),
+# per candidato e per sottoinsieme del pool
+LAZY_BYTES_PER_ENTRY = 48
+LAZY_BYTES_PER_CANDIDATE = 40
+LAZY_SECONDS_PER_ENTRY = 3.5e-6
+NUMPY_BYTES_PER_ENTRY = 24
+NUMPY_SECONDS_PER_ENTRY = 3.5e-7
+PARALLEL_BYTES_PER_CANDIDATE = 60
+PARALLEL_BYTES_PER_WORKER = 32 * 1024 ** 2
+CLASSIC_SECONDS_PER_ENTRY_STEP = 1.5e-7  # per voce e per combinazione scelta
+ORBIT_BYTES_PER_ORBIT = 200
+ORBIT_SECONDS_PER_ENTRY = 1e-7
+# Motore campionato: per candidato estratto e per numero del pool o sottoinsieme del candidato
+SAMPLED_BYTES_PER_SUBSET = 20
+SAMPLED_BYTES_PER_DRAW = 32
+SAMPLED_SECONDS_PER_DRAW = 2e-7
+SAMPLED_PYTHON_SECONDS_PER_DRAW = 1e-6
+# Garanzia condizionata: per voce dell'indice t -> m (picco della costruzione), per m-sottoinsieme,
+# per candidato (più la sua riga di rank) e per voce dell'indice visitata (combinazione × candidato × voci)
+CONDITIONAL_BYTES_PER_ENTRY = 24
+CONDITIONAL_PYTHON_BYTES_PER_ENTRY = 8
+CONDITIONAL_BYTES_PER_TARGET = 10
+CONDITIONAL_BYTES_PER_CANDIDATE = 40
+CONDITIONAL_SECONDS_PER_VISIT = 2.5e-9
+CONDITIONAL_PYTHON_SECONDS_PER_VISIT = 1e-8
+# Rapporto tipico tra la copertura greedy condizionata e il limite m-sottoinsiemi / coperti per combinazione
+CONDITIONAL_OVER_BOUND = 3
+# Una combinazione del risultato: tupla di k numeri, rank scelto e righe della tabella finale
+RESULT_BYTES_PER_COMBINATION = 120
+RESULT_BYTES_PER_NUMBER = 8
+LOCAL_SEARCH_BYTES_PER_SUBSET = 12
+# Rapporto tipico tra la copertura greedy e il limite inferiore di Schönheim
+GREEDY_OVER_BOUND = 1.5
+
+
+def default_memory_limit():
+    """
+    Limite di memoria predefinito per una generazione, in byte.
+
+    È `COMBINAZIONI_MEMORY_LIMIT_MB` se impostata, altrimenti metà della memoria
+    fisica della macchina (FALLBACK_MEMORY_LIMIT se non rilevabile).
+    """
+    value = os.environ.get(MEMORY_LIMIT_ENV)
+    if value:
+        return int(float(value) * 1024 ** 2)
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 2
+    except (AttributeError, ValueError, OSError):  # non disponibile (es. Windows)
+        return FALLBACK_MEMORY_LIMIT
+
+
+def schonheim_bound(v, k, t):
+    """Limite inferiore di Schönheim al numero di k-combinazioni che coprono i t-sottoinsiemi di v numeri."""
+    bound = 1
+    for i in range(t - 1, -1, -1):
+        bound = ceil((v - i) * bound / (k - i))
+    return bound
+
+
+def estimate_cover_size(v, k, t, max_combinations=None):
+    """Numero di combinazioni atteso per una copertura greedy (al più `max_combinations`)."""
+    if t == k:
+        size = comb(v, k)
+    else:
+        size = ceil(GREEDY_OVER_BOUND * schonheim_bound(v, k, t))
+    return size if max_combinations is None else min(size, max_combinations)
+
+
+def estimate_conditional_size(v, k, t, m, max_combinations=None):
+    """Numero di combinazioni atteso per la garanzia condizionata "t se m" (al più `max_combinations`)."""
+    size = ceil(CONDITIONAL_OVER_BOUND * comb(v, m) / condition_gain_bound(v, k, t, m))
+    return size if max_combinations is None else min(size, max_combinations)
+
+
+def estimate_conditional(v, k, t, m, max_combinations=None):
+    """
+    Stima memoria e tempo della garanzia condizionata "t se m" (motore `greedy_conditional`).
+
+    Returns:
+        EngineEstimate: La stima, con `engine == "conditional"`.
+    """
+    entries = conditional_index_entries(v, t, m)
+    if entries > MAX_CONDITIONAL_INDEX:
+        return EngineEstimate("conditional", note=f"Indice della garanzia condizionata troppo grande "
+                                                  f"({entries:,} voci, massimo {MAX_CONDITIONAL_INDEX:,}).")
+    candidates = comb(v, k)
+    if numpy_available():
+        per_entry, per_visit = CONDITIONAL_BYTES_PER_ENTRY, CONDITIONAL_SECONDS_PER_VISIT
+    else:
+        per_entry, per_visit = CONDITIONAL_PYTHON_BYTES_PER_ENTRY, CONDITIONAL_PYTHON_SECONDS_PER_VISIT
+    memory = (per_entry * entries + CONDITIONAL_BYTES_PER_TARGET * comb(v, m) + 8 * comb(v, t)
+              + (CONDITIONAL_BYTES_PER_CANDIDATE + 4 * comb(k, t)) * candidates)
+    visits = estimate_conditional_size(v, k, t, m, max_combinations) * candidates * comb(k, t) * comb(v - t, m - t)
+    return EngineEstimate("conditional", memory, per_visit * visits)
+
+
+def format_bytes(size):
+    """Dimensione leggibile (KB, MB, GB, TB)."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} TB"
+
+
+def format_seconds(seconds):
+    """Durata leggibile (secondi, minuti, ore, giorni)."""
+    if seconds < 60:
+        return f"{seconds:.1f} s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f} h"
+    return f"{seconds / 86400:,.0f} giorni"
+
+
+@dataclass
+class EngineEstimate:
+    """
+    Stima del costo di un motore.
+
+    Attributes:
+        engine (str): Il motore.
+        memory (int): Memoria di picco stimata (byte), None se il motore non è applicabile.
+        seconds (float): Tempo stimato della riduzione, None se il motore non è applicabile.
+        note (str): Motivo per cui il motore non è applicabile, o altre avvertenze.
+    """
+    engine: str
+    memory: int = None
+    seconds: float = None
+    note: str = ""
+
+    @property
+    def applicable(self):
+        return self.memory is not None
+
+
+def estimate_engine(engine, v, k, t, max_combinations=None, engine_options=None, complete=True):
+    """
+    Stima memoria e tempo della riduzione (v, k, t) con un motore.
+
+    Args:
+        complete (bool): False se i candidati sono solo una parte delle C(v, k)
+            combinazioni (vincoli sulle combinazioni).
+
+    Returns:
+        EngineEstimate: La stima; per il motore NumPy oltre il budget (o senza NumPy)
+        e per i motori per orbite e campionato su candidati parziali è quella del
+        greedy lazy su cui ripiegano.
+    """
+    options = engine_options or {}
+    if engine in ("orbit", "sampled") and not complete:
+        estimate = estimate_engine("lazy", v, k, t, max_combinations)
+        estimate.note = "Con i vincoli sulle combinazioni si usa il greedy lazy."
+        return estimate
+    candidates = comb(v, k)
+    subsets = comb(v, t)
+    entries = candidates * comb(k, t)
+    if engine == "numpy":
+        budget = options.get("memory_budget")
+        if not numpy_available():
+            estimate = estimate_engine("lazy", v, k, t, max_combinations)
+            estimate.note = "NumPy non installato: si usa il greedy lazy."
+            return estimate
+        if budget is not None and estimate_numpy_memory(candidates, k, t, v) > budget:
+            estimate = estimate_engine("lazy", v, k, t, max_combinations)
+            estimate.note = "Oltre il budget NumPy: si usa il greedy lazy."
+            return estimate
+        return EngineEstimate(engine, NUMPY_BYTES_PER_ENTRY * entries + 9 * subsets,
+                              NUMPY_SECONDS_PER_ENTRY * entries)
+    if engine == "lazy":
+        return EngineEstimate(engine, LAZY_BYTES_PER_ENTRY * entries + LAZY_BYTES_PER_CANDIDATE * candidates
+                              + 9 * subsets, LAZY_SECONDS_PER_ENTRY * entries)
+    if engine == "parallel":
+        workers = max(1, min(options.get("workers") or default_workers(), candidates))
+        if workers == 1:
+            return estimate_engine("lazy", v, k, t, max_combinations)
+        memory = (4 * entries + PARALLEL_BYTES_PER_CANDIDATE * candidates + subsets
+                  + PARALLEL_BYTES_PER_WORKER * workers)
+        return EngineEstimate(engine, memory, LAZY_SECONDS_PER_ENTRY * entries / workers)
+    if engine == "classic":
+        steps = estimate_cover_size(v, k, t, max_combinations)
+        return EngineEstimate(engine, 4 * entries + candidates + subsets,
+                              CLASSIC_SECONDS_PER_ENTRY_STEP * entries * steps)
+    if engine == "orbit":
+        if subsets > MAX_ORBIT_UNIVERSE:
+            return EngineEstimate(engine, note=f"Troppi sottoinsiemi ({subsets:,}) per il motore per orbite.")
+        orbits = ceil(candidates / max(1, v - options.get("fixed_points", 0)))
+        return EngineEstimate(engine, ORBIT_BYTES_PER_ORBIT * orbits + 4 * comb(k, t) * orbits + 4 * subsets,
+                              ORBIT_SECONDS_PER_ENTRY * entries)
+    if engine == "sampled":
+        if subsets > MAX_SAMPLED_UNIVERSE:
+            return EngineEstimate(engine, note=f"Troppi sottoinsiemi ({subsets:,}) per il motore campionato.")
+        # Non dipende da C(v, k): ogni passo estrae un lotto e ne valuta i sottoinsiemi
+        draw = options.get("batch_size", DEFAULT_BATCH_SIZE) * (v + comb(k, t))
+        per_draw = SAMPLED_SECONDS_PER_DRAW if numpy_available() else SAMPLED_PYTHON_SECONDS_PER_DRAW
+        return EngineEstimate(engine, SAMPLED_BYTES_PER_SUBSET * subsets + SAMPLED_BYTES_PER_DRAW * draw,
+                              per_draw * draw * estimate_cover_size(v, k, t, max_combinations))
+    return EngineEstimate(engine, note=f"Nessuna stima per il motore '{engine}'.")
+
+
+@dataclass
+class PreflightReport:
+    """
+    Esito della stima preventiva di una generazione.
+
+    Attributes:
+        candidates (int): C(v, k), le combinazioni candidate.
+        subsets (int): C(v, t), i sottoinsiemi da garantire.
+        subsets_per_candidate (int): C(k, t).
+        expected_size (int): Numero di combinazioni finali atteso.
+        memory_limit (int): Il limite di memoria applicato (byte).
+        requested (str): Il motore richiesto.
+        engine (str, optional): Il motore da usare; None se la generazione va rifiutata.
+        engine_options (dict): Le opzioni con cui usarlo (quelle richieste, o quelle
+            del motore alternativo).
+        memory (int): Memoria totale stimata con quel motore (riduzione, risultato e verifica).
+        seconds (float): Tempo stimato con quel motore.
+        estimates (dict): Le stime di tutti i motori considerati, per nome.
+        message (str): Spiegazione del cambio di motore o del rifiuto ("" se nessuno).
+        condition (int, optional): Numeri estratti m della garanzia condizionata, se impostata.
+        targets (int): Gruppi di numeri da garantire: C(v, m) con la garanzia condizionata.
+    """
+    candidates: int
+    subsets: int
+    subsets_per_candidate: int
+    expected_size: int
+    memory_limit: int
+    requested: str
+    engine: str = None
+    engine_options: dict = field(default_factory=dict)
+    memory: int = 0
+    seconds: float = 0.0
+    estimates: dict = field(default_factory=dict)
+    message: str = ""
+    condition: int = None
+    targets: int = 0
+
+    @property
+    def allowed(self):
+        """True se la generazione può partire."""
+        return self.engine is not None
+
+    @property
+    def switched(self):
+        """True se si userà un motore diverso da quello richiesto."""
+        return self.allowed and self.engine != self.requested
+
+    def summary_lines(self):
+        """Righe di riepilogo della stima (per l'interfaccia e i log)."""
+        lines = [f"Candidati C(v,k): {self.candidates:,} · sottoinsiemi C(v,t): {self.subsets:,} · "
+                 f"per combinazione C(k,t): {self.subsets_per_candidate:,}"
+                 + (f" · gruppi estratti C(v,m): {self.targets:,}" if self.condition else ""),
+                 f"Combinazioni finali attese: circa {self.expected_size:,}"]
+        if self.allowed:
+            name = "la garanzia condizionata" if self.condition else f"il motore '{self.engine}'"
+            lines.append(f"Stima con {name}: {format_bytes(self.memory)} di memoria "
+                         f"(limite {format_bytes(self.memory_limit)}), circa {format_seconds(self.seconds)}")
+        if self.message:
+            lines.append(self.message)
+        return lines
+
+
+def _overhead(v, k, t, expected_size, local_search):
+    # Memoria indipendente dal motore: combinazioni finali, verifica e ricerca locale
+    subsets = comb(v, t)
+    memory = expected_size * (RESULT_BYTES_PER_COMBINATION + RESULT_BYTES_PER_NUMBER * k)
+    if subsets <= MAX_VERIFY_UNIVERSE:
+        memory += subsets + VERIFY_CHUNK_SIZE * comb(k, t) * 8
+    if local_search and t < k:
+        memory += LOCAL_SEARCH_BYTES_PER_SUBSET * subsets
+    return memory
+
+
+def preflight(config, memory_limit=None, previous=None):
+    """
+    Stima il costo di una configurazione e sceglie un motore che rispetti il limite di memoria.
+
+    Args:
+        config (RunConfig): I parametri della generazione.
+        memory_limit (int, optional): Memoria massima per la generazione (byte);
+            predefinita `default_memory_limit()`.
+        previous (RunOutcome, optional): Risultato da estendere (vedi `run`): si stima il
+            sotto-problema (v-1, k-1, t-1) di un numero aggiunto invece della riduzione completa.
+
+    Returns:
+        PreflightReport: Stime e motore scelto (`engine` None se la generazione va rifiutata).
+    """
+    memory_limit = memory_limit or default_memory_limit()
+    v, k, t = config.pool_size, config.k, config.guarantee
+    expected = estimate_cover_size(v, k, t, config.max_combinations)
+    report = PreflightReport(candidates=comb(v, k), subsets=comb(v, t), subsets_per_candidate=comb(k, t),
+                             expected_size=expected, memory_limit=memory_limit, requested=config.engine)
+    overhead = _overhead(v, k, t, expected, config.local_search_seconds > 0)
+
+    m = config.condition_size
+    if m is not None:
+        report.condition = m
+        report.targets = comb(v, m)
+        report.expected_size = estimate_conditional_size(v, k, t, m, config.max_combinations)
+        estimate = estimate_conditional(v, k, t, m, config.max_combinations)
+        report.estimates[estimate.engine] = estimate
+        # Niente ricerca locale; la verifica aggiunge la mappa degli m-sottoinsiemi
+        overhead = (_overhead(v, k, t, report.expected_size, False) + report.targets
+                    + VERIFY_CHUNK_SIZE * comb(m, t) * 8)
+        if not estimate.applicable:
+            report.message = (f"Generazione rifiutata: {estimate.note} Riduci i numeri del sistema o "
+                              f"i numeri estratti (m).")
+            return report
+        if estimate.memory + overhead > memory_limit:
+            report.message = (f"Generazione rifiutata: la garanzia {t} se {m} con {v} numeri e lunghezza {k} "
+                              f"richiederebbe circa {format_bytes(estimate.memory + overhead)} di memoria, oltre il "
+                              f"limite di {format_bytes(memory_limit)} per generazione. Riduci i numeri del "
+                              f"sistema o i numeri estratti (m).")
+            return report
+        report.engine = config.engine
+        report.engine_options = dict(config.engine_options)
+        report.memory = estimate.memory + overhead
+        report.seconds = estimate.seconds
+        return report
+
+    if t == k:
+        # Nessuna riduzione: il risultato sono le combinazioni stesse (o un loro campione)
+        report.engine = config.engine
+        report.memory = overhead
+        if overhead > memory_limit:
+            report.engine = None
+            report.message = (f"Con garanzia uguale alla lunghezza il sistema contiene {expected:,} combinazioni "
+                              f"(circa {format_bytes(overhead)}), oltre il limite di {format_bytes(memory_limit)}: "
+                              f"imposta un 'Max combinazioni finali' più basso.")
+        return report
+
+    problem = (v, k, t)
+    if previous is not None and previous.result.covered == previous.result.required and t > 1:
+        problem = (v - 1, k - 1, t - 1)
+
+    # Un motore alternativo NumPy deve restare nel limite anche con il proprio budget
+    fallback_options = {"numpy": {"memory_budget": max(0, memory_limit - overhead)}}
+    names = (config.engine,) + tuple(engine for engine in FALLBACK_ENGINES if engine != config.engine)
+    options = {engine: config.engine_options if engine == config.engine else fallback_options.get(engine, {})
+               for engine in names}
+    for engine in names:
+        report.estimates[engine] = estimate_engine(engine, *problem, config.max_combinations, options[engine],
+                                                   complete=not config.constraints.active)
+
+    def fits(estimate):
+        return estimate.applicable and estimate.memory + overhead <= memory_limit
+
+    requested = report.estimates[config.engine]
+    if fits(requested):
+        chosen = requested
+    else:
+        alternatives = [estimate for name, estimate in report.estimates.items()
+                        if name != config.engine and fits(estimate) and estimate.seconds <= MAX_FALLBACK_SECONDS]
+        chosen = min(alternatives, key=lambda estimate: estimate.seconds, default=None)
+        needed = (f"circa {format_bytes(requested.memory + overhead)} di memoria" if requested.applicable
+                  else requested.note.rstrip("."))
+        if chosen is None:
+            lightest = min((estimate for estimate in report.estimates.values() if estimate.applicable),
+                           key=lambda estimate: estimate.memory, default=None)
+            report.message = (f"Generazione rifiutata: con {v} numeri, lunghezza {k} e garanzia {t} servono "
+                              f"{report.candidates:,} candidati e {report.subsets:,} sottoinsiemi da coprire. "
+                              f"Il motore '{config.engine}' richiederebbe {needed}")
+            if lightest is not None and lightest is not requested:
+                report.message += (f"; il più leggero ('{lightest.engine}') circa "
+                                   f"{format_bytes(lightest.memory + overhead)} e {format_seconds(lightest.seconds)}")
+            report.message += (f", oltre il limite di {format_bytes(memory_limit)} per generazione. "
+                               f"Riduci i numeri del sistema, la lunghezza o la garanzia.")
+            return report
+        report.message = (f"⚠ Il motore '{config.engine}' richiederebbe {needed}, oltre il limite di "
+                          f"{format_bytes(memory_limit)}: si usa il motore '{chosen.engine}'.")
+    name = config.engine if chosen is requested else chosen.engine
+    report.engine = name
+    report.engine_options = dict(options.get(name, {}))
+    report.memory = chosen.memory + overhead
+    report.seconds = chosen.seconds
+    return report
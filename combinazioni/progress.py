@@ -0,0 +1,55 @@
+"""
+Interfaccia per ricevere avanzamento e messaggi dal nucleo di calcolo.
+
+Il nucleo non sa nulla di chi lo usa: l'interfaccia web, la riga di comando
+o un job batch forniscono un `ProgressReporter` che decide come mostrare
+barre di avanzamento e messaggi. Un reporter è anche richiamabile come
+callback `progress(fase, frazione)` dei motori.
+"""
+
+import logging
+
+
+class ProgressReporter:
+    """Reporter di base: ignora avanzamento e messaggi."""
+
+    def progress(self, phase, fraction):
+        """Avanzamento `fraction` (0..1) della fase `phase` (es. "targets", "greedy")."""
+
+    def info(self, message):
+        """Messaggio informativo."""
+
+    def warning(self, message):
+        """Avviso non bloccante."""
+
+    def __call__(self, phase, fraction):
+        self.progress(phase, fraction)
+
+
+class LoggingReporter(ProgressReporter):
+    """
+    Reporter che scrive su `logging`, con l'avanzamento a passi di `step`.
+
+    Args:
+        logger (logging.Logger, optional): Logger da usare.
+        prefix (str): Prefisso dei messaggi (es. il nome della configurazione).
+        step (float): Intervallo minimo di avanzamento tra due righe di log.
+    """
+
+    def __init__(self, logger=None, prefix="", step=0.25):
+        self.logger = logger or logging.getLogger("combinazioni")
+        self.prefix = f"[{prefix}] " if prefix else ""
+        self.step = step
+        self._last = {}
+
+    def progress(self, phase, fraction):
+        last = self._last.get(phase)
+        if last is None or fraction >= 1.0 or fraction - last >= self.step:
+            self._last[phase] = fraction
+            self.logger.debug("%s%s: %.0f%%", self.prefix, phase, fraction * 100)
+
+    def info(self, message):
+        self.logger.info("%s%s", self.prefix, message)
+
+    def warning(self, message):
+        self.logger.warning("%s%s", self.prefix, message)
@@ -0,0 +1,214 @@
+"""
+Rappresentazione compatta delle combinazioni tramite il sistema numerico combinatorio.
+
+Ogni combinazione è descritta dagli indici (0..v-1) dei suoi numeri nel pool
+ordinato e viene identificata da un intero:
+
+- le k-combinazioni candidate usano il rank lessicografico, così l'ordine dei
+  rank coincide con quello di `itertools.combinations` sul pool ordinato;
+- i t-sottoinsiemi da garantire usano il rank colessicografico, che non dipende
+  dalla dimensione del pool ed è il più economico da calcolare.
+
+Lo stato di copertura diventa così un `bytearray` indicizzato per rank, senza
+insiemi di tuple. Le tuple di numeri vengono prodotte solo quando servono
+(es. per costruire la tabella dei risultati).
+"""
+
+from array import array
+from collections.abc import Sequence
+from itertools import combinations, islice
+from math import comb
+
+
+def rank_colex(indices):
+    """
+    Rank colessicografico di un insieme di indici ordinati in modo crescente.
+
+    Args:
+        indices (sequence): Indici distinti e crescenti.
+
+    Returns:
+        int: Il rank, compreso tra 0 e C(max+1, len) - 1.
+    """
+    return sum(comb(c, i + 1) for i, c in enumerate(indices))
+
+
+def unrank_colex(rank, size):
+    """
+    Inverso di `rank_colex`.
+
+    Args:
+        rank (int): Il rank colessicografico.
+        size (int): Numero di elementi dell'insieme.
+
+    Returns:
+        tuple: Gli indici crescenti corrispondenti al rank.
+    """
+    result = [0] * size
+    c = size - 1
+    while comb(c + 1, size) <= rank:
+        c += 1
+    for i in range(size, 0, -1):
+        while comb(c, i) > rank:
+            c -= 1
+        result[i - 1] = c
+        rank -= comb(c, i)
+        c -= 1
+    return tuple(result)
+
+
+def rank_lex(indices, n):
+    """
+    Rank lessicografico di una k-combinazione di {0..n-1}.
+
+    Args:
+        indices (sequence): Indici distinti e crescenti.
+        n (int): Dimensione del pool.
+
+    Returns:
+        int: La posizione della combinazione in `itertools.combinations(range(n), k)`.
+    """
+    k = len(indices)
+    return comb(n, k) - 1 - rank_colex([n - 1 - c for c in reversed(indices)])
+
+
+def unrank_lex(rank, n, k):
+    """
+    Inverso di `rank_lex`.
+
+    Args:
+        rank (int): Il rank lessicografico.
+        n (int): Dimensione del pool.
+        k (int): Lunghezza della combinazione.
+
+    Returns:
+        tuple: Gli indici crescenti corrispondenti al rank.
+    """
+    reflected = unrank_colex(comb(n, k) - 1 - rank, k)
+    return tuple(n - 1 - c for c in reversed(reflected))
+
+
+def chunked(iterable, chunk_size):
+    """Suddivide un iterabile in liste di al più `chunk_size` elementi, in streaming."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class SubsetRanker:
+    """
+    Calcola rapidamente i rank colessicografici dei t-sottoinsiemi di una k-combinazione.
+
+    I coefficienti binomiali sono precalcolati una volta sola per (v, t); i rank
+    vengono poi ottenuti per somme parziali, senza enumerare le tuple.
+    """
+
+    def __init__(self, pool_size, k, t):
+        self.t = t
+        self.count = comb(pool_size, t)
+        self.stride = comb(k, t)
+        # binomials[j][c] = C(c, j + 1)
+        self.binomials = [[comb(c, j + 1) for c in range(pool_size)] for j in range(t)]
+
+    def ranks(self, indices):
+        """Restituisce la lista dei rank dei t-sottoinsiemi della combinazione `indices`."""
+        # level[p] contiene le somme parziali dei j-sottoinsiemi che terminano in posizione p
+        binomials = self.binomials
+        first = binomials[0]
+        level = [[first[c]] for c in indices]
+        for j in range(1, self.t):
+            row = binomials[j]
+            prefix = []
+            next_level = []
+            for p, c in enumerate(indices):
+                b = row[c]
+                next_level.append([s + b for s in prefix])
+                prefix.extend(level[p])
+            level = next_level
+        return [s for part in level for s in part]
+
+
+class RankedCombinations(Sequence):
+    """
+    Insieme di k-combinazioni di un pool, memorizzate come rank lessicografici.
+
+    Se `ranks` non è specificato l'insieme contiene tutte le C(v, k) combinazioni
+    del pool e non occupa memoria oltre al pool stesso. Si comporta come una
+    sequenza di tuple ordinate di numeri, in ordine di rank.
+    """
+
+    def __init__(self, pool, k, ranks=None):
+        self.pool = list(pool)
+        self.k = k
+        self.ranks = ranks
+
+    @classmethod
+    def from_combinations(cls, full_combinations):
+        """
+        Costruisce l'insieme a partire da una sequenza di tuple di numeri.
+
+        Il pool è l'unione dei numeri presenti; i duplicati vengono scartati
+        mantenendo l'ordine originale.
+        """
+        if isinstance(full_combinations, cls):
+            return full_combinations
+        pool = sorted(set(n for combo in full_combinations for n in combo))
+        k = len(full_combinations[0]) if len(full_combinations) else 0
+        position = {n: i for i, n in enumerate(pool)}
+        n = len(pool)
+        ranks = array("q", dict.fromkeys(
+            rank_lex(sorted(position[x] for x in combo), n) for combo in full_combinations
+        ))
+        if len(ranks) == comb(n, k) and all(r == i for i, r in enumerate(ranks)):
+            ranks = None
+        return cls(pool, k, ranks)
+
+    @property
+    def is_complete(self):
+        """True se l'insieme contiene tutte le combinazioni del pool."""
+        return self.ranks is None
+
+    def __len__(self):
+        if self.ranks is None:
+            return comb(len(self.pool), self.k)
+        return len(self.ranks)
+
+    def rank(self, position):
+        """Rank lessicografico della combinazione in posizione `position`."""
+        return position if self.ranks is None else self.ranks[position]
+
+    def indices(self, position):
+        """Indici nel pool della combinazione in posizione `position`."""
+        return unrank_lex(self.rank(position), len(self.pool), self.k)
+
+    def iter_indices(self, start=0, stop=None):
+        """Itera gli indici nel pool delle combinazioni in posizione [start, stop), in ordine."""
+        n = len(self.pool)
+        if self.ranks is None:
+            return islice(combinations(range(n), self.k), start, stop)
+        return (unrank_lex(r, n, self.k) for r in self.ranks[start:stop])
+
+    def iter_chunks(self, chunk_size, start=0, stop=None):
+        """Come `iter_indices`, ma a blocchi (liste) di al più `chunk_size` combinazioni."""
+        return chunked(self.iter_indices(start, stop), chunk_size)
+
+    def to_numbers(self, indices):
+        """Converte una tupla di indici nella tupla di numeri corrispondente."""
+        pool = self.pool
+        return tuple(pool[i] for i in indices)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("Indice di combinazione fuori intervallo.")
+        return self.to_numbers(self.indices(position))
+
+    def __iter__(self):
+        to_numbers = self.to_numbers
+        return (to_numbers(indices) for indices in self.iter_indices())
@@ -0,0 +1,215 @@
+"""
+Riduzione delle combinazioni con garanzia: punto d'ingresso comune ai motori.
+
+Valida i parametri, gestisce il caso speciale garanzia = lunghezza e la
+garanzia condizionata "t se m", passa eventualmente dalla cache delle
+coperture e comunica avanzamento e messaggi
+tramite un `ProgressReporter`. Prima di essere consegnata, una copertura può
+essere confermata con una verifica indipendente (`verify_result`).
+"""
+
+import random
+from math import comb
+
+from .conditional import greedy_conditional
+from .cover_cache import cached_reduce
+from .engines import ENGINES, EXACT_ENGINES, RANDOMIZED_ENGINES
+from .greedy import STOP_COMPLETE, STOP_LIMIT, STOP_NO_GAIN, GreedyResult, record_gains
+from .local_search import improve_cover
+from .progress import ProgressReporter
+from .ranking import RankedCombinations
+from .verify import MAX_VERIFY_UNIVERSE, confirm_result
+
+
+def reduce_combinations(full_combinations, guarantee_size, max_combinations=None, engine="classic",
+                        engine_options=None, cover_cache=None, reporter=None, rng=None, condition_size=None):
+    """
+    Riduce le combinazioni con l'algoritmo greedy mantenendo la garanzia richiesta.
+
+    Args:
+        full_combinations (sequence): Le combinazioni candidate (tuple ordinate o `RankedCombinations`).
+        guarantee_size (int): Dimensione dei sottoinsiemi da garantire.
+        max_combinations (int, optional): Limite massimo di combinazioni finali.
+        engine (str): Motore greedy da usare, una delle chiavi di `ENGINES`.
+            I motori di `EXACT_ENGINES` producono la stessa selezione.
+        engine_options (dict, optional): Opzioni specifiche del motore
+            (es. `memory_budget` per il backend NumPy, `workers` per quello parallelo).
+        cover_cache (CoverCache, optional): Cache persistente delle coperture; se
+            presente, una copertura già calcolata per (v, k, t, limite) viene
+            rimappata sul pool invece di essere ricalcolata. Vale solo per i
+            motori di `EXACT_ENGINES`, le cui coperture sono interscambiabili.
+        reporter (ProgressReporter, optional): Destinatario di avanzamento e messaggi.
+        rng (random.Random, optional): Generatore per il campionamento quando la
+            garanzia è uguale alla lunghezza e per i motori di `RANDOMIZED_ENGINES`.
+            Predefinito il modulo `random`.
+        condition_size (int, optional): Garanzia condizionata "t se m": numeri estratti nel
+            pool m. Se m > t la riduzione usa `greedy_conditional` (motore e cache non si applicano).
+
+    Returns:
+        GreedyResult: La selezione, nell'ordine in cui è stata fatta, con il guadagno di
+        ogni scelta (vedi `GreedyResult.coverage_curve`).
+
+    Raises:
+        ValueError: Se i parametri non sono validi.
+    """
+    reporter = reporter or ProgressReporter()
+    if not len(full_combinations):
+        raise ValueError("Nessuna combinazione da ridurre. Assicurati che le combinazioni iniziali siano state generate.")
+    if guarantee_size <= 0:
+        raise ValueError("La dimensione della garanzia deve essere un numero positivo.")
+    if guarantee_size > len(full_combinations[0]):
+        raise ValueError("La dimensione della garanzia non può essere maggiore della lunghezza della combinazione stessa.")
+    if engine not in ENGINES:
+        raise ValueError(f"Motore di calcolo sconosciuto '{engine}'.")
+
+    space = RankedCombinations.from_combinations(full_combinations)
+
+    if condition_size is not None and condition_size > guarantee_size:
+        result = greedy_conditional(space, guarantee_size, condition_size, max_combinations, progress=reporter)
+        reporter.info(f"🎯 Garanzia {guarantee_size} se {condition_size}: {result.covered:,} gruppi di "
+                      f"{condition_size} numeri su {result.required:,} con almeno {guarantee_size} numeri in una "
+                      f"combinazione ({result.covered / result.required:.2%}), "
+                      f"{result.stats['gain_evaluations']:,} guadagni valutati.")
+        if result.stop_reason == STOP_LIMIT:
+            reporter.info(f"🔒 Raggiunto limite massimo di combinazioni: {max_combinations}")
+        elif result.stop_reason != STOP_COMPLETE:
+            reporter.warning("⚠ Nessuna combinazione rimanente può coprire nuovi gruppi di numeri estratti.")
+        return result
+
+    # Caso speciale: se guarantee_size è uguale alla lunghezza della combinazione
+    # In questo caso, ogni combinazione è un "target" a sé. L'algoritmo non ridurrebbe
+    # ma selezionerebbe solo le combinazioni esatte. Applichiamo solo il limite max_combinations, se presente.
+    if guarantee_size == space.k:
+        reporter.info("Garanzia impostata alla lunghezza della combinazione (esatta). Non verrà applicata ulteriore riduzione oltre il limite massimo di combinazioni, se specificato. Verranno incluse tutte le combinazioni iniziali.")
+        total = len(space)
+        if max_combinations is not None and total > max_combinations:
+            selected = sorted((rng or random).sample(range(total), max_combinations))  # Campione casuale
+            return GreedyResult(space=space, selected=selected, covered=len(selected), required=total,
+                                stop_reason=STOP_LIMIT, engine="sample", gains=[1] * len(selected))
+        return GreedyResult(space=space, selected=list(range(total)), covered=total, required=total,
+                            stop_reason=STOP_COMPLETE, engine="sample", gains=[1] * total)
+
+    engine_options = dict(engine_options or {})
+    if engine in RANDOMIZED_ENGINES:
+        engine_options["rng"] = rng
+    if cover_cache is not None and engine in EXACT_ENGINES:
+        result = cached_reduce(space, guarantee_size, max_combinations, ENGINES[engine],
+                               cover_cache, progress=reporter, **engine_options)
+    else:
+        result = ENGINES[engine](space, guarantee_size, max_combinations,
+                                 progress=reporter, **engine_options)
+    record_gains(result, guarantee_size)
+
+    if result.engine == "cache":
+        reporter.info("⚡ Copertura recuperata dalla cache e rimappata sul pool corrente.")
+    elif engine == "numpy" and result.engine != engine:
+        reporter.info("ℹ Backend NumPy non disponibile o oltre il budget di memoria: usato il motore greedy lazy in puro Python.")
+    elif engine == "orbit" and result.engine != engine:
+        reporter.info("ℹ Il motore per orbite richiede tutte le combinazioni del pool: usato il motore greedy lazy.")
+    elif engine == "sampled" and result.engine != engine:
+        reporter.info("ℹ Il motore campionato richiede tutte le combinazioni del pool: usato il motore greedy lazy.")
+    elif engine == "sampled":
+        reporter.info(f"🎲 Greedy campionato: {result.covered:,} sottoinsiemi su {result.required:,} coperti "
+                      f"({result.covered / result.required:.2%}) valutando {result.stats['candidates_scanned']:,} "
+                      f"candidati estratti, al massimo {result.stats['batch_size']:,} per passo.")
+
+    if result.stop_reason == STOP_NO_GAIN:
+        reporter.warning("⚠ Nessuna combinazione rimanente può coprire nuovi sottoinsiemi. Uscita anticipata dall'algoritmo greedy.")
+    elif result.stop_reason == STOP_LIMIT:
+        reporter.info(f"🔒 Raggiunto limite massimo di combinazioni: {max_combinations}")
+    return result
+
+
+def optimize_cover(result, guarantee_size, time_budget, max_combinations=None, cover_cache=None,
+                   reporter=None, rng=None, on_improvement=None):
+    """
+    Prova a ridurre una copertura completa con la ricerca locale, entro `time_budget` secondi.
+
+    Args:
+        result (GreedyResult): Il risultato di `reduce_combinations`.
+        guarantee_size (int): Dimensione dei sottoinsiemi garantiti.
+        time_budget (float): Secondi a disposizione.
+        max_combinations (int, optional): Il limite usato per la riduzione (chiave della cache).
+        cover_cache (CoverCache, optional): Se presente, la copertura migliorata vi
+            viene salvata così che le esecuzioni successive partano da essa.
+        reporter (ProgressReporter, optional): Destinatario di avanzamento e messaggi.
+        rng (random.Random, optional): Generatore casuale della ricerca.
+        on_improvement (callable, optional): Chiamata con ogni nuova copertura migliore.
+
+    Returns:
+        GreedyResult: La copertura migliore trovata (quella di partenza se non migliorata).
+    """
+    reporter = reporter or ProgressReporter()
+    if result.stop_reason != STOP_COMPLETE:
+        reporter.info("ℹ Ottimizzazione locale saltata: la copertura di partenza non è completa.")
+        return result
+
+    improved = record_gains(improve_cover(result, guarantee_size, time_budget, progress=reporter,
+                                          on_improvement=on_improvement, rng=rng), guarantee_size)
+    if len(improved.selected) < len(result.selected):
+        reporter.info(f"✂ Ottimizzazione locale: da {len(result.selected):,} a {len(improved.selected):,} combinazioni.")
+        # Le coperture della cache devono poter sostituire quelle dei motori esatti
+        started_exact = result.engine in EXACT_ENGINES + ("cache",)
+        if cover_cache is not None and improved.space.is_complete and started_exact:
+            space = improved.space
+            cover_cache.put(len(space.pool), space.k, guarantee_size, max_combinations, improved)
+    else:
+        reporter.info("ℹ Ottimizzazione locale: nessuna copertura più piccola trovata nel tempo disponibile.")
+    return improved
+
+
+def verify_result(result, guarantee_size, reporter=None, condition_size=None):
+    """
+    Conferma la copertura di un risultato con una verifica indipendente dai motori.
+
+    La verifica riguarda lo spazio completo delle combinazioni del pool (per
+    uno spazio parziale i sottoinsiemi da garantire dipendono dai candidati) e
+    viene saltata se l'universo dei t-sottoinsiemi supera `MAX_VERIFY_UNIVERSE`.
+
+    Args:
+        result (GreedyResult): Il risultato da verificare.
+        guarantee_size (int): Dimensione dei sottoinsiemi garantiti.
+        reporter (ProgressReporter, optional): Destinatario dei messaggi.
+        condition_size (int, optional): Numeri estratti nel pool della garanzia condizionata.
+
+    Returns:
+        VerificationReport or None: L'esito, oppure None se la verifica non è applicabile.
+
+    Raises:
+        GuaranteeError: Se la copertura verificata non coincide con quella dichiarata dal motore.
+    """
+    reporter = reporter or ProgressReporter()
+    space = result.space
+    universe = comb(len(space.pool), max(guarantee_size, condition_size or 0))
+    if not space.is_complete or universe > MAX_VERIFY_UNIVERSE:
+        return None
+    report = confirm_result(result, guarantee_size, condition_size)
+    if report.complete and condition_size is not None:
+        reporter.info(f"✅ Garanzia verificata: tutti i {report.required:,} gruppi di {condition_size} numeri del "
+                      f"pool hanno almeno {guarantee_size} numeri in una combinazione.")
+    elif report.complete:
+        reporter.info(f"✅ Garanzia verificata: tutti i {report.required:,} sottoinsiemi da {guarantee_size} "
+                      f"numeri del pool sono coperti.")
+    else:
+        reporter.warning(f"⚠ Copertura incompleta: {report.uncovered:,} sottoinsiemi su {report.required:,} "
+                         f"non coperti ({report.uncovered_fraction:.2%}).")
+    return report
+
+
+def reduce_combinations_with_guarantee_greedy(full_combinations, guarantee_size, max_combinations=None,
+                                              engine="classic", engine_options=None, cover_cache=None,
+                                              reporter=None):
+    """
+    Come `reduce_combinations`, ma restituisce direttamente le combinazioni scelte,
+    dopo averne confermato la copertura con `verify_result`.
+
+    Returns:
+        list: Le combinazioni selezionate (tuple di numeri), ordinate.
+
+    Raises:
+        GuaranteeError: Se la verifica smentisce la copertura dichiarata dal motore.
+    """
+    result = reduce_combinations(full_combinations, guarantee_size, max_combinations, engine,
+                                 engine_options, cover_cache, reporter)
+    verify_result(result, guarantee_size, reporter)
+    return sorted(result.combinations())
@@ -0,0 +1,180 @@
+"""
+Cache in memoria dei risultati completi, condivisa tra le sessioni.
+
+Con un seed fissato una generazione è deterministica: pool, combinazioni e
+copertura dipendono solo dai parametri. Il risultato (`RunOutcome`) viene quindi
+memorizzato sotto l'impronta dei parametri e una richiesta identica, da
+qualunque sessione, viene servita senza ricalcolare nulla. Le combinazioni
+iniziali non vengono salvate: sono lo spazio implicito dei rank del pool.
+
+La cache è limitata in byte (stima della memoria occupata dai risultati) con
+rimozione LRU, ed è sicura tra thread.
+"""
+
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from .engines import EXACT_ENGINES
+
+# Dimensione massima predefinita dei risultati in cache (byte)
+DEFAULT_RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def cacheable(config):
+    """True se il risultato della configurazione è riproducibile (seed > 0) e quindi memorizzabile."""
+    return config.seed > 0
+
+
+def config_fingerprint(config):
+    """
+    Impronta SHA-256 dei parametri che determinano il risultato.
+
+    Comprende range, dimensione del pool, k, garanzia, limite di combinazioni,
+    filtro pari/dispari, numeri fissi (senza ordine né duplicati), seed e durata
+    dell'ottimizzazione locale. I motori di `EXACT_ENGINES` producono la stessa
+    selezione e condividono l'impronta; per gli altri contano motore e opzioni.
+    La garanzia condizionata e i vincoli sulle combinazioni entrano nell'impronta
+    solo se impostati, così le impronte senza di essi restano quelle di sempre.
+    """
+    if config.engine in EXACT_ENGINES:
+        engine = "greedy"
+    else:
+        engine = [config.engine, sorted(config.engine_options.items())]
+    parameters = {
+        "range": [config.range_min, config.range_max],
+        "pool_size": config.pool_size,
+        "k": config.k,
+        "guarantee": config.guarantee,
+        "max_combinations": config.max_combinations or 0,
+        "parity": config.parity,
+        "fixed_numbers": sorted(set(config.fixed_numbers)),
+        "seed": config.seed,
+        "local_search_seconds": config.local_search_seconds,
+        "engine": engine,
+    }
+    if config.condition_size is not None:
+        parameters["condition"] = config.condition_size
+    if config.constraints.active:
+        parameters["constraints"] = config.constraints.to_dict()
+    encoded = json.dumps(parameters, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def estimate_outcome_bytes(outcome):
+    """Stima della memoria occupata da un `RunOutcome` (combinazioni, selezione, intestazione)."""
+    size = sys.getsizeof(outcome.combinations)
+    size += sum(sys.getsizeof(combination) for combination in outcome.combinations)
+    size += sys.getsizeof(outcome.result.selected) + 8 * len(outcome.result.selected)
+    size += sys.getsizeof(outcome.result.gains)
+    size += sum(sys.getsizeof(line) for line in outcome.header_info)
+    if outcome.profile is not None:
+        size += len(outcome.profile) + len(outcome.profile_text)
+    return size
+
+
+@dataclass
+class CacheStats:
+    """
+    Statistiche di utilizzo di una `ResultCache`.
+
+    Attributes:
+        hits (int): Richieste servite dalla cache.
+        misses (int): Richieste non trovate in cache.
+        evictions (int): Voci rimosse per rientrare nel limite di memoria.
+        entries (int): Voci presenti.
+        size_bytes (int): Memoria stimata occupata dalle voci.
+        max_bytes (int): Limite di memoria.
+    """
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+    @property
+    def hit_rate(self):
+        """Frazione di richieste servite dalla cache (0 se nessuna richiesta)."""
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+
+class ResultCache:
+    """
+    Cache LRU dei risultati completi, limitata in byte.
+
+    Args:
+        max_bytes (int): Memoria massima stimata dei risultati; oltre questa soglia
+            vengono rimossi quelli usati meno di recente. Un risultato più grande
+            del limite non viene memorizzato.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_RESULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # impronta -> (risultato, byte)
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Restituisce il risultato memorizzato sotto `key`, o None.
+
+        Il risultato è condiviso tra le sessioni e non va modificato.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key, outcome):
+        """
+        Memorizza un risultato.
+
+        Returns:
+            bool: True se il risultato è stato memorizzato.
+        """
+        size = estimate_outcome_bytes(outcome)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (outcome, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+                self._evictions += 1
+        return True
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        """Statistiche di utilizzo correnti."""
+        with self._lock:
+            return CacheStats(hits=self._hits, misses=self._misses, evictions=self._evictions,
+                              entries=len(self._entries), size_bytes=self._size, max_bytes=self.max_bytes)
+
+    def clear(self):
+        """Svuota la cache (le statistiche restano)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
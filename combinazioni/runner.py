@@ -0,0 +1,324 @@
+"""
+Esecuzione completa di una configurazione: pool, combinazioni, riduzione.
+
+È il flusso del pulsante "Genera Combinazioni" senza interfaccia, usato dalla
+riga di comando e dai job batch. Un'esecuzione può anche partire dal risultato
+di una precedente compatibile ed estenderlo (vedi `extension_errors`).
+"""
+
+import random
+from dataclasses import asdict, dataclass, field, fields, replace
+from math import comb
+
+from .constraints import TicketConstraints
+from .export import build_header_info
+from .generation import generate_all_k_combinations_from_pool
+from .greedy import STOP_LIMIT
+from .incremental import extend_cover
+from .instrumentation import Instrumentation
+from .preflight import preflight
+from .pool import (
+    PARITY_ALL,
+    PARITY_LABELS,
+    build_number_pool,
+    extend_number_pool,
+    valid_fixed_numbers,
+    validate_pool_parameters,
+)
+from .progress import ProgressReporter
+from .reduction import optimize_cover, reduce_combinations, verify_result
+
+
+@dataclass
+class RunConfig:
+    """
+    Parametri di una generazione.
+
+    Attributes:
+        range_min (int): Estremo inferiore del range dei numeri.
+        range_max (int): Estremo superiore del range dei numeri.
+        pool_size (int): Numeri totali per il sistema.
+        k (int): Lunghezza di ogni combinazione.
+        guarantee (int): Dimensione dei sottoinsiemi garantiti.
+        condition (int, optional): Garanzia condizionata "t se m": numeri estratti nel pool m
+            per cui vale la garanzia (None = garanzia semplice, ogni t-sottoinsieme).
+        fixed_numbers (list): Numeri da includere sempre nel pool.
+        parity (str): Filtro pari/dispari ("all", "even", "odd").
+        constraints (TicketConstraints): Vincoli sulle singole combinazioni (somma, pari,
+            consecutivi, decine); nei dizionari è un dizionario con gli stessi campi.
+        max_combinations (int, optional): Limite massimo di combinazioni finali.
+        seed (int): Seed per la casualità del pool (0 = casuale).
+        engine (str): Motore di riduzione.
+        engine_options (dict): Opzioni specifiche del motore.
+        local_search_seconds (float): Secondi di ottimizzazione locale dopo il greedy (0 = nessuna).
+        name (str, optional): Nome della configurazione, usato per i file di output.
+    """
+    range_min: int = 1
+    range_max: int = 40
+    pool_size: int = 15
+    k: int = 5
+    guarantee: int = 3
+    condition: int = None
+    fixed_numbers: list = field(default_factory=list)
+    parity: str = PARITY_ALL
+    constraints: TicketConstraints = field(default_factory=TicketConstraints)
+    max_combinations: int = None
+    seed: int = 0
+    engine: str = "lazy"
+    engine_options: dict = field(default_factory=dict)
+    local_search_seconds: float = 0
+    name: str = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Costruisce la configurazione da un dizionario (es. letto da JSON/YAML).
+
+        Raises:
+            ValueError: Se il dizionario contiene chiavi sconosciute, un filtro o un vincolo non valido.
+        """
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Parametri di configurazione sconosciuti: {', '.join(sorted(unknown))}")
+        data = dict(data)
+        data["constraints"] = TicketConstraints.from_dict(data.get("constraints"))
+        config = cls(**data)
+        if config.parity not in PARITY_LABELS:
+            raise ValueError(f"Filtro pari/dispari non valido '{config.parity}': usare {', '.join(PARITY_LABELS)}.")
+        return config
+
+    def to_dict(self):
+        """Dizionario serializzabile della configurazione."""
+        return asdict(self)
+
+    @property
+    def parity_label(self):
+        """Etichetta leggibile del filtro pari/dispari."""
+        return PARITY_LABELS[self.parity]
+
+    @property
+    def condition_size(self):
+        """Numeri estratti m della garanzia condizionata; None se la garanzia è semplice (m = t)."""
+        return self.condition if self.condition is not None and self.condition > self.guarantee else None
+
+    @property
+    def guarantee_label(self):
+        """Garanzia leggibile: "t" oppure "t se m"."""
+        if self.condition_size is None:
+            return f"{self.guarantee}"
+        return f"{self.guarantee} se {self.condition_size}"
+
+    def rng(self):
+        """Generatore casuale: riproducibile se `seed` > 0."""
+        return random.Random(self.seed) if self.seed > 0 else random.Random()
+
+
+@dataclass
+class RunOutcome:
+    """
+    Risultato di `run`.
+
+    Attributes:
+        config (RunConfig): La configurazione eseguita (con i soli numeri fissi validi).
+        pool (list): Il pool di numeri usato.
+        full_count (int): Numero di combinazioni iniziali.
+        result (GreedyResult): Il risultato della riduzione.
+        combinations (list): Le combinazioni finali, ordinate.
+        header_info (list): Le righe di intestazione per l'esportazione.
+        diagnostics (list): Le misure delle fasi (vedi `Instrumentation.rows`).
+        diagnostic_lines (list): Le stesse misure come righe dell'intestazione
+            (vedi `Instrumentation.summary_lines`).
+        verification (VerificationReport, optional): L'esito della verifica indipendente
+            della garanzia (None se non applicabile).
+        profile (bytes, optional): Statistiche cProfile in formato pstats, se l'esecuzione è stata profilata.
+        profile_text (str): Le funzioni più costose del profilo, come testo.
+    """
+    config: RunConfig
+    pool: list
+    full_count: int
+    result: object
+    combinations: list
+    header_info: list
+    diagnostics: list = field(default_factory=list)
+    diagnostic_lines: list = field(default_factory=list)
+    verification: object = None
+    profile: bytes = None
+    profile_text: str = ""
+
+
+def extension_errors(previous, config):
+    """
+    Controlla se il risultato `previous` può essere esteso alla configurazione `config`.
+
+    L'estensione è possibile se cambiano solo la dimensione del pool (in più),
+    i numeri fissi (il pool precedente più i nuovi fissi deve stare nel nuovo
+    pool) o il limite di combinazioni (non più basso della copertura precedente),
+    senza vincoli sulle combinazioni.
+
+    Args:
+        previous (RunOutcome): Il risultato da estendere.
+        config (RunConfig): La nuova configurazione.
+
+    Returns:
+        list: I motivi per cui l'estensione non è possibile (vuota se è possibile).
+    """
+    errors = []
+    base = previous.config
+    for name, label in (("range_min", "range minimo"), ("range_max", "range massimo"), ("k", "lunghezza"),
+                        ("guarantee", "garanzia"), ("parity", "filtro pari/dispari")):
+        if getattr(base, name) != getattr(config, name):
+            errors.append(f"è cambiato il parametro '{label}'.")
+    if not previous.result.space.is_complete:
+        errors.append("il risultato precedente non copre tutte le combinazioni del pool.")
+    if base.condition_size is not None or config.condition_size is not None:
+        errors.append("l'estensione vale solo per la garanzia semplice, non per quella condizionata.")
+    if base.constraints.active or config.constraints.active:
+        errors.append("l'estensione non è disponibile con i vincoli sulle combinazioni.")
+    fixed = valid_fixed_numbers(config.fixed_numbers, config.range_min, config.range_max, config.parity)
+    needed = len(set(previous.pool) | set(fixed))
+    if needed > config.pool_size:
+        errors.append(f"il pool precedente e i numeri fissi richiedono {needed} numeri, più dei {config.pool_size} indicati.")
+    if config.max_combinations is not None and config.max_combinations < len(previous.result.selected):
+        errors.append(f"il limite di combinazioni ({config.max_combinations}) è inferiore alla copertura "
+                      f"precedente ({len(previous.result.selected)}).")
+    return errors
+
+
+def run(config, reporter=None, cover_cache=None, instrumentation=None, on_improvement=None, previous=None,
+        memory_limit=None):
+    """
+    Esegue una configurazione dall'inizio alla fine.
+
+    Prima di qualsiasi calcolo la stima preventiva (`preflight`) controlla che
+    la riduzione stia nel limite di memoria: se il motore richiesto non ci sta
+    se ne usa uno più leggero, altrimenti la generazione viene rifiutata.
+
+    Con `previous` il pool precedente viene esteso (numeri fissi nuovi, poi
+    numeri casuali fino alla dimensione richiesta) e la sua copertura completata
+    con `extend_cover` invece di essere ricalcolata.
+
+    Args:
+        config (RunConfig): I parametri della generazione.
+        reporter (ProgressReporter, optional): Destinatario di avanzamento e messaggi.
+        cover_cache (CoverCache, optional): Cache persistente delle coperture.
+        instrumentation (Instrumentation, optional): Raccoglie le misure delle fasi;
+            le righe di diagnostica vengono aggiunte all'intestazione.
+        on_improvement (callable, optional): Chiamata con ogni copertura migliore
+            trovata dall'ottimizzazione locale.
+        previous (RunOutcome, optional): Risultato compatibile da estendere.
+        memory_limit (int, optional): Memoria massima per la generazione (byte);
+            predefinita `default_memory_limit()`.
+
+    Returns:
+        RunOutcome: Pool, risultato e intestazione per l'esportazione.
+
+    Raises:
+        ValueError: Se i parametri non sono validi, `previous` non è estendibile, la
+            generazione supererebbe il limite di memoria con qualunque motore o nessuna
+            combinazione del pool rispetta i vincoli.
+        GuaranteeError: Se la verifica della garanzia smentisce il risultato.
+    """
+    reporter = reporter or ProgressReporter()
+    fixed = valid_fixed_numbers(config.fixed_numbers, config.range_min, config.range_max, config.parity)
+    if len(fixed) != len(set(config.fixed_numbers)):
+        reporter.warning("Alcuni 'Numeri da includere' sono stati ignorati perché fuori range o non conformi al filtro pari/dispari.")
+    config = replace(config, fixed_numbers=fixed)
+    errors = validate_pool_parameters(config.range_min, config.range_max, config.pool_size, config.k,
+                                      config.guarantee, fixed, config.parity, config.condition, config.constraints)
+    if errors:
+        raise ValueError(" ".join(errors))
+    if previous is not None:
+        errors = extension_errors(previous, config)
+        if errors:
+            raise ValueError("Impossibile estendere il risultato precedente: " + " ".join(errors))
+    estimate = preflight(config, memory_limit, previous)
+    if not estimate.allowed:
+        raise ValueError(estimate.message)
+    if estimate.switched:
+        reporter.warning(estimate.message)
+        config = replace(config, engine=estimate.engine, engine_options=estimate.engine_options)
+
+    instrumentation = instrumentation or Instrumentation()
+    rng = config.rng()
+    with instrumentation.phase("Campionamento pool"):
+        if previous is None:
+            pool = build_number_pool(config.range_min, config.range_max, config.pool_size, fixed, config.parity, rng)
+        else:
+            pool = extend_number_pool(previous.pool, config.range_min, config.range_max, config.pool_size, fixed,
+                                      config.parity, rng)
+    with instrumentation.phase("Generazione combinazioni"):
+        full_combinations = generate_all_k_combinations_from_pool(pool, config.k, config.constraints)
+    if config.constraints.active:
+        if not len(full_combinations):
+            raise ValueError(f"Nessuna combinazione del pool {pool} rispetta i vincoli ({config.constraints.label}).")
+        total = comb(len(pool), config.k)
+        reporter.info(f"🧩 Vincoli sulle combinazioni ({config.constraints.label}): {len(full_combinations):,} "
+                      f"combinazioni valide su {total:,} ({len(full_combinations) / total:.2%}).")
+    if previous is None:
+        with instrumentation.phase("Riduzione") as metrics:
+            result = reduce_combinations(full_combinations, config.guarantee, config.max_combinations,
+                                         engine=config.engine, engine_options=config.engine_options,
+                                         cover_cache=cover_cache, reporter=instrumentation.reporter(reporter),
+                                         rng=rng, condition_size=config.condition_size)
+            instrumentation.record_result(metrics, result)
+    else:
+        with instrumentation.phase("Estensione incrementale") as metrics:
+            result = extend_cover(previous.result, pool, config.guarantee, config.max_combinations,
+                                  engine=config.engine, engine_options=config.engine_options,
+                                  cover_cache=cover_cache, progress=instrumentation.reporter(reporter), rng=rng)
+            instrumentation.record_result(metrics, result)
+        added = len(result.selected) - len(previous.result.selected)
+        new_numbers = sorted(set(pool) - set(previous.pool))
+        reporter.info(f"♻ Risultato precedente esteso: {added:,} combinazioni aggiunte a {len(previous.result.selected):,}"
+                      + (f", nuovi numeri nel pool: {new_numbers}." if new_numbers else "."))
+        if result.stop_reason == STOP_LIMIT:
+            reporter.info(f"🔒 Raggiunto limite massimo di combinazioni: {config.max_combinations}")
+    if config.local_search_seconds > 0 and config.condition_size is not None:
+        reporter.info("ℹ Ottimizzazione locale saltata: non è disponibile per la garanzia condizionata.")
+    elif config.local_search_seconds > 0:
+        with instrumentation.phase("Ottimizzazione locale") as metrics:
+            result = optimize_cover(result, config.guarantee, config.local_search_seconds, config.max_combinations,
+                                    cover_cache=cover_cache, reporter=instrumentation.reporter(reporter), rng=rng,
+                                    on_improvement=on_improvement)
+            instrumentation.record_result(metrics, result)
+    with instrumentation.phase("Verifica garanzia"):
+        verification = verify_result(result, config.guarantee, reporter, condition_size=config.condition_size)
+    final_combinations = sorted(result.combinations())
+    diagnostic_lines = instrumentation.summary_lines()
+    header_info = build_header_info(config, pool, len(full_combinations), len(final_combinations),
+                                    diagnostics=diagnostic_lines, verification=verification, result=result)
+    return RunOutcome(config=config, pool=pool, full_count=len(full_combinations), result=result,
+                      combinations=final_combinations, header_info=header_info,
+                      diagnostics=instrumentation.rows(), diagnostic_lines=diagnostic_lines,
+                      verification=verification)
+
+
+def budget_outcome(outcome, count):
+    """
+    Riduce un risultato alle sue prime `count` combinazioni, senza ricalcolare.
+
+    La selezione è nell'ordine in cui il motore l'ha fatta: ogni prefisso ha la
+    copertura indicata dalla curva (`GreedyResult.coverage_curve`), che
+    l'intestazione riporta per il numero di combinazioni scelto. La verifica
+    della selezione completa non vale per il prefisso e non viene riportata.
+
+    Args:
+        outcome (RunOutcome): Il risultato completo di `run`.
+        count (int): Numero di combinazioni da tenere.
+
+    Returns:
+        RunOutcome: Il risultato ridotto (`outcome` stesso se `count` le comprende tutte).
+
+    Raises:
+        ValueError: Se `count` non è valido o i guadagni delle scelte non sono registrati.
+    """
+    result = outcome.result.truncated(count)
+    if result is outcome.result:
+        return outcome
+    final_combinations = sorted(result.combinations())
+    diagnostic_lines = [f"Combinazioni scelte dalla curva di copertura: {count:,} su {len(outcome.result.selected):,}"]
+    header_info = build_header_info(outcome.config, outcome.pool, outcome.full_count, len(final_combinations),
+                                    diagnostics=diagnostic_lines + outcome.diagnostic_lines, result=result)
+    return replace(outcome, result=result, combinations=final_combinations, header_info=header_info,
+                   verification=None)
@@ -0,0 +1,180 @@
+"""
+Greedy randomizzato su candidati campionati, per pool in cui C(v, k) è troppo grande.
+
+Invece di valutare tutte le combinazioni del pool, ad ogni passo il motore
+estrae un lotto limitato di candidati e sceglie quello che copre più
+t-sottoinsiemi nuovi. Ogni candidato parte da un t-sottoinsieme ancora
+scoperto (quindi copre almeno un sottoinsieme nuovo) ed è completato con
+numeri estratti con probabilità crescente con il loro peso, il numero di
+t-sottoinsiemi scoperti che li contengono (estrazione pesata senza
+reinserimento con chiavi u^(1/peso)).
+
+Memoria e tempo per passo dipendono solo da C(v, t), dal lotto e da C(k, t),
+non da C(v, k): la copertura è un `bytearray` di C(v, t) byte e i pesi un
+contatore per numero. Con NumPy i candidati del lotto vengono completati e
+valutati in blocco. Il risultato è riproducibile con lo stesso generatore
+casuale e in genere è più grande di quello del greedy esatto.
+"""
+
+import heapq
+import random
+from itertools import combinations
+from math import comb
+
+from .greedy import PHASE_GREEDY, PHASE_TARGETS, STOP_LIMIT, GreedyResult, greedy_lazy
+from .numpy_backend import binomial_table, np, subset_rank_matrix, unrank_colex_matrix
+from .ranking import RankedCombinations, SubsetRanker, rank_colex, rank_lex, unrank_colex
+from .verify import MAX_VERIFY_UNIVERSE
+
+# Candidati estratti ad ogni passo
+DEFAULT_BATCH_SIZE = 200
+
+# Universo massimo gestibile (t-sottoinsiemi del pool): un byte ciascuno
+MAX_SAMPLED_UNIVERSE = MAX_VERIFY_UNIVERSE
+
+
+class _UncoveredSampler:
+    # Estrae t-sottoinsiemi scoperti: prima con tentativi casuali su tutto l'universo, poi,
+    # quando quasi tutto è coperto, da un elenco dei rank scoperti compattato quando serve.
+
+    def __init__(self, covered, rng):
+        self.covered = covered
+        self.rng = rng
+        self.pending = None
+
+    def _probe(self, source, count):
+        covered = self.covered
+        rng = self.rng
+        hits = []
+        for _ in range(2 * count):
+            subset_rank = source[rng.randrange(len(source))] if source is not None else rng.randrange(len(covered))
+            if not covered[subset_rank]:
+                hits.append(subset_rank)
+                if len(hits) == count:
+                    break
+        return hits
+
+    def draw(self, count):
+        hits = self._probe(self.pending, count)
+        if len(hits) <= count // 2:
+            # Troppi tentativi a vuoto: si ricostruisce l'elenco dei rank scoperti
+            covered = self.covered
+            if self.pending is None:
+                self.pending = [subset_rank for subset_rank, flag in enumerate(covered) if not flag]
+            else:
+                self.pending = [subset_rank for subset_rank in self.pending if not covered[subset_rank]]
+            hits = self._probe(self.pending, count)
+        return hits
+
+
+def _batch_python(seeds, weights, k, guarantee_size, covered, ranker, rng):
+    # Completa i candidati con estrazione pesata e restituisce (guadagno, indici) del migliore
+    pool_size = len(weights)
+    best = None
+    for seed in seeds:
+        start = set(unrank_colex(seed, guarantee_size))
+        keys = {index: rng.random() ** (1 / weights[index]) if weights[index] else 0.0
+                for index in range(pool_size) if index not in start}
+        indices = tuple(sorted(start.union(heapq.nlargest(k - guarantee_size, keys, key=keys.get))))
+        gain = sum(1 for subset_rank in ranker.ranks(indices) if not covered[subset_rank])
+        if best is None or gain > best[0]:
+            best = (gain, indices)
+    return best
+
+
+def _batch_numpy(seeds, weights, k, guarantee_size, covered, binomials, generator):
+    # Come `_batch_python`, in blocco: unrank dei sottoinsiemi di partenza, chiavi di estrazione
+    # per tutto il lotto, k chiavi più grandi per riga e guadagni con un'unica somma sulla maschera.
+    count = len(seeds)
+    pool_size = len(weights)
+    start = unrank_colex_matrix(seeds, guarantee_size, binomials)
+    with np.errstate(divide="ignore"):
+        exponents = np.where(weights > 0, 1.0 / weights, np.inf)
+    keys = generator.random((count, pool_size)) ** exponents
+    keys[np.arange(count)[:, None], start] = 2.0  # i numeri di partenza sono sempre inclusi
+    indices = np.sort(np.argpartition(-keys, k - 1, axis=1)[:, :k], axis=1)
+    ranks = subset_rank_matrix(indices, guarantee_size, binomials)
+    mask = np.frombuffer(covered, dtype=np.uint8)
+    gains = ranks.shape[1] - mask[ranks].sum(axis=1)
+    best = int(np.argmax(gains))  # a parità vince il primo candidato estratto
+    return int(gains[best]), tuple(int(index) for index in indices[best])
+
+
+def greedy_sampled(full_combinations, guarantee_size, max_combinations=None, progress=None,
+                   batch_size=DEFAULT_BATCH_SIZE, rng=None):
+    """
+    Greedy su lotti di candidati campionati, senza enumerare le combinazioni del pool.
+
+    Args:
+        full_combinations (sequence): Combinazioni candidate (tuple ordinate o `RankedCombinations`);
+            il motore richiede lo spazio completo, altrimenti usa `greedy_lazy`.
+        guarantee_size (int): Dimensione t dei sottoinsiemi da garantire.
+        max_combinations (int, optional): Limite massimo di combinazioni da selezionare.
+        progress (callable, optional): Callback `progress(fase, frazione)`.
+        batch_size (int): Candidati estratti ad ogni passo: più sono, più la scelta si
+            avvicina a quella del greedy esatto e più dura ogni passo.
+        rng (random.Random, optional): Generatore casuale; con lo stesso seed il
+            risultato è lo stesso. Predefinito il modulo `random`.
+
+    Returns:
+        GreedyResult: La selezione e la copertura raggiunta.
+
+    Raises:
+        ValueError: Se il lotto non è positivo o i t-sottoinsiemi sono troppi.
+    """
+    space = RankedCombinations.from_combinations(full_combinations)
+    if not space.is_complete:
+        return greedy_lazy(space, guarantee_size, max_combinations, progress)
+    if batch_size <= 0:
+        raise ValueError("Il lotto di candidati deve essere un numero positivo.")
+    pool_size = len(space.pool)
+    k = space.k
+    universe = comb(pool_size, guarantee_size)
+    if universe > MAX_SAMPLED_UNIVERSE:
+        raise ValueError(f"Troppi sottoinsiemi da garantire ({universe:,}) per il motore campionato.")
+
+    rng = rng or random
+    covered = bytearray(universe)
+    sampler = _UncoveredSampler(covered, rng)
+    # Peso di ogni numero: t-sottoinsiemi scoperti che lo contengono
+    initial_weight = comb(pool_size - 1, guarantee_size - 1)
+    if np is not None:
+        weights = np.full(pool_size, initial_weight, dtype=np.float64)
+        binomials = binomial_table(pool_size, guarantee_size)
+        generator = np.random.default_rng(rng.getrandbits(64))
+    else:
+        weights = [initial_weight] * pool_size
+        ranker = SubsetRanker(pool_size, k, guarantee_size)
+    if progress is not None:
+        progress(PHASE_TARGETS, 1.0)
+
+    result = GreedyResult(space=space, required=universe, engine="sampled")
+    scanned = 0
+    while result.covered < result.required:
+        seeds = sampler.draw(batch_size)
+        scanned += len(seeds)
+        if np is not None:
+            gain, indices = _batch_numpy(seeds, weights, k, guarantee_size, covered, binomials, generator)
+        else:
+            gain, indices = _batch_python(seeds, weights, k, guarantee_size, covered, ranker, rng)
+
+        result.selected.append(rank_lex(indices, pool_size))
+        for subset in combinations(indices, guarantee_size):
+            subset_rank = rank_colex(subset)
+            if not covered[subset_rank]:
+                covered[subset_rank] = 1
+                for index in subset:
+                    weights[index] -= 1
+        result.covered += gain
+        result.gains.append(gain)
+        if progress is not None:
+            progress(PHASE_GREEDY, result.covered / result.required)
+
+        if max_combinations is not None and len(result.selected) >= max_combinations:
+            if result.covered < result.required:
+                result.stop_reason = STOP_LIMIT
+            break
+
+    result.stats["candidates_scanned"] = scanned
+    result.stats["batch_size"] = batch_size
+    return result
@@ -0,0 +1,240 @@
+"""
+Verifica della garanzia di un sistema di combinazioni.
+
+Dato un elenco di combinazioni (generate qui o provenienti da un file esterno),
+il pool di numeri e la garanzia t, controlla quali t-sottoinsiemi del pool
+sono contenuti in almeno una combinazione. La copertura è una mappa di byte
+indicizzata dal rank colessicografico dei t-sottoinsiemi: ogni combinazione
+segna i rank dei propri sottoinsiemi, calcolati per somme di coefficienti
+binomiali (in blocco con NumPy, se disponibile), senza mai enumerare
+l'universo. Universi come C(40, 4) si verificano in frazioni di secondo.
+
+Per la garanzia condizionata "t se m" (vedi `conditional`) si verifica poi
+ogni m-sottoinsieme del pool: è coperto se uno dei suoi t-sottoinsiemi lo è.
+"""
+
+from dataclasses import dataclass, field
+from itertools import combinations as subsets_of
+from math import comb
+
+from .numpy_backend import binomial_table, np, subset_rank_matrix, unrank_colex_matrix
+from .ranking import SubsetRanker, chunked, rank_colex, unrank_colex
+
+# Universo massimo verificabile (t-sottoinsiemi del pool): un byte ciascuno
+MAX_VERIFY_UNIVERSE = 1 << 28
+
+# Combinazioni elaborate per blocco
+VERIFY_CHUNK_SIZE = 65536
+
+DEFAULT_MAX_EXAMPLES = 10
+
+PHASE_VERIFY = "verify"
+
+
+class GuaranteeError(ValueError):
+    """Sollevata quando una copertura dichiarata completa non supera la verifica."""
+
+
+@dataclass
+class VerificationReport:
+    """
+    Esito della verifica di un sistema.
+
+    Attributes:
+        pool (list): Il pool di numeri rispetto a cui si è verificato.
+        guarantee (int): La garanzia t verificata.
+        combinations (int): Numero di combinazioni esaminate.
+        required (int): Numero di t-sottoinsiemi del pool, C(v, t) (C(v, m) con `condition`).
+        covered (int): t-sottoinsiemi contenuti in almeno una combinazione (m-sottoinsiemi
+            con almeno t numeri in una combinazione, con `condition`).
+        holes (list): Esempi di sottoinsiemi non coperti (tuple di numeri, in ordine colex).
+        outside_numbers (list): Numeri presenti nelle combinazioni ma non nel pool (ignorati).
+        short_combinations (int): Combinazioni con meno di t numeri del pool (non coprono nulla).
+        engine (str): "numpy" o "python".
+        condition (int, optional): Numeri estratti nel pool m della garanzia condizionata.
+    """
+    pool: list
+    guarantee: int
+    combinations: int = 0
+    required: int = 0
+    covered: int = 0
+    holes: list = field(default_factory=list)
+    outside_numbers: list = field(default_factory=list)
+    short_combinations: int = 0
+    engine: str = "python"
+    condition: int = None
+
+    @property
+    def uncovered(self):
+        """Numero di t-sottoinsiemi non coperti."""
+        return self.required - self.covered
+
+    @property
+    def uncovered_fraction(self):
+        """Frazione di t-sottoinsiemi non coperti (0..1)."""
+        return self.uncovered / self.required if self.required else 0.0
+
+    @property
+    def complete(self):
+        """True se tutti i t-sottoinsiemi del pool sono coperti."""
+        return self.covered == self.required
+
+    def summary_lines(self):
+        """Righe di riepilogo della verifica (per l'intestazione dei file e i messaggi)."""
+        label = f"{self.guarantee} se {self.condition}" if self.condition else f"{self.guarantee}"
+        unit = "gruppi estratti" if self.condition else "sottoinsiemi"
+        if self.complete:
+            lines = [f"Verifica garanzia {label}: completa "
+                     f"({self.covered:,}/{self.required:,} {unit} coperti)"]
+        else:
+            lines = [f"Verifica garanzia {label}: {self.uncovered:,} {unit} su {self.required:,} "
+                     f"non coperti ({self.uncovered_fraction:.2%})"]
+            if self.holes:
+                lines.append("  Esempi non coperti: " + "; ".join("-".join(map(str, hole)) for hole in self.holes))
+        if self.outside_numbers:
+            lines.append(f"  Numeri fuori dal pool ignorati: {self.outside_numbers}")
+        if self.short_combinations:
+            lines.append(f"  Combinazioni con meno di {self.guarantee} numeri del pool: {self.short_combinations:,}")
+        return lines
+
+
+def _mark_python(covered, groups, pool_size, guarantee_size):
+    for length, rows in groups.items():
+        ranker = SubsetRanker(pool_size, length, guarantee_size)
+        for indices in rows:
+            for subset_rank in ranker.ranks(indices):
+                covered[subset_rank] = 1
+
+
+def _mark_numpy(covered, groups, pool_size, guarantee_size):
+    binomials = binomial_table(pool_size, guarantee_size)
+    mask = np.frombuffer(covered, dtype=np.uint8)
+    for rows in groups.values():
+        indices = np.array(rows, dtype=np.int16)
+        mask[subset_rank_matrix(indices, guarantee_size, binomials).ravel()] = 1
+
+
+def _conditional_python(covered, pool_size, guarantee_size, condition_size):
+    # Mappa di copertura degli m-sottoinsiemi, indicizzata per rank colessicografico
+    ranker = SubsetRanker(pool_size, condition_size, guarantee_size)
+    result = bytearray(comb(pool_size, condition_size))
+    for subset in subsets_of(range(pool_size), condition_size):
+        if any(covered[subset_rank] for subset_rank in ranker.ranks(subset)):
+            result[rank_colex(subset)] = 1
+    return result
+
+
+def _conditional_numpy(covered, pool_size, guarantee_size, condition_size):
+    binomials = binomial_table(pool_size, condition_size)
+    mask = np.frombuffer(covered, dtype=np.uint8)
+    universe = comb(pool_size, condition_size)
+    result = bytearray(universe)
+    hits = np.frombuffer(result, dtype=np.uint8)
+    for start in range(0, universe, VERIFY_CHUNK_SIZE):
+        stop = min(start + VERIFY_CHUNK_SIZE, universe)
+        subsets = unrank_colex_matrix(np.arange(start, stop), condition_size, binomials)
+        hits[start:stop] = mask[subset_rank_matrix(subsets, guarantee_size, binomials)].any(axis=1)
+    return result
+
+
+def verify_cover(combinations, pool, guarantee_size, max_examples=DEFAULT_MAX_EXAMPLES, progress=None,
+                 condition_size=None):
+    """
+    Verifica quanti t-sottoinsiemi del pool sono coperti dalle combinazioni.
+
+    Le combinazioni possono avere lunghezze diverse; i numeri fuori dal pool
+    vengono ignorati (e riportati) e quelli ripetuti contano una volta.
+
+    Args:
+        combinations (iterable): Le combinazioni (sequenze di numeri), consumate una volta sola.
+        pool (list): I numeri del sistema.
+        guarantee_size (int): La garanzia t da verificare.
+        max_examples (int): Numero massimo di sottoinsiemi non coperti da riportare.
+        progress (callable, optional): Callback `progress(fase, frazione)`, chiamata a fine verifica.
+        condition_size (int, optional): Con la garanzia condizionata "t se m", i numeri estratti
+            nel pool m: si verificano gli m-sottoinsiemi invece dei t-sottoinsiemi.
+
+    Returns:
+        VerificationReport: Copertura, percentuale scoperta ed esempi di buchi.
+
+    Raises:
+        ValueError: Se la garanzia non è valida per il pool o l'universo è troppo grande.
+    """
+    pool = sorted(set(pool))
+    pool_size = len(pool)
+    if guarantee_size <= 0:
+        raise ValueError("La dimensione della garanzia deve essere un numero positivo.")
+    if guarantee_size > pool_size:
+        raise ValueError(f"La garanzia ({guarantee_size}) non può superare i numeri del pool ({pool_size}).")
+    if condition_size is not None and not guarantee_size <= condition_size <= pool_size:
+        raise ValueError(f"I numeri estratti nel pool ({condition_size}) devono essere tra la garanzia "
+                         f"({guarantee_size}) e i numeri del pool ({pool_size}).")
+    universe = comb(pool_size, guarantee_size)
+    targets = universe if condition_size is None else comb(pool_size, condition_size)
+    if max(universe, targets) > MAX_VERIFY_UNIVERSE:
+        raise ValueError(f"Troppi sottoinsiemi da verificare ({max(universe, targets):,}): "
+                         f"il massimo è {MAX_VERIFY_UNIVERSE:,}.")
+
+    report = VerificationReport(pool=pool, guarantee=guarantee_size, required=targets,
+                                engine="numpy" if np is not None else "python", condition=condition_size)
+    position = {number: index for index, number in enumerate(pool)}
+    mark = _mark_numpy if np is not None else _mark_python
+    covered = bytearray(universe)
+    outside = set()
+    for chunk in chunked(combinations, VERIFY_CHUNK_SIZE):
+        # Combinazioni raggruppate per numero di elementi nel pool
+        groups = {}
+        for combination in chunk:
+            numbers = set(combination)
+            indices = sorted(position[number] for number in numbers if number in position)
+            if len(indices) < len(numbers):
+                outside.update(number for number in numbers if number not in position)
+            if len(indices) < guarantee_size:
+                report.short_combinations += 1
+                continue
+            groups.setdefault(len(indices), []).append(indices)
+        report.combinations += len(chunk)
+        mark(covered, groups, pool_size, guarantee_size)
+
+    size = guarantee_size
+    if condition_size is not None:
+        conditional = _conditional_numpy if np is not None else _conditional_python
+        covered = conditional(covered, pool_size, guarantee_size, condition_size)
+        size = condition_size
+    report.covered = targets - covered.count(0)
+    report.outside_numbers = sorted(outside)
+    start = 0
+    while len(report.holes) < max_examples:
+        hole = covered.find(0, start)
+        if hole < 0:
+            break
+        report.holes.append(tuple(pool[index] for index in unrank_colex(hole, size)))
+        start = hole + 1
+    if progress is not None:
+        progress(PHASE_VERIFY, 1.0)
+    return report
+
+
+def confirm_result(result, guarantee_size, condition_size=None):
+    """
+    Verifica in modo indipendente la copertura di un `GreedyResult` sullo spazio completo del pool.
+
+    Args:
+        result (GreedyResult): Il risultato da verificare.
+        guarantee_size (int): Dimensione dei sottoinsiemi garantiti.
+        condition_size (int, optional): Numeri estratti nel pool della garanzia condizionata.
+
+    Returns:
+        VerificationReport: L'esito della verifica.
+
+    Raises:
+        GuaranteeError: Se il motore ha dichiarato una copertura diversa da quella verificata.
+    """
+    report = verify_cover(result.combinations(), result.space.pool, guarantee_size,
+                          condition_size=condition_size)
+    if report.covered != result.covered or report.required != result.required:
+        raise GuaranteeError(
+            f"Verifica della garanzia fallita: il motore '{result.engine}' dichiara {result.covered:,}/"
+            f"{result.required:,} sottoinsiemi coperti, la verifica ne trova {report.covered:,}/{report.required:,}."
+        )
+    return report